@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Replay a recorded crew run offline and measure the orchestration overhead.
+
+Record once against the real providers:
+
+    REFORGE_CASSETTE=runs/docs.jsonl REFORGE_CASSETTE_MODE=record python3 gen_docs.py temp_codebase/kitchensink/
+
+then replay it as often as needed, from the src folder:
+
+    python -m bench.bench_crew_replay runs/docs.jsonl --latency 0
+    python -m bench.bench_crew_replay runs/docs.jsonl --latency recorded*0.1 --repeat 3
+
+The crew is rebuilt with the constructor arguments and kickoff inputs
+stored in the cassette. Wall time minus the simulated LLM/search latency
+is the time spent in crewai, the tools and our own glue code.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a crew run from a cassette and time it")
+    parser.add_argument("cassette", help="Path to a cassette recorded with REFORGE_CASSETTE_MODE=record")
+    parser.add_argument("--latency", default="0",
+                        help="Artificial latency per call: seconds, 'recorded' or 'recorded*<factor>'")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    os.environ["REFORGE_CASSETTE"] = args.cassette
+    os.environ["REFORGE_CASSETTE_MODE"] = "replay"
+    os.environ["REFORGE_REPLAY_LATENCY"] = args.latency
+
+    # imported only now: the cassette is opened from the environment on first use
+    from llm.cassette import active_cassette, _replay_delay, replay_latency
+    from registry import crew_class as registered_crew
+
+    recorded = active_cassette()
+    kickoffs = recorded.entries("kickoff")
+    if not kickoffs:
+        print(f"❌ Cassette '{args.cassette}' has no kickoff record.", file=sys.stderr)
+        sys.exit(1)
+    kickoff = kickoffs[0]
+    crew_name = kickoff["request"]
+    crew_class = registered_crew(crew_name)
+
+    latency = replay_latency()
+    simulated = sum(_replay_delay(e, latency) for kind in ("llm", "search") for e in recorded.entries(kind))
+
+    runs = []
+    for _ in range(args.repeat):
+        # every run is served the whole cassette again
+        recorded.rewind()
+        start = time.perf_counter()
+        crew = crew_class(*kickoff["response"]["crew_args"]).crew()
+        crew.kickoff(kickoff["response"]["inputs"])
+        wall = time.perf_counter() - start
+        runs.append({"wall_s": wall, "simulated_latency_s": simulated,
+                     "overhead_s": wall - simulated, **recorded.stats})
+
+    if args.json:
+        print(json.dumps({"crew": crew_name, "cassette": args.cassette, "runs": runs}, indent=2))
+        return
+    print(f"🎞️  Replayed '{crew_name}' from {args.cassette} (latency={args.latency})")
+    for i, run in enumerate(runs, 1):
+        print(f"   run {i}: wall {run['wall_s']:.2f}s, simulated latency {run['simulated_latency_s']:.2f}s, "
+              f"overhead {run['overhead_s']:.2f}s, served {run['served']} interactions")
+
+
+if __name__ == "__main__":
+    main()
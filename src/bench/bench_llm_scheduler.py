@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel agents against a rate-limited (mock) LLM provider.
+
+Run from the src folder:
+
+    python -m bench.bench_llm_scheduler
+    python -m bench.bench_llm_scheduler --agents 16 --calls 10 --rpm 40 --window 5 --json
+
+Every agent is a thread making `--calls` LLM calls against one
+MockProvider (see llm/mock_provider.py) that allows `--rpm` requests per
+`--window` seconds. Agent 0 is on the critical path. Three clients are
+compared:
+
+  naive      each agent retries a refused call after a short fixed pause,
+             the way independent crews with their own LLM clients do;
+  adaptive   calls go through an LLMScheduler that knows no limit and
+             learns it from the 429s and their headers;
+  configured the scheduler is given the provider's limit up front.
+
+For each client: wall time, 429s received, calls that gave up, and the
+mean latency of the critical agent's calls next to everyone else's.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from llm.mock_provider import MockProvider, MockRateLimitError
+from llm.scheduler import PRIORITY_CRITICAL, PRIORITY_NORMAL, LLMScheduler, llm_priority
+
+NAIVE_PAUSE_S = 0.2
+NAIVE_RETRIES = 6
+
+
+def run_client(client: str, agents: int, calls: int, rpm: int, window_s: float) -> Dict:
+    provider = MockProvider(rpm=rpm, tpm=None, latency_s=0.02, window_s=window_s, seed=0)
+    prompt = [{"role": "user", "content": "Describe the module. " * 20}]
+    scheduler: Optional[LLMScheduler] = None
+    if client != "naive":
+        # the scheduler's minute is shortened like the provider's
+        scheduler = LLMScheduler(max_retries=20, minute_s=window_s)
+        if client == "configured":
+            scheduler.configure("mock/bench", rpm=rpm)
+
+    latencies: Dict[int, List[float]] = {a: [] for a in range(agents)}
+    failures = [0]
+    lock = threading.Lock()
+
+    def one_call() -> None:
+        if scheduler is not None:
+            scheduler.call("mock/bench", lambda: provider.complete(prompt), prompt)
+            return
+        for attempt in range(NAIVE_RETRIES + 1):
+            try:
+                provider.complete(prompt)
+                return
+            except MockRateLimitError:
+                if attempt == NAIVE_RETRIES:
+                    raise
+                time.sleep(NAIVE_PAUSE_S)
+
+    def agent(index: int):
+        priority = PRIORITY_CRITICAL if index == 0 else PRIORITY_NORMAL
+        with llm_priority(priority):
+            for _ in range(calls):
+                start = time.perf_counter()
+                try:
+                    one_call()
+                except MockRateLimitError:
+                    with lock:
+                        failures[0] += 1
+                    continue
+                latencies[index].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=agent, args=(a,)) for a in range(agents)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    others = [x for a in range(1, agents) for x in latencies[a]]
+    return {
+        "client": client,
+        "wall_s": time.perf_counter() - start,
+        "rate_limited": provider.stats["rate_limited"],
+        "gave_up": failures[0],
+        "critical_mean_s": statistics.mean(latencies[0]) if latencies[0] else None,
+        "others_mean_s": statistics.mean(others) if others else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel agents against a rate-limited mock LLM")
+    parser.add_argument("--agents", type=int, default=12)
+    parser.add_argument("--calls", type=int, default=8, help="LLM calls per agent")
+    parser.add_argument("--rpm", type=int, default=30, help="Requests the provider allows per window")
+    parser.add_argument("--window", type=float, default=4.0, help="Quota window of the provider in seconds")
+    parser.add_argument("--clients", nargs="*", default=["naive", "adaptive", "configured"])
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = [run_client(c, args.agents, args.calls, args.rpm, args.window) for c in args.clients]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    fmt: Callable[[Optional[float]], str] = lambda v: "-" if v is None else f"{v:.2f}"
+    print(f"{'client':>10}  {'wall s':>7}  {'429s':>5}  {'gave up':>7}  {'critical s':>10}  {'others s':>8}")
+    for r in results:
+        print(f"{r['client']:>10}  {r['wall_s']:>7.1f}  {r['rate_limited']:>5}  {r['gave_up']:>7}  "
+              f"{fmt(r['critical_mean_s']):>10}  {fmt(r['others_mean_s']):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark long-term memory recall latency against store size.
+
+Run from the src folder:
+
+    python -m bench.bench_memory
+    python -m bench.bench_memory --sizes 1000 10000 100000 --queries 500 --json
+
+For every size a fresh database is filled with synthetic memories (a
+crew's worth of task descriptions, each saved many times, as months of
+runs would) and recalled the way crewai does, with load(task, latest_n=2).
+crewai's stock LTMSQLiteStorage is measured next to BoundedLTMStorage;
+the bounded store is also timed after evicting down to its max_rows.
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
+
+from crews.memory_store import BoundedLTMStorage
+
+AGENTS = ["team_lead", "software_architect", "principal_software_engineer", "build_agent"]
+
+
+def fill(db_path: str, rows: int, tasks: int, seed: int = 0):
+    """Insert `rows` memories spread over `tasks` task descriptions and the last year."""
+    import sqlite3
+
+    rng = random.Random(seed)
+    now = time.time()
+    payload = "x" * 400
+    records = []
+    for i in range(rows):
+        agent = rng.choice(AGENTS)
+        metadata = {"suggestions": [payload], "quality": rng.randint(1, 10), "agent": agent,
+                    "expected_output": "A detailed report"}
+        records.append((f"Task {i % tasks}: modernize the module as described in the plan step",
+                        json.dumps(metadata), str(now - rng.uniform(0, 365 * 86400)),
+                        metadata["quality"], agent))
+    with sqlite3.connect(db_path) as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(long_term_memories)")}
+        if "agent" in columns:
+            conn.executemany("INSERT INTO long_term_memories (task_description, metadata, datetime, score, agent) "
+                             "VALUES (?, ?, ?, ?, ?)", records)
+        else:
+            conn.executemany("INSERT INTO long_term_memories (task_description, metadata, datetime, score) "
+                             "VALUES (?, ?, ?, ?)", [r[:4] for r in records])
+
+
+def time_recall(storage, tasks: int, queries: int, seed: int = 1) -> Dict[str, float]:
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    for _ in range(queries):
+        task = f"Task {rng.randrange(tasks)}: modernize the module as described in the plan step"
+        start = time.perf_counter()
+        storage.load(task, 2)
+        latencies.append(1000 * (time.perf_counter() - start))
+    ordered = sorted(latencies)
+    return {
+        "p50_ms": statistics.median(ordered),
+        "p95_ms": ordered[int(0.95 * (len(ordered) - 1))],
+        "max_ms": ordered[-1],
+    }
+
+
+def run(sizes: List[int], tasks: int, queries: int, max_rows: int) -> List[Dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            stock_db = str(Path(tmp) / f"stock_{size}.db")
+            bounded_db = str(Path(tmp) / f"bounded_{size}.db")
+
+            stock = LTMSQLiteStorage(db_path=stock_db)
+            fill(stock_db, size, tasks)
+            bounded = BoundedLTMStorage(db_path=bounded_db, max_rows=max_rows, max_age_days=None)
+            fill(bounded_db, size, tasks)
+
+            row = {"rows": size,
+                   "stock": time_recall(stock, tasks, queries),
+                   "bounded": time_recall(bounded, tasks, queries)}
+            start = time.perf_counter()
+            evicted = bounded.evict()
+            row["evict_s"] = time.perf_counter() - start
+            row["evicted_rows"] = evicted
+            row["bounded_after_evict"] = time_recall(bounded, tasks, queries)
+            row["db_mb_after_evict"] = Path(bounded_db).stat().st_size / 1e6
+            bounded.close()
+            results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark long-term memory recall latency against store size")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 10000, 100000])
+    parser.add_argument("--tasks", type=int, default=200, help="Distinct task descriptions")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--max-rows", type=int, default=5000, help="max_rows of the bounded store")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.tasks, args.queries, args.max_rows)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'rows':>8}  {'stock p50/p95 ms':>18}  {'bounded p50/p95 ms':>20}  {'after evict':>14}  {'evicted':>8}")
+    for r in results:
+        s, b, e = r["stock"], r["bounded"], r["bounded_after_evict"]
+        print(f"{r['rows']:>8}  {s['p50_ms']:>8.3f}/{s['p95_ms']:<9.3f}  {b['p50_ms']:>9.3f}/{b['p95_ms']:<10.3f}  "
+              f"{e['p50_ms']:>6.3f}/{e['p95_ms']:<7.3f}  {r['evicted_rows']:>8}")
+
+
+if __name__ == "__main__":
+    main()
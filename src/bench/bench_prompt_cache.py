@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark prompt-prefix reuse with and without the shared-context layout.
+
+Run from the src folder:
+
+    python -m bench.bench_prompt_cache
+    python -m bench.bench_prompt_cache --modules 6 --iterations 4 --json
+
+A synthetic Maven project (see bench/synthetic_codebase.py) is inventoried
+and statically analyzed like gen_docs.py does; then the calls of a
+documentation run are replayed against a MockProvider with its prefix
+cache (see llm/mock_provider.py): every task sends crewai's agent system
+prompt and task prompt, with the inventory and findings interpolated where
+the tasks.yaml descriptions put them, and goes through a few ReAct
+iterations. Two layouts are compared:
+
+  interpolated  the prompts as crewai builds them;
+  layout        the same calls inside shared_context() (llm/prompt_layout.py).
+
+For each: prompt tokens sent, tokens served from the cache, the hit rate
+(overall and per task) and the uncached tokens, which providers bill at the
+full price.
+"""
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+from bench.synthetic_codebase import SyntheticSpec, generate_project
+from llm.client import ScheduledMockLLM
+from llm.mock_provider import MockProvider
+from llm.prompt_layout import prompt_cache_stats, shared_context
+from llm.task_context import task_stack
+from tools.inventory_docs import collect_inventory, inventory_report
+from tools.static_analyzer_tool import StaticAnalyzerTool, findings_report
+
+# (task, agent, shared inputs its description interpolates), in the order of the documentation crew
+TASKS = [
+    ("generate_system_architecture", "documentation_agent", ["codebase_inventory"]),
+    ("generate_module_docs", "documentation_agent", []),
+    ("research_migration_best_practices", "domain_expert_agent", []),
+    ("impact_analysis_on_java21", "migration_agent", ["migration_findings"]),
+    ("plan_phased_module_extraction", "migration_agent", []),
+    ("plan_migration_roadmap", "migration_agent", []),
+    ("final_handover_and_summary", "documentation_agent", []),
+]
+TOOL_WORDS = "read parse list search resolve dependency module class package file folder report".split()
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(TOOL_WORDS) for _ in range(n))
+
+
+def system_prompt(agent: str, seed: int) -> str:
+    """An agent's system prompt as crewai renders it: role, backstory, goal, tools and the ReAct format."""
+    rng = random.Random(f"{agent}-{seed}")
+    tools = "\n".join(f"Tool Name: tool_{i}\nTool Arguments: {{'path': {{'type': 'str'}}}}\n"
+                      f"Tool Description: {_words(rng, 60)}" for i in range(5))
+    return (f"You are {agent}. {_words(rng, 120)}\nYour personal goal is: {_words(rng, 30)}\n"
+            f"You ONLY have access to the following tools, and should NEVER make up tools that are not listed here:\n\n"
+            f"{tools}\n\nIMPORTANT: Use the following format in your response:\n\n"
+            "```\nThought: you should always think about what to do\nAction: the action to take\n"
+            "Action Input: the input to the action\nObservation: the result of the action\n```")
+
+
+def run_layout(name: str, shared: Dict[str, str], iterations: int, seed: int) -> Dict:
+    provider = MockProvider(rpm=None, tpm=None, latency_s=0.0, seed=seed)
+    llm = ScheduledMockLLM(model="mock/bench", provider=provider)
+    prompt_cache_stats().reset()
+    rng = random.Random(seed)
+    context: List[str] = []
+
+    def one_run():
+        for task, agent, uses in TASKS:
+            description = f"Work on {task.replace('_', ' ')}. {_words(rng, 80)}"
+            for key in uses:
+                description += f"\n{shared[key]}"
+            messages = [
+                {"role": "system", "content": system_prompt(agent, seed)},
+                {"role": "user", "content": f"\nCurrent Task: {description}\n\n"
+                                            f"This is the context you're working with:\n{''.join(context)}\n\nBegin!"},
+            ]
+            task_stack().append(SimpleNamespace(name=task))
+            try:
+                for _ in range(iterations):
+                    answer = llm.call(messages)
+                    messages.append({"role": "assistant", "content": f"{answer}\nObservation: {_words(rng, 150)}"})
+            finally:
+                task_stack().pop()
+            context.append(f"\n{task}: {_words(rng, 200)}")
+
+    start = time.perf_counter()
+    if name == "layout":
+        with shared_context(shared):
+            one_run()
+    else:
+        one_run()
+    summary = prompt_cache_stats().summary()
+    total = summary["total"]
+    return {
+        "layout": name,
+        "wall_s": time.perf_counter() - start,
+        "calls": total["calls"],
+        "prompt_tokens": total["prompt_tokens"],
+        "cached_tokens": total["cached_tokens"],
+        "uncached_tokens": total["prompt_tokens"] - total["cached_tokens"],
+        "hit_rate": total["hit_rate"],
+        "tasks": {task: row["hit_rate"] for task, row in summary["tasks"].items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt-prefix reuse of the shared-context layout")
+    parser.add_argument("--modules", type=int, default=4)
+    parser.add_argument("--classes", type=int, default=25, help="Classes per module")
+    parser.add_argument("--iterations", type=int, default=3, help="ReAct iterations (LLM calls) per task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="reforge-bench-")
+    try:
+        generate_project(workdir, SyntheticSpec(modules=args.modules, classes_per_module=args.classes))
+        shared = {
+            "codebase_inventory": inventory_report(collect_inventory(workdir)),
+            "migration_findings": findings_report(StaticAnalyzerTool(code_path=workdir).analyze()),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = [run_layout(name, shared, args.iterations, args.seed) for name in ("interpolated", "layout")]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    fmt = lambda v: f"{v:.0%}"
+    print(f"shared context: {sum(len(v) for v in shared.values()) // 4} tokens")
+    print(f"{'layout':>12}  {'calls':>5}  {'prompt tok':>10}  {'cached tok':>10}  {'uncached':>9}  {'hit rate':>8}")
+    for r in results:
+        print(f"{r['layout']:>12}  {r['calls']:>5}  {r['prompt_tokens']:>10}  {r['cached_tokens']:>10}  "
+              f"{r['uncached_tokens']:>9}  {fmt(r['hit_rate']):>8}")
+    print("\nhit rate per task:")
+    for task, _, _ in TASKS:
+        print(f"  {task:<36} " + "  ".join(f"{r['layout']} {fmt(r['tasks'].get(task, 0.0))}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
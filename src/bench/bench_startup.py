@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the entry points and crew modules.
+
+Run from the src folder:
+
+    python -m bench.bench_startup
+    python -m bench.bench_startup --top 20 gen_docs
+
+Each target is imported in a fresh interpreter with `-X importtime`; the
+fastest of a few runs is compared against the budget in
+bench/startup_budget.json. The check fails (exit status 1) when a target
+is over budget or pulls in a module it must not import eagerly.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BUDGET_FILE = Path(__file__).parent / "startup_budget.json"
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Return (module, self_us, cumulative_us, depth) for every import."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        self_us, cumulative_us, raw_name = int(parts[0]), int(parts[1]), parts[2]
+        stripped = raw_name.lstrip(" ")
+        depth = (len(raw_name) - len(stripped) - 1) // 2
+        entries.append((stripped.strip(), self_us, cumulative_us, depth))
+    return entries
+
+
+def measure(target: str) -> Dict:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="0")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=SRC_DIR, capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing '{target}' failed:\n{result.stderr.strip()[-2000:]}")
+    entries = parse_importtime(result.stderr)
+    total_us = sum(cumulative for _, _, cumulative, depth in entries if depth == 0)
+    return {"total_s": total_us / 1e6, "modules": entries}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check entry-point import times against a budget")
+    parser.add_argument("targets", nargs="*", help="Modules to check (default: all in the budget file)")
+    parser.add_argument("--budget-file", default=str(BUDGET_FILE))
+    parser.add_argument("--top", type=int, default=10, help="Show the N slowest imports per target")
+    args = parser.parse_args()
+
+    config = json.loads(Path(args.budget_file).read_text())
+    targets = args.targets or list(config["targets"])
+    failures = []
+
+    for target in targets:
+        spec = config["targets"].get(target, {})
+        runs = [measure(target) for _ in range(config.get("repeat", 1))]
+        best = min(runs, key=lambda r: r["total_s"])
+        imported = {name for name, _, _, _ in best["modules"]}
+
+        budget = spec.get("budget_s")
+        forbidden = [m for m in spec.get("forbid", []) if m in imported]
+        over = budget is not None and best["total_s"] > budget
+        status = "❌" if over or forbidden else "✅"
+        budget_text = f" (budget {budget:.2f}s)" if budget is not None else ""
+        print(f"{status} {target}: {best['total_s']:.2f}s, {len(imported)} modules{budget_text}")
+
+        slowest = sorted(best["modules"], key=lambda e: e[2], reverse=True)
+        shown = [e for e in slowest if e[0] != target][:args.top]
+        for name, self_us, cumulative_us, depth in shown:
+            print(f"     {cumulative_us / 1e3:>9.1f} ms  {'  ' * depth}{name}")
+
+        if over:
+            failures.append(f"{target} took {best['total_s']:.2f}s, budget is {budget:.2f}s")
+        for module in forbidden:
+            failures.append(f"{target} eagerly imports '{module}'")
+
+    if failures:
+        print("\nStartup budget exceeded:")
+        for failure in failures:
+            print("   " + failure)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
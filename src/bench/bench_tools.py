@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Benchmark the custom tools against synthetic Maven projects.
+
+Run from the src folder:
+
+    python -m bench.bench_tools --modules 10 --classes 50 --save-baseline main
+    python -m bench.bench_tools --modules 10 --classes 50 --compare main
+
+Every case runs in a fresh child process so the reported peak RSS belongs
+to that case alone. Results are printed as a table and can be saved as a
+JSON baseline under bench/baselines/; --compare exits with status 1 when a
+case got slower (or fatter) than the baseline by more than --threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from bench.synthetic_codebase import SyntheticSpec, generate_project, generate_jdeps_output
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _java_files(root: str) -> List[Path]:
+    return sorted(Path(root).rglob("*.java"))
+
+
+# ────────── Cases ──────────
+# Each case receives the project root, does its imports and setup, and
+# returns a zero-argument callable that does the measured work and returns
+# the number of items it processed (or (items, per-item latencies)).
+
+def case_code_parser(root: str) -> Callable:
+    from tools.code_parser import CodeParserTool
+    tool = CodeParserTool()
+    return lambda: (tool._run(code_path=root), len(_java_files(root)))[1]
+
+
+def case_javalang_per_file(root: str) -> Callable:
+    import javalang
+    sources = [f.read_text(encoding="utf-8", errors="ignore") for f in _java_files(root)]
+
+    def run():
+        latencies = []
+        for source in sources:
+            start = time.perf_counter()
+            javalang.parse.parse(source)
+            latencies.append(time.perf_counter() - start)
+        return len(sources), latencies
+    return run
+
+
+def case_db_parser(root: str) -> Callable:
+    from tools.db_parser import DBParserTool
+    tool = DBParserTool()
+    return lambda: (tool._run(code_path=root), len(_java_files(root)))[1]
+
+
+def case_resolve_build_file(root: str) -> Callable:
+    from tools.dependency_mapper import resolve_build_file
+    return lambda: (resolve_build_file(root), 1)[1]
+
+
+def case_resolve_target_path(root: str) -> Callable:
+    from tools.jdeps_tool import resolve_target_path
+    return lambda: (resolve_target_path(root), 1)[1]
+
+
+def case_parse_jdeps_output(root: str) -> Callable:
+    from tools.jdeps_tool import parse_jdeps_output
+    classes = []
+    for java_file in _java_files(root):
+        parts = java_file.with_suffix("").parts
+        classes.append(".".join(parts[parts.index("java") + 1:]))
+    # inflate the report so parsing dominates the measurement
+    output = generate_jdeps_output(classes) * 50
+    return lambda: (parse_jdeps_output(output), len(output.splitlines()))[1]
+
+
+def case_dependency_mapper(root: str) -> Callable:
+    from tools.dependency_mapper import DependencyMapperTool
+    tool = DependencyMapperTool()
+    return lambda: (tool._run(code_path=root), 1)[1]
+
+
+def case_jdeps(root: str) -> Callable:
+    from tools.jdeps_tool import JDepsTool
+    tool = JDepsTool(base_path=root)
+    return lambda: (tool._run(), 1)[1]
+
+
+def case_maven_build(root: str) -> Callable:
+    from tools.maven_build_tool import MavenBuildTool
+    tool = MavenBuildTool(base_path=root)
+    return lambda: (tool._run(), 1)[1]
+
+
+def case_source_index(root: str) -> Callable:
+    from tools.java_source_index import JavaSourceIndex
+
+    def run():
+        index = JavaSourceIndex(root)
+        index.refresh()
+        index.dependents(list(index.files)[:1])
+        return len(index.files)
+    return run
+
+
+def case_chunk_index(root: str) -> Callable:
+    # cold: every file chunked into a fresh index
+    from tools.java_chunk_index import JavaChunkIndex
+
+    def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            index = JavaChunkIndex(root, db_path=os.path.join(tmp, "chunks.db"))
+            result = index.refresh()
+            index.close()
+        return result["chunked"]
+    return run
+
+
+def case_java_check(root: str) -> Callable:
+    # one edited file plus its dependents, against a compile server warmed by a first check
+    from tools.java_check_tool import JavaCheckTool
+    tool = JavaCheckTool(base_path=root)
+    edited = str(_java_files(root)[0])
+    os.utime(edited)
+    tool._run()
+
+    def run():
+        os.utime(edited)
+        result = tool._run()
+        return len(result["checked"]) + len(result.get("dependents", []))
+    return run
+
+
+def case_static_analyzer(root: str) -> Callable:
+    # cold: every file analyzed (on the process pool for large projects); the per-file cache is dropped first
+    from tools.static_analyzer_tool import StaticAnalyzerTool
+    tool = StaticAnalyzerTool(code_path=root)
+
+    def run():
+        tool._cache_file(Path(root).resolve()).unlink(missing_ok=True)
+        return tool.analyze()["files"]
+    return run
+
+
+# name -> (function, required executable or None)
+CASES: Dict[str, Tuple[Callable, str]] = {
+    "code_parser": (case_code_parser, None),
+    "javalang_per_file": (case_javalang_per_file, None),
+    "db_parser": (case_db_parser, None),
+    "resolve_build_file": (case_resolve_build_file, None),
+    "resolve_target_path": (case_resolve_target_path, None),
+    "parse_jdeps_output": (case_parse_jdeps_output, None),
+    "dependency_mapper": (case_dependency_mapper, "mvn"),
+    "jdeps": (case_jdeps, "jdeps"),
+    "maven_build": (case_maven_build, "mvn"),
+    "source_index": (case_source_index, None),
+    "chunk_index": (case_chunk_index, None),
+    "java_check": (case_java_check, "javac"),
+    "static_analyzer": (case_static_analyzer, None),
+}
+
+
+def _run_case(name: str, root: str, project_bytes: int) -> Dict:
+    """Child-process entry point: run one case and measure it."""
+    setup, _ = CASES[name]
+    fn = setup(root)
+    rss_before = _peak_rss_mb()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    outcome = fn()
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    latencies = None
+    if isinstance(outcome, tuple):
+        items, latencies = outcome
+    else:
+        items = outcome
+
+    result = {
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "items": items,
+        "items_per_s": items / wall if wall else None,
+        "mb_per_s": (project_bytes / 1e6) / wall if wall else None,
+        "per_item_ms": 1000 * wall / items if items else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": _peak_rss_mb() - rss_before,
+    }
+    if latencies:
+        ordered = sorted(latencies)
+        result["per_file_ms"] = {
+            "p50": 1000 * statistics.median(ordered),
+            "p95": 1000 * ordered[int(0.95 * (len(ordered) - 1))],
+            "max": 1000 * ordered[-1],
+        }
+    return result
+
+
+def run_benchmarks(root: str, project_bytes: int, selected: List[str], repeat: int) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    ctx = get_context("spawn")
+    for name in selected:
+        _, executable = CASES[name]
+        if executable and shutil.which(executable) is None:
+            results[name] = {"skipped": f"'{executable}' not on PATH"}
+            continue
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                runs.append(pool.submit(_run_case, name, root, project_bytes).result())
+        # keep the fastest run; the peak RSS is the worst one seen
+        best = min(runs, key=lambda r: r["wall_s"])
+        best["peak_rss_mb"] = max(r["peak_rss_mb"] for r in runs)
+        best["runs"] = repeat
+        results[name] = best
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    for name, current in results.items():
+        previous = baseline["results"].get(name)
+        if not previous or "skipped" in current or "skipped" in previous:
+            continue
+        for metric in ("wall_s", "peak_rss_mb"):
+            if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name}.{metric}: {previous[metric]:.3f} -> {current[metric]:.3f} "
+                    f"(+{100 * (current[metric] / previous[metric] - 1):.0f}%)"
+                )
+    return regressions
+
+
+def _print_table(results: Dict[str, Dict]):
+    print(f"{'case':<22}{'wall s':>10}{'items/s':>12}{'MB/s':>10}{'ms/item':>10}{'peak MB':>10}")
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:<22}  skipped: {r['skipped']}")
+            continue
+        print(f"{name:<22}{r['wall_s']:>10.3f}{r['items_per_s']:>12.1f}{r['mb_per_s']:>10.2f}"
+              f"{r['per_item_ms']:>10.3f}{r['peak_rss_mb']:>10.1f}")
+        if "per_file_ms" in r:
+            p = r["per_file_ms"]
+            print(f"{'':<22}per file ms: p50={p['p50']:.2f} p95={p['p95']:.2f} max={p['max']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ReforgeAI tools on a synthetic codebase")
+    parser.add_argument("--modules", type=int, default=SyntheticSpec.modules)
+    parser.add_argument("--classes", type=int, default=SyntheticSpec.classes_per_module,
+                        help="Classes per module")
+    parser.add_argument("--methods", type=int, default=SyntheticSpec.methods_per_class,
+                        help="Methods per class")
+    parser.add_argument("--sql", type=int, default=SyntheticSpec.sql_per_repository,
+                        help="SQL statements per repository class")
+    parser.add_argument("--large-files", type=int, default=SyntheticSpec.large_files)
+    parser.add_argument("--large-file-lines", type=int, default=SyntheticSpec.large_file_lines)
+    parser.add_argument("--seed", type=int, default=SyntheticSpec.seed)
+    parser.add_argument("--cases", nargs="*", choices=sorted(CASES), default=list(CASES),
+                        help="Subset of cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case, fastest is kept")
+    parser.add_argument("--workdir", help="Where to generate the project (default: a temp dir)")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Save results as bench/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against bench/baselines/NAME.json")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown before a case counts as a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(args.modules, args.classes, args.methods, args.sql,
+                         args.large_files, args.large_file_lines, args.seed)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="reforge-bench-")
+    try:
+        summary = generate_project(os.path.join(workdir, "project"), spec)
+        print(f"🏗️  Generated {summary['files']} files / {summary['lines']} lines in {summary['root']}")
+
+        results = run_benchmarks(summary["root"], summary["bytes"], args.cases, args.repeat)
+        _print_table(results)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "spec": asdict(spec),
+        "project": {k: summary[k] for k in ("files", "lines", "bytes")},
+        "env": {"python": platform.python_version(), "platform": platform.platform(),
+                "cpus": os.cpu_count()},
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        out_file = BASELINE_DIR / f"{args.save_baseline}.json"
+        out_file.write_text(json.dumps(report, indent=2))
+        print(f"💾 Baseline saved to {out_file}")
+
+    if args.compare:
+        baseline = json.loads((BASELINE_DIR / f"{args.compare}.json").read_text())
+        if baseline["spec"] != report["spec"]:
+            print("⚠️  Baseline was recorded with a different spec; numbers are not comparable.")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for line in regressions:
+                print("   " + line)
+            sys.exit(1)
+        print("✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Deterministic generator of synthetic multi-module Maven projects.
+
+The generated tree looks like a typical legacy Java EE codebase: a parent
+aggregator pom.xml, N modules with their own pom.xml, model/repository/
+service/web classes that import each other, repositories with embedded SQL
+and, optionally, a few multi-thousand-line "god classes". Empty
+target/classes/*.class files are written as well so resolve_target_path
+has something to find.
+
+The same parameters and seed always produce byte-identical output.
+"""
+import argparse
+import json
+import random
+import shutil
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List
+
+LAYERS = ["model", "repository", "service", "web"]
+
+_SQL_TEMPLATES = [
+    'SELECT {cols} FROM {table} WHERE id = ?',
+    'SELECT {cols} FROM {table} t JOIN {other} o ON o.id = t.{other}_id WHERE t.status = ?',
+    'INSERT INTO {table} ({cols}) VALUES ({params})',
+    'UPDATE {table} SET {col} = ? WHERE id = ?',
+    'DELETE FROM {table} WHERE id = ?',
+]
+
+_FIELD_TYPES = ["String", "Long", "Integer", "java.util.Date", "java.math.BigDecimal", "boolean"]
+
+
+@dataclass
+class SyntheticSpec:
+    modules: int = 3
+    classes_per_module: int = 20
+    methods_per_class: int = 8
+    sql_per_repository: int = 4
+    large_files: int = 1
+    large_file_lines: int = 3000
+    seed: int = 42
+
+
+def _pom(artifact_id: str, packaging: str, modules: List[str] = None, parent: bool = True) -> str:
+    parent_block = (
+        "  <parent>\n"
+        "    <groupId>com.synthetic</groupId>\n"
+        "    <artifactId>synthetic-parent</artifactId>\n"
+        "    <version>1.0.0-SNAPSHOT</version>\n"
+        "  </parent>\n"
+    ) if parent else ""
+    modules_block = ""
+    if modules:
+        modules_block = "  <modules>\n" + "".join(
+            f"    <module>{m}</module>\n" for m in modules
+        ) + "  </modules>\n"
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<project xmlns="http://maven.apache.org/POM/4.0.0">\n'
+        "  <modelVersion>4.0.0</modelVersion>\n"
+        f"{parent_block}"
+        "  <groupId>com.synthetic</groupId>\n"
+        f"  <artifactId>{artifact_id}</artifactId>\n"
+        "  <version>1.0.0-SNAPSHOT</version>\n"
+        f"  <packaging>{packaging}</packaging>\n"
+        f"{modules_block}"
+        "  <dependencies>\n"
+        "    <dependency>\n"
+        "      <groupId>jakarta.platform</groupId>\n"
+        "      <artifactId>jakarta.jakartaee-api</artifactId>\n"
+        "      <version>8.0.0</version>\n"
+        "      <scope>provided</scope>\n"
+        "    </dependency>\n"
+        "  </dependencies>\n"
+        "</project>\n"
+    )
+
+
+def _sql(rng: random.Random, table: str, other: str) -> str:
+    cols = [f"col_{i}" for i in range(rng.randint(2, 5))]
+    template = rng.choice(_SQL_TEMPLATES)
+    return template.format(
+        cols=", ".join(cols),
+        col=cols[0],
+        table=table,
+        other=other,
+        params=", ".join("?" for _ in cols),
+    )
+
+
+def _method(rng: random.Random, name: str, sql: str = None) -> List[str]:
+    body: List[str] = []
+    if sql:
+        body.append(f'        String query = "{sql}";')
+        body.append("        return query.length() + arg0.hashCode();")
+    else:
+        body.append("        int acc = arg0 == null ? 0 : arg0.hashCode();")
+        for i in range(rng.randint(1, 4)):
+            body.append(f"        acc = acc * 31 + {rng.randint(1, 997)};")
+        body.append("        return acc;")
+    return [
+        f"    public int {name}(String arg0, Long arg1) {{",
+        *body,
+        "    }",
+        "",
+    ]
+
+
+def _class_source(rng: random.Random, spec: SyntheticSpec, pkg: str, layer: str,
+                  name: str, imports: List[str], table: str, other_table: str,
+                  min_lines: int = 0) -> str:
+    lines = [f"package {pkg}.{layer};", ""]
+    lines += [f"import {imp};" for imp in imports]
+    lines += ["import java.util.List;", "import java.util.ArrayList;", ""]
+    if layer == "model":
+        lines.append("@javax.persistence.Entity")
+    lines.append(f"public class {name} {{")
+    lines.append("")
+    for i, field_type in enumerate(rng.sample(_FIELD_TYPES, 3)):
+        lines.append(f"    private {field_type} field{i};")
+    for imp in imports:
+        simple = imp.rsplit(".", 1)[1]
+        lines.append(f"    private {simple} {simple[0].lower()}{simple[1:]};")
+    lines.append("")
+
+    method_index = 0
+    sql_left = spec.sql_per_repository if layer == "repository" else 0
+    while method_index < spec.methods_per_class or len(lines) < min_lines:
+        sql = _sql(rng, table, other_table) if sql_left > 0 else None
+        sql_left -= 1
+        lines += _method(rng, f"op{method_index}", sql)
+        method_index += 1
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_project(root: str, spec: SyntheticSpec) -> Dict:
+    """
+    Write a synthetic Maven project under `root` (wiped first) and return
+    a summary of what was generated.
+    """
+    rng = random.Random(spec.seed)
+    root_path = Path(root)
+    if root_path.exists():
+        shutil.rmtree(root_path)
+    root_path.mkdir(parents=True)
+
+    module_names = [f"module-{i}" for i in range(spec.modules)]
+    (root_path / "pom.xml").write_text(_pom("synthetic-parent", "pom", module_names, parent=False))
+
+    summary = {"root": str(root_path.resolve()), "files": 0, "lines": 0, "bytes": 0,
+               "classes": [], "large_files": []}
+    large_left = spec.large_files
+
+    for m, module in enumerate(module_names):
+        module_dir = root_path / module
+        pkg = f"com.synthetic.mod{m}"
+        (module_dir).mkdir()
+        (module_dir / "pom.xml").write_text(_pom(module, "jar"))
+
+        created: Dict[str, List[str]] = {layer: [] for layer in LAYERS}
+        for c in range(spec.classes_per_module):
+            layer = LAYERS[c % len(LAYERS)]
+            # the module in the name: a class importing Model0 of the previous module may not
+            # declare or import another Model0 (javac rejects the clash, javalang does not)
+            name = f"Mod{m}{layer.capitalize()}{c}"
+            # import a couple of classes from the layer below (and, now and
+            # then, a model class of the previous module) to build a graph
+            imports: List[str] = []
+            below = LAYERS[LAYERS.index(layer) - 1] if layer != "model" else None
+            if below and created[below]:
+                imports += rng.sample(created[below], min(2, len(created[below])))
+            if m > 0 and rng.random() < 0.3:
+                imports.append(f"com.synthetic.mod{m - 1}.model.Mod{m - 1}Model0")
+
+            min_lines = 0
+            if large_left > 0 and layer == "service":
+                min_lines = spec.large_file_lines
+                large_left -= 1
+
+            table = f"tbl_{m}_{c % 7}"
+            other_table = f"tbl_{rng.randrange(spec.modules)}_{rng.randrange(7)}"
+            source = _class_source(rng, spec, pkg, layer, name, imports, table, other_table, min_lines)
+
+            java_file = module_dir / "src/main/java" / pkg.replace(".", "/") / layer / f"{name}.java"
+            java_file.parent.mkdir(parents=True, exist_ok=True)
+            java_file.write_text(source)
+            class_file = module_dir / "target/classes" / pkg.replace(".", "/") / layer / f"{name}.class"
+            class_file.parent.mkdir(parents=True, exist_ok=True)
+            class_file.write_bytes(b"")
+
+            fqcn = f"{pkg}.{layer}.{name}"
+            created[layer].append(fqcn)
+            summary["classes"].append(fqcn)
+            summary["files"] += 1
+            summary["lines"] += source.count("\n")
+            summary["bytes"] += len(source.encode("utf-8"))
+            if min_lines:
+                summary["large_files"].append(str(java_file))
+
+    return summary
+
+
+def generate_jdeps_output(classes: List[str], seed: int = 42) -> str:
+    """
+    Produce text in the shape of `jdeps -R <dir>` output for the given
+    classes, sprinkled with 'not found' and 'JDK internal API' lines.
+    """
+    rng = random.Random(seed)
+    packages = sorted({fqcn.rsplit(".", 1)[0] for fqcn in classes})
+    lines = ["classes -> java.base", "classes -> java.sql", "classes -> not found"]
+    for pkg in packages:
+        for target in ("java.lang", "java.util", "javax.persistence", "javax.ws.rs"):
+            module = "java.base" if target.startswith("java.") else "not found"
+            lines.append(f"   {pkg:<50} -> {target:<40} {module}")
+        if rng.random() < 0.2:
+            lines.append(f"   {pkg:<50} -> {'sun.misc':<40} JDK internal API (jdk.unsupported)")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic multi-module Maven project")
+    parser.add_argument("output", help="Directory to write the project to (wiped first)")
+    parser.add_argument("--modules", type=int, default=SyntheticSpec.modules)
+    parser.add_argument("--classes", type=int, default=SyntheticSpec.classes_per_module,
+                        help="Classes per module")
+    parser.add_argument("--methods", type=int, default=SyntheticSpec.methods_per_class,
+                        help="Methods per class")
+    parser.add_argument("--sql", type=int, default=SyntheticSpec.sql_per_repository,
+                        help="SQL statements per repository class")
+    parser.add_argument("--large-files", type=int, default=SyntheticSpec.large_files)
+    parser.add_argument("--large-file-lines", type=int, default=SyntheticSpec.large_file_lines)
+    parser.add_argument("--seed", type=int, default=SyntheticSpec.seed)
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(args.modules, args.classes, args.methods, args.sql,
+                         args.large_files, args.large_file_lines, args.seed)
+    summary = generate_project(args.output, spec)
+    summary.pop("classes")
+    print(json.dumps({"spec": asdict(spec), **summary}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
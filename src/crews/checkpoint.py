@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Task-level checkpoints for crew runs.
+
+Every task that completes is written to <root>/<task name>.json together
+with the agent steps that produced it, a hash of its task config, the
+kickoff inputs it interpolates and the outputs of its upstream tasks (its
+explicit `context`, or every earlier task when no context is set, as
+crewai does), and the dependencies read off its tool calls, each with a
+content hash:
+
+  file      a file an agent read (source, KB document, ...);
+  listing   a directory an agent listed (the names of its files);
+  tree      a directory a code-analysis tool worked on (every file's
+            content); a tool called without a path works on `sources`;
+  tool      the result of a tool with no local input (web search), taken
+            as still valid.
+
+On resume, a task whose hash still matches and whose dependencies are all
+unchanged is not run again: its stored output is put back on the task (and
+its output file rewritten if it is gone) and fed downstream as context.
+<root>/manifest.json lists, for every task of the last run, whether it was
+reused or regenerated and what it was derived from.
+
+    checkpoints = TaskCheckpoints("1-documentation/state/checkpoints/documentation",
+                                  sources=[codebase_path])
+    state = checkpoints.kickoff(crew, inputs, resume=True)
+"""
+import ast
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from crewai import Crew, Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.types.usage_metrics import UsageMetrics
+from crewai.utilities.constants import NOT_SPECIFIED
+
+PLACEHOLDER = re.compile(r"\{([A-Za-z_][\w\-]*)\}")
+# tools whose result only depends on the names of the files in a folder
+LISTING_TOOLS = {"List files in directory"}
+# the coworker's own tool calls are traced as well
+COWORKER_TOOLS = {"Delegate work to coworker", "Ask question to coworker"}
+SKIP_DIRS = {".git", "target", "build", "node_modules", ".idea", ".gradle", "__pycache__"}
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _walk(root: str):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            yield os.path.join(dirpath, name)
+
+
+def _listing_digest(path: str) -> Optional[str]:
+    if not os.path.isdir(path):
+        return None
+    return _digest([os.path.relpath(p, path) for p in _walk(path)])
+
+
+def _tree_digest(path: str) -> Optional[str]:
+    if not os.path.isdir(path):
+        return None
+    return _digest([(os.path.relpath(p, path), _file_digest(p)) for p in _walk(path)])
+
+
+def _tool_paths(tool_input: Any) -> List[str]:
+    """Absolute paths of the existing files and folders named in a tool call's arguments."""
+    args: Any = tool_input
+    if isinstance(tool_input, str):
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                args = parse(tool_input)
+                break
+            except (ValueError, SyntaxError):
+                continue
+    values = args.values() if isinstance(args, dict) else [args]
+    found = []
+    for value in values:
+        if isinstance(value, str) and value.strip() and os.path.exists(value.strip()):
+            found.append(os.path.abspath(value.strip()))
+    return found
+
+
+def _trace_entry(step: Any) -> Dict[str, Any]:
+    """Flatten an AgentAction / AgentFinish / ToolResult into JSON-friendly fields."""
+    entry: Dict[str, Any] = {"type": type(step).__name__, "at": time.time()}
+    for field in ("thought", "tool", "tool_input", "result", "output", "text"):
+        value = getattr(step, field, None)
+        if value is not None:
+            entry[field] = value if isinstance(value, (str, int, float, bool)) else str(value)
+    return entry
+
+
+class TaskCheckpoints:
+    def __init__(self, root: str, sources: Optional[List[str]] = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.sources = [os.path.abspath(s) for s in sources or []]
+        self._config: Dict[str, str] = {}
+        self._upstream: Dict[str, List[Task]] = {}
+        self._uses: Dict[str, List[str]] = {}
+        self._output_files: Dict[str, Optional[str]] = {}
+        self._trace: List[Dict[str, Any]] = []
+        self._inputs: Dict[str, Any] = {}
+        self._digests: Dict[Tuple[str, str], Optional[str]] = {}
+        self._status: Dict[str, str] = {}
+
+    # ────────── Hashing ──────────
+    def _prepare(self, tasks: List[Task], inputs: Dict[str, Any]):
+        """Capture each task's config, used inputs and upstream tasks before kickoff interpolates or plans them."""
+        self._inputs = dict(inputs)
+        self._digests = {}
+        self._status = {}
+        for index, task in enumerate(tasks):
+            agent = task.agent
+            templates = [task.description, task.expected_output, task.output_file or ""]
+            if agent is not None:
+                templates += [agent.role, agent.goal, agent.backstory]
+            self._uses[task.name] = sorted({name for text in templates for name in PLACEHOLDER.findall(text or "")}
+                                           & set(self._inputs))
+            self._output_files[task.name] = (PLACEHOLDER.sub(lambda m: str(self._inputs.get(m.group(1), m.group(0))),
+                                                             task.output_file) if task.output_file else None)
+            self._config[task.name] = _digest({
+                "description": task.description,
+                "expected_output": task.expected_output,
+                "agent": task.agent.role if task.agent else None,
+                "output_file": task.output_file,
+            })
+            if task.context is NOT_SPECIFIED:
+                self._upstream[task.name] = tasks[:index]
+            else:
+                self._upstream[task.name] = list(task.context or [])
+
+    def task_hash(self, task: Task) -> Optional[str]:
+        """Hash of the task's inputs; None while an upstream task has no output."""
+        upstream = self._upstream[task.name]
+        if any(t.output is None for t in upstream):
+            return None
+        return _digest({
+            "task": self._config[task.name],
+            # only the inputs the task interpolates: a new value of another input does not concern it
+            "inputs": {name: self._inputs[name] for name in self._uses[task.name]},
+            "upstream": [_digest(t.output.raw) for t in upstream],
+        })
+
+    # ────────── Dependencies ──────────
+    def _current(self, kind: str, path: str) -> Optional[str]:
+        """Content hash of a dependency now (memoized until the next save(): restore() checks many
+        tasks against the same files before kickoff, while the agents write files during it)."""
+        key = (kind, path)
+        if key not in self._digests:
+            digest = {"file": _file_digest, "listing": _listing_digest, "tree": _tree_digest}[kind]
+            self._digests[key] = digest(path)
+        return self._digests[key]
+
+    def dependencies(self, task: Task) -> List[Dict[str, Any]]:
+        """What the traced steps of `task` read, with content hashes."""
+        found: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for step in self._trace:
+            tool = step.get("tool")
+            if not tool or tool in COWORKER_TOOLS:
+                continue
+            paths = _tool_paths(step.get("tool_input"))
+            if paths:
+                for path in paths:
+                    kind = "file" if os.path.isfile(path) else ("listing" if tool in LISTING_TOOLS else "tree")
+                    found[(kind, path)] = {"kind": kind, "path": path, "sha256": self._current(kind, path)}
+            elif "search" in tool.lower() or not self.sources:
+                found[("tool", f"{tool}:{step.get('tool_input')}")] = {
+                    "kind": "tool", "tool": tool, "input": step.get("tool_input"),
+                    "sha256": _digest(step.get("result"))}
+            else:
+                for path in self.sources:
+                    found[("tree", path)] = {"kind": "tree", "path": path, "sha256": self._current("tree", path)}
+        return [found[key] for key in sorted(found)]
+
+    def changed(self, record: Dict[str, Any]) -> List[str]:
+        """The dependencies of a stored task that no longer hash the same."""
+        changed = []
+        for dep in record.get("dependencies", []):
+            if dep["kind"] != "tool" and self._current(dep["kind"], dep["path"]) != dep["sha256"]:
+                changed.append(dep["path"])
+        return changed
+
+    # ────────── Storage ──────────
+    def path(self, task_name: str) -> Path:
+        return self.root / f"{task_name}.json"
+
+    def load(self, task_name: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self.path(task_name).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save(self, task: Task, output: TaskOutput):
+        # earlier tasks of this kickoff may have written the files this one read
+        self._digests = {}
+        record = {
+            "task": task.name,
+            "hash": self.task_hash(task),
+            "saved_at": time.time(),
+            "output_file": self._output_files.get(task.name),
+            "inputs": {name: _digest(self._inputs[name]) for name in self._uses.get(task.name, [])},
+            "upstream": [t.name for t in self._upstream.get(task.name, [])],
+            "dependencies": self.dependencies(task),
+            "output": output.model_dump(mode="json", exclude={"pydantic"}),
+            "trace": self._trace,
+        }
+        self._trace = []
+        tmp = self.path(task.name).with_suffix(".tmp")
+        tmp.write_text(json.dumps(record, indent=2, default=str))
+        os.replace(tmp, self.path(task.name))
+
+    # ────────── Callbacks ──────────
+    def _task_callback(self, task: Task, chained: Optional[Callable]) -> Callable:
+        def callback(output: TaskOutput):
+            self.save(task, output)
+            self._status[task.name] = "regenerated"
+            if chained:
+                chained(output)
+        return callback
+
+    def _step_callback(self, chained: Optional[Callable]) -> Callable:
+        def callback(step: Any):
+            self._trace.append(_trace_entry(step))
+            if chained:
+                chained(step)
+        return callback
+
+    # ────────── Run ──────────
+    def restore(self, tasks: List[Task]) -> List[Task]:
+        """Put stored outputs back on every task whose hash and dependencies still match; return those tasks."""
+        restored = []
+        for task in tasks:
+            record = self.load(task.name)
+            expected = self.task_hash(task)
+            if record is None or expected is None or record.get("hash") != expected:
+                continue
+            changed = self.changed(record)
+            if changed:
+                print(f"🔁 Task '{task.name}' depends on changed files: {', '.join(changed[:3])}"
+                      + (f" (+{len(changed) - 3})" if len(changed) > 3 else ""))
+                continue
+            task.output = TaskOutput(**record["output"])
+            output_file = self._output_files.get(task.name)
+            if output_file and not os.path.exists(output_file):
+                os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+                Path(output_file).write_text(task.output.raw)
+            restored.append(task)
+        return restored
+
+    def save_manifest(self, tasks: List[Task]):
+        """<root>/manifest.json: per task, reused or regenerated, its output file and what it was derived from."""
+        manifest = {"saved_at": time.time(), "tasks": []}
+        for task in tasks:
+            record = self.load(task.name) or {}
+            manifest["tasks"].append({
+                "task": task.name,
+                "status": self._status.get(task.name, "not run"),
+                "output_file": self._output_files.get(task.name),
+                "inputs": record.get("inputs", {}),
+                "upstream": record.get("upstream", []),
+                "dependencies": record.get("dependencies", []),
+            })
+        tmp = self.root / "manifest.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2, default=str))
+        os.replace(tmp, self.root / "manifest.json")
+
+    def kickoff(self, crew: Crew, inputs: Dict[str, Any], resume: bool = False) -> CrewOutput:
+        """Run the crew, checkpointing every task; with resume, skip tasks whose inputs are unchanged."""
+        tasks = list(crew.tasks)
+        self._prepare(tasks, inputs)
+
+        skipped = self.restore(tasks) if resume else []
+        remaining = [t for t in tasks if all(t is not s for s in skipped)]
+        for task in skipped:
+            print(f"⏭️  Task '{task.name}' unchanged, reusing its checkpoint.")
+            self._status[task.name] = "reused"
+
+        if skipped:
+            # crewai only passes outputs of tasks run in this kickoff as implicit
+            # context, so name the upstream tasks (stored or not) explicitly
+            for task in remaining:
+                if task.context is NOT_SPECIFIED:
+                    task.context = self._upstream[task.name]
+            crew.tasks = remaining
+
+        for task in remaining:
+            # crewai still calls crew.task_callback itself, so only chain the task's own
+            task.callback = self._task_callback(task, task.callback)
+        crew.step_callback = self._step_callback(crew.step_callback)
+        if crew.manager_agent and not crew.manager_agent.step_callback:
+            crew.manager_agent.step_callback = crew.step_callback
+
+        if remaining:
+            result = crew.kickoff(inputs)
+            token_usage = result.token_usage
+        else:
+            result, token_usage = None, UsageMetrics()
+
+        self.save_manifest(tasks)
+        outputs = [t.output for t in tasks if t.output is not None]
+        final = result or outputs[-1]
+        return CrewOutput(
+            raw=final.raw,
+            pydantic=final.pydantic,
+            json_dict=final.json_dict,
+            tasks_output=outputs,
+            token_usage=token_usage,
+        )
@@ -2,18 +2,16 @@
 # src/documentation_crew.py
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
-from crewai import Agent, Crew, Process, Task, LLM
+from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from numpy.distutils.lib2def import output_def
-from onnxruntime.transformers.benchmark_helper import output_fusion_statistics
-from openpyxl.styles.builtins import output
-
-from tools.code_parser       import CodeParserTool
-from tools.dependency_mapper import DependencyMapperTool
-from tools.jdeps_tool        import JDepsTool
-from crewai_tools            import SerperDevTool, DirectoryReadTool, FileReadTool
+
+from crews.plan_cache import PlanCachingCrew
+from llm.client import build_llm
+from llm.routing import ModelRouter
+from registry   import tool
 from typing import Any
 
 # Choose a provider via env LLM_PROVIDER (openai or anthropic)
@@ -24,16 +22,23 @@ LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
 _default_models = {
     "openai": "gpt-4.1-mini",
     "anthropic": "anthropic/claude-3-7-sonnet-20250219",
-    "gemini": "gemini/gemini-2.5-pro-exp-03-25"
+    "gemini": "gemini/gemini-2.5-pro-exp-03-25",
+    "mock": "mock/reforge"
 }
 model_name = os.getenv("MODEL_NAME", _default_models.get(LLM_PROVIDER))
 
-# Build the LLM client
+# written from static data by tools/inventory_docs.py unless the crew is asked for them
+STATIC_DOC_TASKS = ("extract_file_metadata", "component_technology_inventory")
+
+# Build the LLM client on first use, not at import time
 api_key_env = f"{LLM_PROVIDER.upper()}_API_KEY"
-llm_client = LLM(
-    model=model_name,
-    api_key=os.getenv(api_key_env)
-)
+
+@lru_cache(maxsize=None)
+def llm_client():
+    return build_llm(
+        model=model_name,
+        api_key=os.getenv(api_key_env)
+    )
 
 @CrewBase
 class DocumentationCrew:
@@ -48,26 +53,36 @@ class DocumentationCrew:
     tasks_config: Any
     tasks: Any
 
-    def __init__(self, codebase_path: str, doc_path: str, kb_path: str):
+    def __init__(self, codebase_path: str, doc_path: str, kb_path: str, static_docs: bool = True):
         self.codebase_path = codebase_path
         self.doc_path      = doc_path
         self.kb_path       = kb_path
+        self.static_docs   = static_docs
 
         # cache for tools
         always_cache       = lambda args, result: True
 
         # code dir and file tool
-        self._code_dir_tool     = DirectoryReadTool(directory=self.codebase_path)
+        self._code_dir_tool     = tool("directory_read", directory=self.codebase_path)
         self._code_dir_tool.cache_function = always_cache
-        self._code_file_tool    = FileReadTool()
+        self._code_file_tool    = tool("file_read")
         self._code_file_tool.cache_function = always_cache
 
         # kb dir and file tool
-        self._kb_dir_tool = DirectoryReadTool(directory=self.kb_path)
+        self._kb_dir_tool = tool("directory_read", directory=self.kb_path)
         # self._kb_dir_tool.cache_function = always_cache
-        self._kb_file_tool = FileReadTool()
+        self._kb_file_tool = tool("file_read")
         # self._kb_file_tool.cache_function = always_cache
+        self._router = None
 
+    def _routing(self) -> ModelRouter:
+        if self._router is None:
+            self._router = ModelRouter(self.agents_config, self.tasks_config, llm_client())
+        return self._router
+
+    def _llm(self, agent_name: str, manager: bool = False):
+        # per-task model tiers from the `routing` entries of the yaml configs (see llm/routing.py)
+        return self._routing().llm_for(agent_name, manager)
 
 
     # ────────── Agents ──────────
@@ -77,7 +92,7 @@ class DocumentationCrew:
         return Agent(
             config=self.agents_config["project_manager_agent"],
             # tools=[SerperDevTool()],
-            llm=llm_client,
+            llm=self._llm("project_manager_agent", manager=True),
             verbose=True,
             allow_delegation=True
         )
@@ -86,13 +101,14 @@ class DocumentationCrew:
     def codebase_analyst_agent(self) -> Agent:
         return Agent(
             config=self.agents_config["codebase_analyst_agent"],
-            tools=[ DependencyMapperTool(code_path=self.codebase_path),
+            tools=[ tool("dependency_mapper", code_path=self.codebase_path),
                     self._code_dir_tool,
                     self._code_file_tool,
-                    SerperDevTool(),
-                    JDepsTool(base_path=self.codebase_path),
-                    CodeParserTool(code_path=self.codebase_path),],
-            llm=llm_client,
+                    tool("web_search"),
+                    tool("jdeps", base_path=self.codebase_path),
+                    tool("code_parser", code_path=self.codebase_path),
+                    tool("java_chunks", code_path=self.codebase_path),],
+            llm=self._llm("codebase_analyst_agent"),
             verbose=True,
             allow_delegation=False
         )
@@ -102,13 +118,14 @@ class DocumentationCrew:
         return Agent(
             config=self.agents_config["documentation_agent"],
             tools=[
-                CodeParserTool(code_path=self.codebase_path),
-                JDepsTool(base_path=self.codebase_path),
+                tool("code_parser", code_path=self.codebase_path),
+                tool("java_chunks", code_path=self.codebase_path),
+                tool("jdeps", base_path=self.codebase_path),
                 self._code_dir_tool,
                 self._code_file_tool,
-                SerperDevTool()
+                tool("web_search")
             ],
-            llm=llm_client,
+            llm=self._llm("documentation_agent"),
             verbose=True,
             allow_delegation=False
         )
@@ -118,11 +135,11 @@ class DocumentationCrew:
         return Agent(
             config=self.agents_config["domain_expert_agent"],
             tools=[
-                SerperDevTool(),
+                tool("web_search"),
                 self._code_dir_tool,
                 self._code_file_tool
             ],
-            llm=llm_client,
+            llm=self._llm("domain_expert_agent"),
             verbose=True,
             allow_delegation=False
         )
@@ -132,11 +149,13 @@ class DocumentationCrew:
         return Agent(
             config=self.agents_config["migration_agent"],
             tools=[
-                SerperDevTool(),
+                tool("web_search"),
                 self._kb_dir_tool,
                 self._kb_file_tool,
+                tool("static_analyzer", code_path=self.codebase_path),
+                tool("table_access", code_path=self.codebase_path),
             ],
-            llm=llm_client,
+            llm=self._llm("migration_agent"),
             verbose=True,
             allow_delegation=True
         )
@@ -146,47 +165,47 @@ class DocumentationCrew:
     @task
     def extract_file_metadata(self) -> Task:
         return Task(config=self.tasks_config["extract_file_metadata"],
-                    output_file="1-documentation/docs/1-Metadata.md")
+                    output_file="{doc_path}/1-Metadata.md")
 
     @task
     def generate_system_architecture(self) -> Task:
         return Task(config=self.tasks_config["generate_system_architecture"],
-                    output_file="1-documentation/docs/2-SystemArchitecture.md")
+                    output_file="{doc_path}/2-SystemArchitecture.md")
 
     @task
     def generate_module_docs(self) -> Task:
         return Task(config=self.tasks_config["generate_module_docs"],
-                    output_file="1-documentation/docs/3-ModuleDocumentation.md")
+                    output_file="{doc_path}/3-ModuleDocumentation.md")
 
     @task
     def component_technology_inventory(self) -> Task:
         return Task(config=self.tasks_config["component_technology_inventory"],
-                    output_file="1-documentation/docs/4-ComponentsInventory.md")
+                    output_file="{doc_path}/4-ComponentsInventory.md")
 
     @task
     def research_migration_best_practices(self) -> Task:
         return Task(config=self.tasks_config["research_migration_best_practices"],
-                    output_file="1-documentation/docs/5-MigrationBestPractices.md")
+                    output_file="{doc_path}/5-MigrationBestPractices.md")
 
     @task
     def impact_analysis_on_java21(self) -> Task:
         return Task(config=self.tasks_config["impact_analysis_on_java21"],
-                    output_file="1-documentation/docs/6-ImpactAnalysis.md")
+                    output_file="{doc_path}/6-ImpactAnalysis.md")
 
     @task
     def plan_phased_module_extraction(self) -> Task:
         return Task(config=self.tasks_config["plan_phased_module_extraction"],
-                    output_file="1-documentation/docs/7-PlanPhasedModuleExtraction.md")
+                    output_file="{doc_path}/7-PlanPhasedModuleExtraction.md")
 
     @task
     def plan_migration_roadmap(self) -> Task:
         return Task(config=self.tasks_config["plan_migration_roadmap"],
-                    output_file="1-documentation/docs/8-PlanMigrationRoadmap.md")
+                    output_file="{doc_path}/8-PlanMigrationRoadmap.md")
 
     @task
     def final_handover_and_summary(self) -> Task:
         return Task(config=self.tasks_config["final_handover_and_summary"],
-                    output_file="1-documentation/docs/0-ExecutiveSummary.md")
+                    output_file="{doc_path}/0-ExecutiveSummary.md")
 
     # ────────── Build Crew ──────────
 
@@ -194,13 +213,15 @@ class DocumentationCrew:
     def crew(self) -> Crew:
         manager = self.project_manager_agent()
         operational_agents = [a for a in self.agents if a is not manager]
-        return Crew(
+        tasks = [t for t in self.tasks if not (self.static_docs and t.name in STATIC_DOC_TASKS)]
+        return self._routing().install(PlanCachingCrew(
             agents=operational_agents,
-            tasks=self.tasks,
+            tasks=tasks,
             # process=Process.sequential,
             process=Process.hierarchical, #switched to hierarchical to enable the reviewer_agent
             manager_agent=manager,
-            manager_llm=llm_client,
+            manager_llm=llm_client(),
             planning=True,
+            planning_llm=llm_client(),
             verbose=True
-        )
+        ))
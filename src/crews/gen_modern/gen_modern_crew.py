@@ -2,27 +2,21 @@
 # src/documentation_crew.py
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
-from crewai import Agent, Crew, Process, Task, LLM
+from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.memory import LongTermMemory
 from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
-from numpy.distutils.lib2def import output_def
-from onnxruntime.transformers.benchmark_helper import output_fusion_statistics
-from openpyxl.styles.builtins import output
 
-from tools.code_parser       import CodeParserTool
-from tools.dependency_mapper import DependencyMapperTool
-from tools.maven_build_tool  import MavenBuildTool
-from crewai_tools            import SerperDevTool, DirectoryReadTool, FileReadTool, FileWriterTool
-from typing import Any
-
-from langchain_community.agent_toolkits.file_management.toolkit import FileManagementToolkit
-from langchain_community.tools import ShellTool
+from crews.plan_cache import PlanCachingCrew
+from llm.client import build_llm
+from llm.routing import ModelRouter
+from registry   import tool
+from typing import Any, Optional
 
 from tools.langchain_fs_tool import LangChainFSWrapper
-from tools.langchain_shell_tool import LangChainShellWrapper
 
 # Choose a provider via env LLM_PROVIDER (openai or anthropic)
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
@@ -35,16 +29,20 @@ _default_models = {
     # "openai": "openai/o3-2025-04-16",
     "anthropic": "anthropic/claude-3-7-sonnet-20250219",
     # "anthropic": "claude-3-5-sonnet-latest",
-    "gemini": "gemini/gemini-2.5-pro-exp-03-25"
+    "gemini": "gemini/gemini-2.5-pro-exp-03-25",
+    "mock": "mock/reforge"
 }
 model_name = os.getenv("MODEL_NAME", _default_models.get(LLM_PROVIDER))
 
-# Build the LLM client
+# Build the LLM client on first use, not at import time
 api_key_env = f"{LLM_PROVIDER.upper()}_API_KEY"
-llm_client = LLM(
-    model=model_name,
-    api_key=os.getenv(api_key_env)
-)
+
+@lru_cache(maxsize=None)
+def llm_client():
+    return build_llm(
+        model=model_name,
+        api_key=os.getenv(api_key_env)
+    )
 
 @CrewBase
 class GenModernCrew:
@@ -59,33 +57,35 @@ class GenModernCrew:
     tasks_config: Any
     tasks: Any
 
-    def __init__(self, codebase_path: str, kb_path: str):
+    def __init__(self, codebase_path: str, kb_path: str, work_root: Optional[str] = None):
         self.codebase_path = codebase_path
         self.kb_path       = kb_path
+        # todo: hardcoded default path; gen_modern_batch passes its worktree
+        self.work_root     = work_root or "/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/"
 
         # cache for tools
         always_cache       = lambda args, result: True
 
         # code dir and file tool
-        self._code_dir_tool     = DirectoryReadTool(directory=self.codebase_path)
+        self._code_dir_tool     = tool("directory_read", directory=self.codebase_path)
         # todo: hardcoded path!
         # self._code_dir_tool = DirectoryReadTool("/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work")
         # self._code_dir_tool.cache_function = always_cache
-        self._code_file_tool    = FileReadTool()
+        self._code_file_tool    = tool("file_read")
         # self._code_file_tool.cache_function = always_cache
 
         # kb dir and file tool
-        self._kb_dir_tool = DirectoryReadTool(directory=self.kb_path)
+        self._kb_dir_tool = tool("directory_read", directory=self.kb_path)
         # self._kb_dir_tool.cache_function = always_cache
-        self._kb_file_tool = FileReadTool()
+        self._kb_file_tool = tool("file_read")
         # self._kb_file_tool.cache_function = always_cache
 
-        self.llm = llm_client
+        self.llm = llm_client()
+        self._router = None
 
         # setup file-management toolkit
-        toolkit = FileManagementToolkit(
-            # todo: hardcoded path
-            root_dir=str("/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/"),
+        toolkit = tool("file_management_toolkit",
+            root_dir=str(self.work_root),
             selected_tools=["copy_file", "file_delete"]
         )
         lc_tools = toolkit.get_tools()
@@ -93,6 +93,17 @@ class GenModernCrew:
             LangChainFSWrapper(name=t.name, description=t.description, lc_tool=t)
             for t in lc_tools
         ]
+        # one call for a whole batch of copies, moves, deletes and mkdirs
+        self.fs_tools.append(tool("batch_fs", root_dir=str(self.work_root)))
+
+    def _routing(self) -> ModelRouter:
+        if self._router is None:
+            self._router = ModelRouter(self.agents_config, self.tasks_config, llm_client())
+        return self._router
+
+    def _llm(self, agent_name: str, manager: bool = False):
+        # per-task model tiers from the `routing` entries of the yaml configs (see llm/routing.py)
+        return self._routing().llm_for(agent_name, manager)
 
     # ────────── Agents ──────────
     @agent
@@ -100,7 +111,7 @@ class GenModernCrew:
         cfg = self.agents_config['team_lead']
         return Agent(
             config=cfg,
-            llm=self.llm,
+            llm=self._llm("team_lead", manager=True),
             verbose=cfg.get('verbose', True),
             allow_delegation=cfg.get('allow_delegation', True),
             max_iter=cfg.get('max_iter', 25)
@@ -134,9 +145,14 @@ class GenModernCrew:
         tools = [
             self._code_dir_tool,
             self._code_file_tool,
-            FileWriterTool(),
-            MavenBuildTool(),
-            SerperDevTool(),
+            tool("java_chunks", code_path=self.codebase_path),
+            tool("file_writer"),
+            tool("maven_build", base_path=self.codebase_path),
+            tool("java_check", base_path=self.codebase_path),
+            tool("patch_edit", base_path=self.codebase_path),
+            # the agent's own persistent shell: cd and export carry over between its calls
+            tool("shell", base_path=self.codebase_path),
+            tool("web_search"),
             # MDXSearchTool(),
             # WebsiteSearchTool(),
             *self.fs_tools
@@ -144,7 +160,7 @@ class GenModernCrew:
         return Agent(
             config=cfg,
             tools=tools,
-            llm=self.llm,
+            llm=self._llm("principal_software_engineer"),
             verbose=True,  # cfg.get('verbose', True),
             # allow_delegation=cfg.get('allow_delegation', True)
             allow_delegation=False,
@@ -155,11 +171,14 @@ class GenModernCrew:
     def build_agent(self) -> Agent:
         cfg = self.agents_config['build_agent']
         tools = [
-            MavenBuildTool(),
+            tool("maven_build", base_path=self.codebase_path),
+            tool("test_runner", base_path=self.codebase_path),
+            tool("shell", base_path=self.codebase_path),
         ]
         return Agent(
             config=cfg,
             tools=tools,
+            llm=self._llm("build_agent"),
             verbose=True,
             allow_delegation=False
         )
@@ -201,16 +220,17 @@ class GenModernCrew:
     def crew(self) -> Crew:
         manager = self.team_lead()
         operational_agents = [a for a in self.agents if a is not manager]
-        return Crew(
+        return self._routing().install(PlanCachingCrew(
             agents=operational_agents,
             tasks=self.tasks,
             # process=Process.sequential,
             process=Process.hierarchical, #switched to hierarchical to enable the reviewer_agent
             manager_agent=manager,
-            manager_llm=llm_client,
+            manager_llm=llm_client(),
             planning=True,
+            planning_llm=llm_client(),
             verbose=True
-        )
+        ))
 
 
 '/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/kb/docs/7-PlanPhasedModuleExtraction.yaml'
\ No newline at end of file
@@ -2,27 +2,19 @@
 # src/documentation_crew.py
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
-from crewai import Agent, Crew, Process, Task, LLM
+from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai.memory import LongTermMemory
-from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
-from numpy.distutils.lib2def import output_def
-from onnxruntime.transformers.benchmark_helper import output_fusion_statistics
-from openpyxl.styles.builtins import output
-
-from tools.code_parser       import CodeParserTool
-from tools.dependency_mapper import DependencyMapperTool
-from tools.maven_build_tool  import MavenBuildTool
-from crewai_tools            import SerperDevTool, DirectoryReadTool, FileReadTool, FileWriterTool
-from typing import Any
+from crews.memory_store import long_term_memory
+from crews.plan_cache import PlanCachingCrew
 
-from langchain_community.agent_toolkits.file_management.toolkit import FileManagementToolkit
-from langchain_community.tools import ShellTool
+from llm.client import build_llm
+from registry   import tool
+from typing import Any
 
 from tools.langchain_fs_tool import LangChainFSWrapper
-from tools.langchain_shell_tool import LangChainShellWrapper
 
 # Choose a provider via env LLM_PROVIDER (openai or anthropic)
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
@@ -35,16 +27,20 @@ _default_models = {
     # "openai": "o3-2025-04-16",
     "anthropic": "anthropic/claude-3-7-sonnet-20250219",
     # "anthropic": "claude-3-5-sonnet-latest",
-    "gemini": "gemini/gemini-2.5-pro-exp-03-25"
+    "gemini": "gemini/gemini-2.5-pro-exp-03-25",
+    "mock": "mock/reforge"
 }
 model_name = os.getenv("MODEL_NAME", _default_models.get(LLM_PROVIDER))
 
-# Build the LLM client
+# Build the LLM client on first use, not at import time
 api_key_env = f"{LLM_PROVIDER.upper()}_API_KEY"
-llm_client = LLM(
-    model=model_name,
-    api_key=os.getenv(api_key_env)
-)
+
+@lru_cache(maxsize=None)
+def llm_client():
+    return build_llm(
+        model=model_name,
+        api_key=os.getenv(api_key_env)
+    )
 
 @CrewBase
 class GenModernCrew:
@@ -68,15 +64,15 @@ class GenModernCrew:
 
 
         # kb dir and file tool
-        self._kb_dir_tool = DirectoryReadTool(directory=self.kb_path)
+        self._kb_dir_tool = tool("directory_read", directory=self.kb_path)
         # self._kb_dir_tool.cache_function = always_cache
-        self._kb_file_tool = FileReadTool()
+        self._kb_file_tool = tool("file_read")
         # self._kb_file_tool.cache_function = always_cache
 
-        self.llm = llm_client
+        self.llm = llm_client()
 
         # setup file-management toolkit
-        toolkit = FileManagementToolkit(
+        toolkit = tool("file_management_toolkit",
             # todo: hardcoded path
             root_dir=str("/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/"),
             selected_tools=["copy_file", "file_delete"]
@@ -136,19 +132,18 @@ class GenModernCrew:
     def crew(self) -> Crew:
         manager = self.team_lead()
         operational_agents = [a for a in self.agents if a is not manager]
-        return Crew(
+        return PlanCachingCrew(
             agents=operational_agents,
             tasks=self.tasks,
             # process=Process.sequential,
             process=Process.hierarchical, #switched to hierarchical to enable the reviewer_agent
             manager_agent=manager,
-            manager_llm=llm_client,
+            manager_llm=llm_client(),
             planning=True,
+            planning_llm=llm_client(),
             verbose=True,
             memory = True,
-            long_term_memory = LongTermMemory(
-                storage=LTMSQLiteStorage(db_path="./modernization_memory.db")
-        ),
+            long_term_memory=long_term_memory(),
         )
 
 
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Bounded, indexed long-term memory for the modernization crews.
+
+A drop-in replacement for crewai's LTMSQLiteStorage (same table, same
+save/load/reset contract) that:
+
+  * runs SQLite in WAL mode on one shared connection,
+  * indexes the lookups crewai does (task, agent, timestamp),
+  * ranks the rows of a task by relevance (evaluation score decayed by age)
+    and returns at most `top_k`,
+  * evicts rows older than `max_age_days` and the oldest rows beyond
+    `max_rows`, compacting the file once enough has been deleted.
+
+The database lives next to the crews (src/modernization_memory.db), not in
+the working directory. Override with the REFORGE_MEMORY_* variables.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from crewai.memory import LongTermMemory
+from crewai.memory.storage.ltm_sqlite_storage import LTMSQLiteStorage
+
+DEFAULT_MEMORY_DB = str(Path(__file__).resolve().parent.parent / "modernization_memory.db")
+
+
+class BoundedLTMStorage(LTMSQLiteStorage):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_rows: int = 5000,
+        max_age_days: Optional[float] = 180,
+        top_k: int = 5,
+        candidates: int = 50,
+        half_life_days: float = 30,
+        evict_every: int = 100,
+    ) -> None:
+        self.max_rows = max_rows
+        self.max_age_days = max_age_days
+        self.top_k = top_k
+        self.candidates = candidates
+        self.half_life_days = half_life_days
+        self.evict_every = evict_every
+        self._saves = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        super().__init__(db_path=db_path or DEFAULT_MEMORY_DB)
+
+    # ────────── Connection ──────────
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _initialize_db(self):
+        """Create the crewai table, then add the agent column and the indexes (idempotent)."""
+        super()._initialize_db()
+        try:
+            with self._lock:
+                conn = self._connection()
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(long_term_memories)")}
+                if "agent" not in columns:
+                    conn.execute("ALTER TABLE long_term_memories ADD COLUMN agent TEXT")
+                    conn.execute("UPDATE long_term_memories SET agent = json_extract(metadata, '$.agent')")
+                conn.executescript(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_ltm_task_time ON long_term_memories (task_description, datetime);
+                    CREATE INDEX IF NOT EXISTS idx_ltm_agent ON long_term_memories (agent);
+                    CREATE INDEX IF NOT EXISTS idx_ltm_time ON long_term_memories (datetime);
+                    """
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while indexing the LTM database: {e}",
+                color="red",
+            )
+
+    # ────────── Storage contract ──────────
+    def save(
+        self,
+        task_description: str,
+        metadata: Dict[str, Any],
+        datetime: str,
+        score: Union[int, float],
+    ) -> None:
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    """
+                    INSERT INTO long_term_memories (task_description, metadata, datetime, score, agent)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (task_description, json.dumps(metadata), datetime, score, metadata.get("agent")),
+                )
+                conn.commit()
+                self._saves += 1
+            if self.evict_every and self._saves % self.evict_every == 0:
+                self.evict()
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while saving to LTM: {e}",
+                color="red",
+            )
+
+    def load(self, task_description: str, latest_n: int) -> Optional[List[Dict[str, Any]]]:
+        """Return the most relevant memories of a task: score decayed by age, best first."""
+        try:
+            with self._lock:
+                rows = self._connection().execute(
+                    """
+                    SELECT metadata, datetime, score
+                    FROM long_term_memories
+                    WHERE task_description = ?
+                    ORDER BY datetime DESC
+                    LIMIT ?
+                    """,
+                    (task_description, max(self.candidates, latest_n)),
+                ).fetchall()
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while querying LTM: {e}",
+                color="red",
+            )
+            return None
+        if not rows:
+            return None
+
+        now = time.time()
+        ranked = sorted(rows, key=lambda row: self.relevance(row[2], row[1], now), reverse=True)
+        return [
+            {"metadata": json.loads(metadata), "datetime": when, "score": score}
+            for metadata, when, score in ranked[:min(latest_n, self.top_k)]
+        ]
+
+    def relevance(self, score: Optional[float], when: str, now: float) -> float:
+        try:
+            age_days = max(0.0, now - float(when)) / 86400
+        except (TypeError, ValueError):
+            age_days = 0.0
+        return (score or 0) * 0.5 ** (age_days / self.half_life_days)
+
+    def reset(self) -> None:
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute("DELETE FROM long_term_memories")
+                conn.commit()
+            self.compact()
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while deleting all rows in LTM: {e}",
+                color="red",
+            )
+
+    # ────────── Eviction ──────────
+    def evict(self) -> int:
+        """Drop rows past max_age_days, then the oldest beyond max_rows; compact if much was freed."""
+        deleted = 0
+        try:
+            with self._lock:
+                conn = self._connection()
+                if self.max_age_days is not None:
+                    cutoff = time.time() - self.max_age_days * 86400
+                    deleted += conn.execute(
+                        "DELETE FROM long_term_memories WHERE CAST(datetime AS REAL) < ?", (cutoff,)
+                    ).rowcount
+                if self.max_rows:
+                    deleted += conn.execute(
+                        """
+                        DELETE FROM long_term_memories WHERE id IN (
+                            SELECT id FROM long_term_memories ORDER BY datetime DESC LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (self.max_rows,),
+                    ).rowcount
+                conn.commit()
+            if self.max_rows and deleted >= self.max_rows // 10:
+                self.compact()
+        except sqlite3.Error as e:
+            self._printer.print(
+                content=f"MEMORY ERROR: An error occurred while evicting LTM rows: {e}",
+                color="red",
+            )
+        return deleted
+
+    def compact(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA optimize")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM long_term_memories").fetchone()[0]
+
+
+def long_term_memory() -> LongTermMemory:
+    """LongTermMemory backed by BoundedLTMStorage, configured from the environment."""
+    max_age = os.getenv("REFORGE_MEMORY_MAX_AGE_DAYS", "180")
+    return LongTermMemory(storage=BoundedLTMStorage(
+        db_path=os.getenv("REFORGE_MEMORY_DB", DEFAULT_MEMORY_DB),
+        max_rows=int(os.getenv("REFORGE_MEMORY_MAX_ROWS", "5000")),
+        max_age_days=float(max_age) if max_age else None,
+        top_k=int(os.getenv("REFORGE_MEMORY_TOP_K", "5")),
+    ))
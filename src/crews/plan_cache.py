@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Cache of the crew planning step.
+
+With planning=True crewai asks the planning LLM for a step-by-step plan of
+every task before the first one starts, on every kickoff. That plan only
+depends on the tasks and agents configs and the kickoff inputs, so it is
+stored under a hash of exactly those (plus the planning model) and reused
+while none of them changed:
+
+    crew = PlanCachingCrew(agents=..., tasks=..., planning=True, planning_llm=llm)
+    crew.kickoff(inputs)          # plans, then stores the plan
+    crew.kickoff(inputs)          # same configs and inputs: no planning call
+
+replan=True, or REFORGE_REPLAN=1, plans again and overwrites the stored
+plan. Plans are kept in REFORGE_PLAN_CACHE (default: a folder in the
+system temp dir), one JSON file per key.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crewai import Crew, Task
+from crewai.utilities.planning_handler import CrewPlanner
+from pydantic import Field
+
+DEFAULT_PLAN_CACHE = os.path.join(tempfile.gettempdir(), "reforge-plans")
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _task_config(task: Task) -> Dict[str, Any]:
+    """What the planner sees of a task, before the kickoff inputs are interpolated."""
+    agent = task.agent
+    return {
+        "description": task._original_description or task.description,
+        "expected_output": task._original_expected_output or task.expected_output,
+        "tools": sorted(t.name for t in task.tools or []),
+        "agent": None if agent is None else {
+            "role": agent._original_role or agent.role,
+            "goal": agent._original_goal or agent.goal,
+            "backstory": agent._original_backstory or agent.backstory,
+            "tools": sorted(t.name for t in agent.tools or []),
+        },
+    }
+
+
+class PlanCache:
+    def __init__(self, root: str = DEFAULT_PLAN_CACHE):
+        self.root = Path(root)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, tasks: List[Task], inputs: Optional[Dict[str, Any]], planning_llm: Any) -> str:
+        return _digest({
+            "tasks": [_task_config(t) for t in tasks],
+            "inputs": inputs or {},
+            "model": getattr(planning_llm, "model", planning_llm),
+        })
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key[:32]}.json"
+
+    def load(self, key: str, tasks: int) -> Optional[List[str]]:
+        """The stored plans of `key`, or None (also when they no longer match the number of tasks)."""
+        try:
+            record = json.loads(self.path(key).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            record = None
+        plans = record.get("plans") if record and record.get("key") == key else None
+        with self._lock:
+            if plans is None or len(plans) != tasks:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return plans
+
+    def save(self, key: str, task_names: List[str], plans: List[str]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        record = {"key": key, "saved_at": time.time(), "tasks": task_names, "plans": plans}
+        tmp = self.path(key).with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(record, indent=2))
+        os.replace(tmp, self.path(key))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[PlanCache] = None
+_cache_lock = threading.Lock()
+
+
+def plan_cache() -> PlanCache:
+    """The process-wide plan cache, stored in REFORGE_PLAN_CACHE."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PlanCache(os.getenv("REFORGE_PLAN_CACHE") or DEFAULT_PLAN_CACHE)
+        return _cache
+
+
+class PlanCachingCrew(Crew):
+    """A Crew whose planning step is answered from the plan cache when nothing relevant changed."""
+
+    replan: bool = Field(
+        default_factory=lambda: os.getenv("REFORGE_REPLAN", "") not in ("", "0", "false"),
+        description="Plan again even if a plan is stored for the same configs and inputs.",
+    )
+
+    def _handle_crew_planning(self):
+        cache = plan_cache()
+        key = cache.key(self.tasks, self._inputs, self.planning_llm)
+        plans = None if self.replan else cache.load(key, len(self.tasks))
+        if plans is None:
+            self._logger.log("info", "Planning the crew execution")
+            result = CrewPlanner(tasks=self.tasks, planning_agent_llm=self.planning_llm)._handle_crew_planning()
+            plans = [step_plan.plan for step_plan in result.list_of_plans_per_task]
+            cache.save(key, [t.name for t in self.tasks], plans)
+        else:
+            self._logger.log("info", "Reusing the stored plan of the crew execution")
+
+        for task, plan in zip(self.tasks, plans):
+            task.description += plan
@@ -2,53 +2,141 @@
 # src/main.py
 # Must precede any llm module imports
 
-import sys, os, shutil, subprocess, json
+import sys, os, shutil, json
 from langtrace_python_sdk import langtrace
 
 langtrace.init(api_key = os.getenv("LANGTRACE_API_KEY"))
 
 
+# crews, tools and the LLM client are imported lazily (see registry.py),
+# so usage errors and bad paths are reported before any heavy import
+from registry import crew_class, tool
+from tools.subprocess_runner import run_command
 
-
-from sympy.codegen.ast import Raise
-
-from crews.documentation.documentation_crew import DocumentationCrew
-
-def prepare_codebase(target: str) -> str:
+def prepare_codebase(target: str, clone_dir: str = "./temp_codebase", compile: bool = True) -> str:
     if target.startswith("http"):
-        tmp = "./temp_codebase"
+        tmp = clone_dir
         if os.path.exists(tmp): shutil.rmtree(tmp)
-        r = subprocess.run(["git","clone","--depth","1",target,tmp],
-                            capture_output=True, text=True)
-        if r.returncode!=0:
-            print("❌ Git clone failed:", r.stderr); sys.exit(1)
+        r = run_command(["git","clone","--depth","1",target,tmp])
+        if not r.ok:
+            raise RuntimeError(f"❌ Git clone failed: {r.failure()}")
         code_path = tmp
     else:
         code_path = target
 
     if not os.path.isdir(code_path):
-        print(f"📁 Directory `{code_path}` not found."); sys.exit(1)
+        raise FileNotFoundError(f"📁 Directory `{code_path}` not found.")
 
     # optional compile
+    if not compile:
+        return os.path.abspath(code_path)
     if os.path.exists(os.path.join(code_path,"pom.xml")):
-        subprocess.run(["mvn","-f",os.path.join(code_path,"pom.xml"),"clean","compile"], check=False)
+        build = ["mvn","-f",os.path.join(code_path,"pom.xml"),"clean","compile"]
     elif os.path.exists(os.path.join(code_path,"build.gradle")):
-        subprocess.run(["gradle","-p",code_path,"build"], check=False)
+        build = ["gradle","-p",code_path,"build"]
     else:
         print("ℹ️  No build file found; skipping compile.")
+        return os.path.abspath(code_path)
+    # shown as it runs, but only its head and tail are kept in memory
+    result = run_command(build, echo=True)
+    if result.timed_out or result.cancelled:
+        raise RuntimeError(f"❌ Build {result.failure()}")
 
     return os.path.abspath(code_path)
 
+def document(codebase_path: str, docs_dir: str, state_dir: str, kb_dir: str,
+             resume: bool = False, cache_handler=None, step_callback=None,
+             static_docs: bool = True, summary: bool = False) -> str:
+    """Run the DocumentationCrew on one codebase; return the path of its state file."""
+    from llm.cassette import note_kickoff
+    from crews.checkpoint import TaskCheckpoints
+    from tools.inventory_docs import collect_inventory, inventory_report, summarize, write_inventory_doc, write_metadata_doc
+    from tools.static_analyzer_tool import findings_report
+    from tools.table_access_index import table_access_index, table_access_report
+    from llm.prompt_layout import shared_context
+    from run_stats import collect_run_stats
+    from tools.profiling import profile_run, profiled
+    DocumentationCrew = crew_class("documentation")
+
+    os.makedirs(docs_dir, exist_ok=True)
+    os.makedirs(state_dir, exist_ok=True)
+
+    # with REFORGE_PROFILE set, the phases and tool calls are timed and sampled (see tools/profiling.py);
+    # the routing, prompt-cache and command stats of this run are saved in state_dir (see run_stats.py)
+    with collect_run_stats(state_dir), profile_run(os.path.join(state_dir, "profile")):
+        # migration hazards are found by rules, not by the LLM reading the code
+        with profiled("phase:static_analysis"):
+            findings = tool("static_analyzer", code_path=codebase_path).analyze()
+            print(f"static analysis: {findings['total_findings']} findings in {findings['files']} files")
+        # which packages read and write which tables: the data coupling behind module boundaries
+        with profiled("phase:table_access"):
+            table_access = table_access_index(codebase_path)
+            table_access.refresh()
+
+        # file metadata and the technology inventory are static data: written from templates, not by agents
+        with profiled("phase:inventory"):
+            inventory = collect_inventory(codebase_path)
+            if static_docs:
+                overview = None
+                if summary:
+                    from crews.documentation.documentation_crew import llm_client
+                    overview = summarize(inventory, llm_client())
+                write_metadata_doc(inventory, os.path.join(docs_dir, "1-Metadata.md"))
+                write_inventory_doc(inventory, os.path.join(docs_dir, "4-ComponentsInventory.md"), overview)
+                print(f"inventory: {len(inventory['files'])} Java files in {len(inventory['packages'])} packages")
+
+        crew = DocumentationCrew(codebase_path, docs_dir, kb_dir, static_docs=static_docs).crew()
+        if cache_handler is not None:
+            # shared by the crews of a batch run (see gen_docs_batch.py)
+            crew._cache_handler = cache_handler
+            for agent in crew.agents:
+                agent.set_cache_handler(cache_handler)
+        if step_callback is not None:
+            # progress and cancellation of a job server run (see reforge_server.py)
+            crew.step_callback = step_callback
+        inputs = {
+            "codebase": os.path.basename(codebase_path),
+            "code_path": codebase_path,
+            "doc_path": os.path.abspath(docs_dir),
+            "kb_path": os.path.basename(kb_dir),
+            "migration_findings": findings_report(findings),
+            "codebase_inventory": inventory_report(inventory),
+            "data_coupling": table_access_report(table_access),
+        }
+        note_kickoff("documentation", inputs, [codebase_path, docs_dir, kb_dir])
+        # tools called without a path (code_parser, dependency_mapper, ...) work on the codebase
+        checkpoints = TaskCheckpoints(os.path.join(state_dir, "checkpoints", "documentation"), sources=[codebase_path])
+        # the large inputs every task sees go first in every prompt, where providers can cache them
+        with profiled("phase:kickoff"), shared_context({k: inputs[k] for k in ("migration_findings", "codebase_inventory")}):
+            state = checkpoints.kickoff(crew, inputs, resume=resume)
+
+    out_file = os.path.join(state_dir, "documentation_state.json")
+    with open(out_file,"w") as f:
+        json.dump(state.model_dump() if hasattr(state,"model_dump") else dict(state), f, indent=2)
+    return out_file
+
 if __name__=="__main__":
-    if len(sys.argv)<2:
-        print("Usage: python3 main.py <codebase_or_git_url>"); sys.exit(0)
-    codebase_path = prepare_codebase(sys.argv[1])
+    # a rerun regenerates only the docs whose inputs or dependencies changed (see crews/checkpoint.py);
+    # --full regenerates all of them (--resume, the old opt-in, is still accepted)
+    resume = "--full" not in sys.argv[1:]
+    # --llm-inventory has the agents write 1-Metadata.md and 4-ComponentsInventory.md,
+    # --summary adds an LLM-written overview to the static inventory
+    llm_inventory = "--llm-inventory" in sys.argv[1:]
+    summary = "--summary" in sys.argv[1:]
+    # --profile samples the phases and tool calls into state/profile (same as REFORGE_PROFILE=sample)
+    if "--profile" in sys.argv[1:]:
+        os.environ.setdefault("REFORGE_PROFILE", "sample")
+    args = [a for a in sys.argv[1:] if a not in ("--full", "--resume", "--llm-inventory", "--summary", "--profile")]
+    if len(args)<1:
+        print("Usage: python3 main.py <codebase_or_git_url> [--full] [--llm-inventory] [--summary] [--profile]"); sys.exit(0)
+    try:
+        codebase_path = prepare_codebase(args[0])
+    except (RuntimeError, FileNotFoundError) as e:
+        print(e); sys.exit(1)
     os.environ["CODE_PATH"] = codebase_path
 
     docs_dir = "1-documentation/docs"
     state_dir= "1-documentation/state"
-    os.makedirs(docs_dir, exist_ok=True)
-    os.makedirs(state_dir, exist_ok=True)
 
     kb_dir = "kb-docs"
 
@@ -61,16 +149,7 @@ if __name__=="__main__":
 
     # raise Exception("stopping for debug..")
 
-    crew = DocumentationCrew(codebase_path, docs_dir, kb_dir).crew()
-    state = crew.kickoff({
-        "codebase": os.path.basename(codebase_path),
-        "code_path": codebase_path,
-        "doc_path": os.path.abspath(docs_dir),
-        "kb_path": os.path.basename(kb_dir)
-    })
-
-    out_file = os.path.join(state_dir, "documentation_state.json")
-    with open(out_file,"w") as f:
-        json.dump(state.model_dump() if hasattr(state,"model_dump") else dict(state), f, indent=2)
+    document(codebase_path, docs_dir, state_dir, kb_dir, resume=resume,
+             static_docs=not llm_inventory, summary=summary)
 
     print(f"✅ Done. Docs in `{docs_dir}`, state in `{state_dir}`.")
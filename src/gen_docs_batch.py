@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Document many codebases in one process.
+
+Reads a manifest of git URLs or local paths and runs the DocumentationCrew
+(see gen_docs.py) on several of them at once, on a bounded pool of worker
+threads. Running them in one process pays the crewai/tool imports and the
+LLM client set-up once, and lets the crews share a warm tool cache: web
+searches (the same Java 21 and Spring Boot questions come up for every
+service) are answered once for the whole batch. Other tool results stay
+per crew, since they depend on the codebase.
+
+Each repo gets its own folder under --out: codebase/ (for cloned URLs),
+docs/ and state/ (task checkpoints: a rerun only regenerates the docs whose
+inputs changed, as gen_docs.py does; --full regenerates all). The
+consolidated status is rewritten to <out>/batch_status.json as repos
+finish.
+
+Manifest: YAML (or JSON) with a `repos` list, or plain text with one URL or
+path per line (# starts a comment):
+
+    repos:
+      - https://github.com/acme/payments-service.git
+      - path: ../services/ledger
+        name: ledger
+
+    python3 gen_docs_batch.py services.yaml --workers 4
+    python3 gen_docs_batch.py services.txt --out runs/docs --full
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+# LangTrace setup and the single-repo steps are shared with gen_docs.py
+from gen_docs import document, prepare_codebase
+from registry import crew_class, tool
+
+
+def load_manifest(path: str) -> List[Dict[str, str]]:
+    """Return [{name, source, kb?}] with unique, filesystem-safe names."""
+    with open(path) as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml", ".json")):
+        data = yaml.safe_load(text) or {}
+        entries = data.get("repos", []) if isinstance(data, dict) else data
+    else:
+        entries = [line.split("#", 1)[0].strip() for line in text.splitlines()]
+        entries = [e for e in entries if e]
+
+    repos, seen = [], set()
+    for entry in entries:
+        repo = {"source": entry} if isinstance(entry, str) else dict(entry)
+        repo["source"] = repo.get("source") or repo.get("url") or repo.get("path")
+        if not repo["source"]:
+            raise ValueError(f"Manifest entry without url or path: {entry}")
+        if not repo["source"].startswith("http"):
+            # local paths are relative to the manifest
+            repo["source"] = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(path)), repo["source"]))
+        base = repo.get("name") or re.sub(r"\.git$", "", repo["source"].rstrip("/").rsplit("/", 1)[-1])
+        base = re.sub(r"[^A-Za-z0-9._-]", "_", base) or "repo"
+        name, n = base, 2
+        while name in seen:
+            name, n = f"{base}-{n}", n + 1
+        seen.add(name)
+        repo["name"] = name
+        repos.append(repo)
+    return repos
+
+
+def search_cache_factory():
+    """Return a factory of per-crew tool caches that share their web-search entries with each other."""
+    from crewai.agents.cache.cache_handler import CacheHandler
+
+    shared: Dict[str, Any] = {}
+    lock = threading.Lock()
+    # the crews build their search tools through the registry, so they all carry this name
+    search_tool = tool("web_search").name
+
+    class SharedSearchCache(CacheHandler):
+        def add(self, tool, input, output):
+            if tool == search_tool:
+                with lock:
+                    shared[f"{tool}-{input}"] = output
+            else:
+                super().add(tool, input, output)
+
+        def read(self, tool, input) -> Optional[str]:
+            if tool == search_tool:
+                with lock:
+                    return shared.get(f"{tool}-{input}")
+            return super().read(tool, input)
+
+    # file reads and directory listings differ per codebase, so only searches are shared
+    return SharedSearchCache
+
+
+class DocsBatch:
+    def __init__(self, out_dir: str, kb_dir: str, resume: bool = True, compile: bool = True):
+        self.out_dir = os.path.abspath(out_dir)
+        self.kb_dir = kb_dir
+        self.resume = resume
+        self.compile = compile
+        self.status_file = os.path.join(self.out_dir, "batch_status.json")
+        self.results: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._cache_factory = None
+
+    def warm_up(self):
+        """Import the crew and its tools and build the LLM client once, before the workers start."""
+        from crews.documentation.documentation_crew import llm_client
+        crew_class("documentation")
+        llm_client()
+        tool("static_analyzer")
+        self._cache_factory = search_cache_factory()
+
+    def _update(self, repo_name: str, **fields):
+        with self._lock:
+            self.results.setdefault(repo_name, {}).update(fields)
+            os.makedirs(self.out_dir, exist_ok=True)
+            tmp = self.status_file + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"out_dir": self.out_dir, "repos": list(self.results.values())}, f, indent=2)
+            os.replace(tmp, self.status_file)
+
+    def run_repo(self, repo: Dict[str, str]) -> Dict:
+        name = repo["name"]
+        repo_dir = os.path.join(self.out_dir, name)
+        docs_dir = os.path.join(repo_dir, "docs")
+        state_dir = os.path.join(repo_dir, "state")
+        self._update(name, name=name, source=repo["source"], status="running", docs_dir=docs_dir)
+        start = time.perf_counter()
+        try:
+            codebase = prepare_codebase(repo["source"], clone_dir=os.path.join(repo_dir, "codebase"),
+                                        compile=self.compile)
+            state_file = document(codebase, docs_dir, state_dir, repo.get("kb") or self.kb_dir,
+                                  resume=self.resume, cache_handler=self._cache_factory())
+            self._update(name, status="done", state_file=state_file)
+        except Exception as e:
+            self._update(name, status="failed", error=str(e), traceback=traceback.format_exc()[-4000:])
+        self._update(name, elapsed_s=round(time.perf_counter() - start, 1))
+        return self.results[name]
+
+    def run(self, repos: List[Dict[str, str]], workers: int) -> List[Dict]:
+        for repo in repos:
+            self._update(repo["name"], name=repo["name"], source=repo["source"], status="queued")
+        self.warm_up()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docs") as pool:
+            futures = {pool.submit(self.run_repo, repo): repo["name"] for repo in repos}
+            for future in as_completed(futures):
+                result = future.result()
+                icon = "✅" if result["status"] == "done" else "❌"
+                print(f"{icon} {result['name']}: {result['status']} in {result['elapsed_s']}s")
+        return [self.results[repo["name"]] for repo in repos]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the DocumentationCrew on many codebases concurrently")
+    parser.add_argument("manifest", help="YAML/JSON with a `repos` list, or a text file with one URL or path per line")
+    parser.add_argument("--out", default="1-documentation/batch", help="Folder for the per-repo docs and state")
+    parser.add_argument("--kb", default="kb-docs", help="KB folder (a manifest entry can override it with `kb`)")
+    parser.add_argument("--workers", type=int, default=4, help="Codebases documented at the same time")
+    parser.add_argument("--full", action="store_true",
+                        help="Regenerate every doc, not only those whose inputs changed since the last run")
+    # the old opt-in, now the default; still accepted
+    parser.add_argument("--resume", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--no-compile", action="store_true", help="Do not compile the codebases first")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.manifest):
+        print(f"📁 Manifest '{args.manifest}' not found."); sys.exit(1)
+    try:
+        repos = load_manifest(args.manifest)
+    except (ValueError, yaml.YAMLError) as e:
+        print(f"❌ {e}"); sys.exit(1)
+    if not repos:
+        print("ℹ️  The manifest lists no repos."); return
+    missing = [r["source"] for r in repos if not r["source"].startswith("http") and not os.path.isdir(r["source"])]
+    if missing:
+        print(f"📁 Directories not found: {', '.join(missing)}"); sys.exit(1)
+
+    workers = max(1, min(args.workers, len(repos)))
+    print(f"Documenting {len(repos)} codebases, {workers} at a time, into '{os.path.abspath(args.out)}'")
+    batch = DocsBatch(args.out, args.kb, resume=not args.full, compile=not args.no_compile)
+    results = batch.run(repos, workers)
+
+    failed = [r for r in results if r["status"] != "done"]
+    print(f"✅ Done: {len(results) - len(failed)} of {len(results)} documented. Status in '{batch.status_file}'.")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,98 @@
 import os
 import subprocess
+import sys
 import json
 from langtrace_python_sdk import langtrace
 
 # Initialize LangTrace
 langtrace.init(api_key=os.getenv("LANGTRACE_API_KEY"))
 
-from sympy.codegen.ast import Raise
-from crews.gen_modern.gen_modern_crew import GenModernCrew
+# the crew (and crewai itself) is imported lazily, see registry.py
+from registry import crew_class
 
 # Hardcoded paths
 codebase_path = "/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/code/code"
 state_path     = "/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/state"
 kb_path        = "/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/kb"
 
-# Validate that the provided directory exists
-if not os.path.isdir(codebase_path):
-    raise FileNotFoundError(f"📁 Directory '{codebase_path}' not found.")
-
-# Optional compile step
-# if os.path.exists(os.path.join(codebase_path, "pom.xml")):
-#     subprocess.run([
-#         "mvn", "-f", os.path.join(codebase_path, "pom.xml"), "clean", "compile"
-#     ], check=False)
-# elif os.path.exists(os.path.join(codebase_path, "build.gradle")):
-#     subprocess.run([
-#         "gradle", "-p", codebase_path, "build"
-#     ], check=False)
-# else:
-#     print("ℹ️  No build file found; skipping compile.")
-
-print(f"Codebase name: {os.path.basename(codebase_path)}")
-print(f"KB path: {os.path.abspath(kb_path)}")
-
-# Log which AI provider is in use
-llm = os.getenv("LLM_PROVIDER", "").upper()
-print(f"GenAI provider in use: {llm}")
-
-# Run the GenModernCrew process
-crew = GenModernCrew(codebase_path, kb_path).crew()
-state = crew.kickoff({
-    "code_path": codebase_path,
-    "kb_path": os.path.basename(kb_path)
-})
-
-# Save state
-out_file = os.path.join(state_path, "gen_modern_state.json")
-with open(out_file, "w") as f:
-    json.dump(
-        state.model_dump() if hasattr(state, "model_dump") else dict(state),
-        f,
-        indent=2
-    )
-
-print(f"✅ Done. modernization in '{codebase_path}', state in '{state_path}'.")
+
+def modernize(codebase_path: str, kb_path: str, state_path: str,
+              plan_step: str = "the step with status 'current phase'",
+              unattended: bool = False, step_callback=None) -> str:
+    """Run the GenModernCrew on one codebase; return the path of its state file."""
+    from llm.cassette import note_kickoff
+    from run_stats import collect_run_stats
+    from tools.fs_watcher import watching
+    from tools.profiling import profile_run, profiled
+    GenModernCrew = crew_class("gen_modern")
+
+    # Run the GenModernCrew process
+    crew = GenModernCrew(codebase_path, kb_path).crew()
+    if unattended:
+        # nobody at the terminal to answer human_input prompts (see reforge_server.py)
+        for task in crew.tasks:
+            task.human_input = False
+    if step_callback is not None:
+        crew.step_callback = step_callback
+    inputs = {
+        "code_path": codebase_path,
+        "kb_path": os.path.basename(kb_path),
+        "plan_step": plan_step
+    }
+    note_kickoff("gen_modern", inputs, [codebase_path, kb_path])
+    # the agents edit the codebase: indexes and caches are told what changed instead of rescanning it
+    # with REFORGE_PROFILE set, the kickoff and tool calls are timed and sampled (see tools/profiling.py);
+    # the routing, prompt-cache and command stats of this run are saved in state_path (see run_stats.py)
+    with collect_run_stats(state_path), profile_run(os.path.join(state_path, "profile")), \
+            watching(codebase_path) as watcher:
+        with profiled("phase:kickoff"):
+            state = crew.kickoff(inputs)
+    print(f"file watcher ({watcher.stats['backend']}): {watcher.stats['events']} events, "
+          f"{watcher.stats['full_rescans']} full rescans")
+
+    # Save state
+    out_file = os.path.join(state_path, "gen_modern_state.json")
+    with open(out_file, "w") as f:
+        json.dump(
+            state.model_dump() if hasattr(state, "model_dump") else dict(state),
+            f,
+            indent=2
+        )
+    return out_file
+
+
+def main():
+    # --profile samples the kickoff and tool calls into <state>/profile (same as REFORGE_PROFILE=sample)
+    if "--profile" in sys.argv[1:]:
+        os.environ.setdefault("REFORGE_PROFILE", "sample")
+
+    # Validate that the provided directory exists
+    if not os.path.isdir(codebase_path):
+        raise FileNotFoundError(f"📁 Directory '{codebase_path}' not found.")
+
+    # Optional compile step
+    # if os.path.exists(os.path.join(codebase_path, "pom.xml")):
+    #     subprocess.run([
+    #         "mvn", "-f", os.path.join(codebase_path, "pom.xml"), "clean", "compile"
+    #     ], check=False)
+    # elif os.path.exists(os.path.join(codebase_path, "build.gradle")):
+    #     subprocess.run([
+    #         "gradle", "-p", codebase_path, "build"
+    #     ], check=False)
+    # else:
+    #     print("ℹ️  No build file found; skipping compile.")
+
+    print(f"Codebase name: {os.path.basename(codebase_path)}")
+    print(f"KB path: {os.path.abspath(kb_path)}")
+
+    # Log which AI provider is in use
+    llm = os.getenv("LLM_PROVIDER", "").upper()
+    print(f"GenAI provider in use: {llm}")
+
+    modernize(codebase_path, kb_path, state_path)
+
+    print(f"✅ Done. modernization in '{codebase_path}', state in '{state_path}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Run the modernization plan step by step, independent steps in parallel.
+
+Reads the steps of the phased extraction plan in the KB
+(kb/docs/7-PlanPhasedModuleExtraction.yaml) and runs one GenModernCrew per
+step that is not 'done'. Every step gets its own git worktree and branch
+(reforge/<step id>), its own MavenBuildTool target and its own state folder
+(<state>/<step id>), so concurrent crews never touch each other's files. A
+step whose crew finishes and whose module builds is committed on its branch,
+without the build output (target/, build/), and merged into the current
+branch; steps depending on it start from the merged tree.
+
+Dependencies come from an optional `depends_on` list on each step. The plan
+is phased, so a step without `depends_on` waits for the step before it,
+unless --independent is given.
+
+Crews run unattended (no human_input prompts); review the merged commits,
+or run with --no-merge and review the branches before merging them.
+
+    python3 gen_modern_batch.py --workers 3
+    python3 gen_modern_batch.py --steps phase2_extract_business_module --no-merge
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+# hardcoded paths and LangTrace setup are shared with the single-step run
+from gen_modern import codebase_path, kb_path, state_path
+
+PLAN_FILE = os.path.join("docs", "7-PlanPhasedModuleExtraction.yaml")
+BRANCH_PREFIX = "reforge/"
+# left out of the step commits: the agents and the final check build the module in its worktree
+BUILD_OUTPUT_EXCLUDES = (":(exclude,glob)**/target/**", ":(exclude,glob)**/build/**")
+
+
+def git(repo: str, *args: str, check: bool = True) -> subprocess.CompletedProcess:
+    result = subprocess.run(["git", "-C", repo, *args], capture_output=True, text=True)
+    if check and result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result
+
+
+# ────────── Plan ──────────
+def load_steps(plan_path: str, only: Optional[List[str]] = None, independent: bool = False) -> List[dict]:
+    """
+    Return the plan steps still to do, each with a resolved `depends_on` list.
+    Dependencies on steps that are already done (or not selected) are dropped.
+    """
+    with open(plan_path) as f:
+        plan = yaml.safe_load(f) or {}
+
+    steps, previous = [], None
+    for step in plan.get("steps", []):
+        if "depends_on" in step:
+            depends_on = list(step["depends_on"] or [])
+        else:
+            depends_on = [] if independent or previous is None else [previous]
+        previous = step["id"]
+        if str(step.get("status", "")).lower() == "done":
+            continue
+        if only and step["id"] not in only:
+            continue
+        steps.append({**step, "depends_on": depends_on})
+
+    pending = {s["id"] for s in steps}
+    for step in steps:
+        step["depends_on"] = [d for d in step["depends_on"] if d in pending]
+    return steps
+
+
+# ────────── Worker ──────────
+def run_step(step: dict, worktree_codebase: str, kb_dir: str, state_dir: str) -> dict:
+    """Run one GenModernCrew in its worktree, then build and commit the result (runs in a child process)."""
+    from gen_modern import modernize
+    from registry import tool
+
+    step_id = step["id"]
+    result = {"step": step_id, "status": "failed", "state_file": None, "build": None, "error": None}
+
+    # one cassette per worker: a shared file would interleave the recordings
+    cassette = os.getenv("REFORGE_CASSETTE")
+    if cassette:
+        cassette = Path(cassette)
+        os.environ["REFORGE_CASSETTE"] = str(cassette.with_name(f"{cassette.stem}.{step_id}{cassette.suffix}"))
+
+    try:
+        # same run as gen_modern.py (stats, profile, file watcher), with the step's own state folder
+        step_state_dir = os.path.join(state_dir, step_id)
+        os.makedirs(step_state_dir, exist_ok=True)
+        result["state_file"] = modernize(
+            worktree_codebase, kb_dir, step_state_dir,
+            plan_step=f"the step with id '{step_id}' ({step.get('name', step_id)})",
+            unattended=True,
+        )
+
+        build = tool("maven_build", base_path=worktree_codebase)._run()
+        result["build"] = {k: v for k, v in build.items() if k not in ("stdout", "stderr")}
+        if build.get("returncode", 0) != 0:
+            result["status"] = "build_failed"
+            result["error"] = (build.get("stdout", "") + build.get("stderr", ""))[-4000:]
+            return result
+
+        git(worktree_codebase, "add", "-A", "--", ".", *BUILD_OUTPUT_EXCLUDES)
+        if not git(worktree_codebase, "diff", "--cached", "--quiet", check=False).returncode:
+            result["status"] = "unchanged"
+            return result
+        git(worktree_codebase, "commit", "-q", "-m", f"Modernize {step_id}: {step.get('name', '')}".strip())
+        result["status"] = "done"
+    except Exception:
+        result["error"] = traceback.format_exc()
+    return result
+
+
+# ────────── Driver ──────────
+class BatchRun:
+    def __init__(self, codebase: str, kb_dir: str, state_dir: str, worktree_root: str,
+                 merge: bool = True, keep_worktrees: bool = False):
+        self.codebase = os.path.abspath(codebase)
+        self.kb_dir = os.path.abspath(kb_dir)
+        self.state_dir = os.path.abspath(state_dir)
+        self.worktree_root = os.path.abspath(worktree_root)
+        self.merge = merge
+        self.keep_worktrees = keep_worktrees
+
+        self.repo = git(self.codebase, "rev-parse", "--show-toplevel").stdout.strip()
+        self.relpath = os.path.relpath(self.codebase, self.repo)
+        self.base_branch = git(self.repo, "rev-parse", "--abbrev-ref", "HEAD").stdout.strip()
+        self.worktrees: Dict[str, str] = {}
+
+    def check_clean(self):
+        dirty = git(self.repo, "status", "--porcelain", "--", self.relpath).stdout.strip()
+        if dirty:
+            raise RuntimeError(f"'{self.codebase}' has uncommitted changes; commit or stash them first:\n{dirty}")
+
+    def add_worktree(self, step_id: str) -> str:
+        """Create a worktree on a fresh branch from the current HEAD; return the codebase path inside it."""
+        path = os.path.join(self.worktree_root, step_id)
+        if os.path.exists(path):
+            git(self.repo, "worktree", "remove", "--force", path, check=False)
+        git(self.repo, "worktree", "prune")
+        git(self.repo, "worktree", "add", "-q", "-B", BRANCH_PREFIX + step_id, path, "HEAD")
+        self.worktrees[step_id] = path
+        return os.path.join(path, self.relpath)
+
+    def remove_worktree(self, step_id: str):
+        path = self.worktrees.pop(step_id, None)
+        if path and not self.keep_worktrees:
+            git(self.repo, "worktree", "remove", "--force", path, check=False)
+
+    def merge_step(self, step_id: str) -> bool:
+        branch = BRANCH_PREFIX + step_id
+        merged = git(self.repo, "merge", "--no-ff", "-q", "-m", f"Merge {branch}", branch, check=False)
+        if merged.returncode != 0:
+            git(self.repo, "merge", "--abort", check=False)
+            return False
+        return True
+
+    def run(self, steps: List[dict], workers: int) -> List[dict]:
+        self.check_clean()
+        os.makedirs(self.state_dir, exist_ok=True)
+        os.makedirs(self.worktree_root, exist_ok=True)
+
+        waiting = {s["id"]: s for s in steps}
+        # steps whose changes are on the current branch (merged, or nothing to merge)
+        landed, settled = set(), set()
+        results, running = [], {}
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            while waiting or running:
+                # a step whose dependency did not land cannot run, nor can its own dependents
+                skipped = True
+                while skipped:
+                    skipped = False
+                    for step_id, step in list(waiting.items()):
+                        blocked = [d for d in step["depends_on"] if d in settled and d not in landed]
+                        if blocked:
+                            del waiting[step_id]
+                            settled.add(step_id)
+                            skipped = True
+                            self.skip(results, step_id, f"dependency {', '.join(blocked)} did not land")
+
+                ready = [s for s in waiting.values() if all(d in landed for d in s["depends_on"])]
+                for step in ready[:max(0, workers - len(running))]:
+                    del waiting[step["id"]]
+                    worktree_codebase = self.add_worktree(step["id"])
+                    print(f"🚀 {step['id']}: started in {self.worktrees[step['id']]}")
+                    future = pool.submit(run_step, step, worktree_codebase, self.kb_dir, self.state_dir)
+                    running[future] = (step, time.perf_counter())
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, started = running.pop(future)
+                    result = future.result()
+                    result["branch"] = BRANCH_PREFIX + step["id"]
+                    result["elapsed_s"] = round(time.perf_counter() - started, 1)
+
+                    if result["status"] == "done" and self.merge:
+                        result["status"] = "merged" if self.merge_step(step["id"]) else "conflict"
+                    # with --no-merge a finished step stays on its branch, so its dependents cannot start
+                    settled.add(step["id"])
+                    if result["status"] in ("merged", "unchanged"):
+                        landed.add(step["id"])
+
+                    self.remove_worktree(step["id"])
+                    results.append(result)
+                    icon = "✅" if result["status"] in ("merged", "unchanged", "done") else "❌"
+                    print(f"{icon} {step['id']}: {result['status']} in {result['elapsed_s']}s")
+
+        # left over only when depends_on is circular
+        for step_id in waiting:
+            self.skip(results, step_id, "circular depends_on")
+        return results
+
+    @staticmethod
+    def skip(results: List[dict], step_id: str, reason: str):
+        results.append({"step": step_id, "status": "skipped", "error": reason})
+        print(f"⏭️  {step_id}: skipped, {reason}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the modernization plan, independent steps in parallel")
+    parser.add_argument("--codebase", default=codebase_path, help="Project to modernize (must be in a git repo)")
+    parser.add_argument("--kb", default=kb_path, help="KB folder holding the plan and the docs")
+    parser.add_argument("--state", default=state_path, help="Folder for the per-step state folders")
+    parser.add_argument("--plan", help=f"Plan file (default: <kb>/{PLAN_FILE})")
+    parser.add_argument("--steps", nargs="*", help="Only run these step ids")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--independent", action="store_true",
+                        help="Treat steps without depends_on as independent instead of waiting for the previous one")
+    parser.add_argument("--worktrees", default=os.path.join(tempfile.gettempdir(), "reforge-worktrees"),
+                        help="Folder for the per-step git worktrees")
+    parser.add_argument("--no-merge", action="store_true", help="Leave the results on their reforge/* branches")
+    parser.add_argument("--keep-worktrees", action="store_true")
+    args = parser.parse_args()
+
+    plan_path = args.plan or os.path.join(args.kb, PLAN_FILE)
+    if not os.path.isfile(plan_path):
+        print(f"📁 Plan '{plan_path}' not found."); sys.exit(1)
+    if not os.path.isdir(args.codebase):
+        print(f"📁 Directory '{args.codebase}' not found."); sys.exit(1)
+
+    steps = load_steps(plan_path, args.steps, args.independent)
+    if not steps:
+        print("ℹ️  Nothing to do: every selected step is done."); return
+    print(f"Plan: {plan_path}")
+    for step in steps:
+        after = f" (after {', '.join(step['depends_on'])})" if step["depends_on"] else ""
+        print(f"   {step['id']}{after}")
+
+    batch = BatchRun(args.codebase, args.kb, args.state, args.worktrees,
+                     merge=not args.no_merge, keep_worktrees=args.keep_worktrees)
+    try:
+        results = batch.run(steps, max(1, args.workers))
+    except RuntimeError as e:
+        print(f"❌ {e}"); sys.exit(1)
+
+    summary_file = os.path.join(batch.state_dir, "gen_modern_batch.json")
+    with open(summary_file, "w") as f:
+        json.dump({"plan": plan_path, "base_branch": batch.base_branch, "steps": results}, f, indent=2)
+    print(f"✅ Done. Summary in '{summary_file}'.")
+    if any(r["status"] not in ("merged", "done", "unchanged") for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
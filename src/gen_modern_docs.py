@@ -7,8 +7,8 @@ from langtrace_python_sdk import langtrace
 # Initialize LangTrace
 langtrace.init(api_key=os.getenv("LANGTRACE_API_KEY"))
 
-from sympy.codegen.ast import Raise
-from crews.gen_modern.gen_modern_docs_crew import GenModernCrew
+# the crew (and crewai itself) is imported lazily, see registry.py
+from registry import crew_class
 
 # Configure root logger
 logging.basicConfig(
@@ -24,43 +24,67 @@ codebase_path = "/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/
 state_path     = "/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/state"
 kb_path        = "/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/kb"
 
-# Validate that the provided directory exists
-if not os.path.isdir(codebase_path):
-    raise FileNotFoundError(f"📁 Directory '{codebase_path}' not found.")
-
-# Optional compile step
-# if os.path.exists(os.path.join(codebase_path, "pom.xml")):
-#     subprocess.run([
-#         "mvn", "-f", os.path.join(codebase_path, "pom.xml"), "clean", "compile"
-#     ], check=False)
-# elif os.path.exists(os.path.join(codebase_path, "build.gradle")):
-#     subprocess.run([
-#         "gradle", "-p", codebase_path, "build"
-#     ], check=False)
-# else:
-#     print("ℹ️  No build file found; skipping compile.")
-
-print(f"Codebase name: {os.path.basename(codebase_path)}")
-print(f"KB path: {os.path.abspath(kb_path)}")
-
-# Log which AI provider is in use
-llm = os.getenv("LLM_PROVIDER", "").upper()
-print(f"GenAI provider in use: {llm}")
-
-# Run the GenModernCrew process
-crew = GenModernCrew(codebase_path, kb_path).crew()
-state = crew.kickoff({
-    "code_path": codebase_path,
-    "kb_path": os.path.basename(kb_path)
-})
-
-# Save state
-out_file = os.path.join(state_path, "gen_modern_state.json")
-with open(out_file, "w") as f:
-    json.dump(
-        state.model_dump() if hasattr(state, "model_dump") else dict(state),
-        f,
-        indent=2
-    )
-
-print(f"✅ Done. modernization in '{codebase_path}', state in '{state_path}'.")
+
+
+def modernize_docs(codebase_path: str, kb_path: str, state_path: str,
+                   unattended: bool = False, step_callback=None) -> str:
+    """Run the documentation GenModernCrew on one codebase; return the path of its state file."""
+    from llm.cassette import note_kickoff
+    GenModernCrew = crew_class("gen_modern_docs")
+
+    # Run the GenModernCrew process
+    crew = GenModernCrew(codebase_path, kb_path).crew()
+    if unattended:
+        for task in crew.tasks:
+            task.human_input = False
+    if step_callback is not None:
+        crew.step_callback = step_callback
+    inputs = {
+        "code_path": codebase_path,
+        "kb_path": os.path.basename(kb_path)
+    }
+    note_kickoff("gen_modern_docs", inputs, [codebase_path, kb_path])
+    state = crew.kickoff(inputs)
+
+    # Save state
+    out_file = os.path.join(state_path, "gen_modern_state.json")
+    with open(out_file, "w") as f:
+        json.dump(
+            state.model_dump() if hasattr(state, "model_dump") else dict(state),
+            f,
+            indent=2
+        )
+    return out_file
+
+
+def main():
+    # Validate that the provided directory exists
+    if not os.path.isdir(codebase_path):
+        raise FileNotFoundError(f"📁 Directory '{codebase_path}' not found.")
+
+    # Optional compile step
+    # if os.path.exists(os.path.join(codebase_path, "pom.xml")):
+    #     subprocess.run([
+    #         "mvn", "-f", os.path.join(codebase_path, "pom.xml"), "clean", "compile"
+    #     ], check=False)
+    # elif os.path.exists(os.path.join(codebase_path, "build.gradle")):
+    #     subprocess.run([
+    #         "gradle", "-p", codebase_path, "build"
+    #     ], check=False)
+    # else:
+    #     print("ℹ️  No build file found; skipping compile.")
+
+    print(f"Codebase name: {os.path.basename(codebase_path)}")
+    print(f"KB path: {os.path.abspath(kb_path)}")
+
+    # Log which AI provider is in use
+    llm = os.getenv("LLM_PROVIDER", "").upper()
+    print(f"GenAI provider in use: {llm}")
+
+    modernize_docs(codebase_path, kb_path, state_path)
+
+    print(f"✅ Done. modernization in '{codebase_path}', state in '{state_path}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Record/replay cassettes for offline, reproducible crew runs.
+
+A cassette is a JSON-lines file: the first line is a header carrying the
+cassette format version, every following line is one recorded interaction
+(an LLM call, a web search, a human feedback prompt or the kickoff inputs
+of a crew). Lines are appended as they happen, so a crashed recording is
+still usable up to the point of the crash.
+
+    REFORGE_CASSETTE=runs/docs.cassette.jsonl REFORGE_CASSETTE_MODE=record python3 gen_docs.py ...
+    REFORGE_CASSETTE=runs/docs.cassette.jsonl REFORGE_CASSETTE_MODE=replay python3 gen_docs.py ...
+
+In replay mode requests are matched on a hash of their content; repeated
+identical requests are served in recording order. A request that was never
+recorded raises CassetteMiss, unless REFORGE_CASSETTE_STRICT=0, in which
+case the next unused interaction of the same kind is served instead.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Union
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+
+from llm.prompt_layout import layout
+
+CASSETTE_VERSION = 1
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+class CassetteMiss(RuntimeError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _request_key(kind: str, payload: Any) -> str:
+    canonical = json.dumps([kind, payload], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _normalize_messages(messages: Union[str, List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    return [{"role": m.get("role"), "content": m.get("content")} for m in messages]
+
+
+class Cassette:
+    """Thread-safe, append-only store of recorded interactions."""
+
+    def __init__(self, path: str, mode: str, strict: bool = True):
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, Deque[Dict]] = defaultdict(deque)
+        self._by_kind: Dict[str, Deque[Dict]] = defaultdict(deque)
+        self._used: set = set()
+        self.header: Dict[str, Any] = {}
+        self.stats = {"served": 0, "misses": 0, "recorded": 0}
+
+        if mode == MODE_RECORD:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.header = {"cassette_version": CASSETTE_VERSION,
+                           "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            with self.path.open("w", encoding="utf-8") as f:
+                f.write(json.dumps(self.header) + "\n")
+        else:
+            self._load()
+
+    def _load(self):
+        with self.path.open("r", encoding="utf-8") as f:
+            lines = [line for line in f if line.strip()]
+        if not lines:
+            raise RuntimeError(f"Cassette '{self.path}' is empty.")
+        self.header = json.loads(lines[0])
+        version = self.header.get("cassette_version")
+        if version != CASSETTE_VERSION:
+            raise RuntimeError(
+                f"Cassette '{self.path}' has version {version}, expected {CASSETTE_VERSION}. "
+                "Please record it again."
+            )
+        for index, line in enumerate(lines[1:]):
+            entry = json.loads(line)
+            entry["_index"] = index
+            self._by_key[entry["key"]].append(entry)
+            self._by_kind[entry["kind"]].append(entry)
+
+    # ────────── Recording ──────────
+
+    def record(self, kind: str, request: Any, response: Any, latency_s: float = 0.0, **extra: Any):
+        entry = {"kind": kind, "key": _request_key(kind, request), "request": request,
+                 "response": response, "latency_s": round(latency_s, 4), **extra}
+        line = json.dumps(entry, default=str, ensure_ascii=False)
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.stats["recorded"] += 1
+
+    # ────────── Replay ──────────
+
+    def lookup(self, kind: str, request: Any) -> Dict:
+        key = _request_key(kind, request)
+        with self._lock:
+            queue = self._by_key.get(key)
+            while queue and queue[0]["_index"] in self._used:
+                queue.popleft()
+            if queue:
+                entry = queue.popleft()
+            elif not self.strict:
+                entry = self._next_unused(kind)
+            else:
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                raise CassetteMiss(
+                    f"No recorded '{kind}' interaction matches this request (key {key[:12]}) "
+                    f"in cassette '{self.path}'."
+                )
+            self._used.add(entry["_index"])
+            self.stats["served"] += 1
+            return entry
+
+    def _next_unused(self, kind: str) -> Optional[Dict]:
+        queue = self._by_kind.get(kind)
+        while queue:
+            entry = queue.popleft()
+            if entry["_index"] not in self._used:
+                return entry
+        return None
+
+    def rewind(self):
+        """Make every recorded interaction available again (replay mode)."""
+        with self._lock:
+            self._by_key.clear()
+            self._by_kind.clear()
+            self._used.clear()
+            self.stats = {"served": 0, "misses": 0, "recorded": 0}
+            self._load()
+
+    def entries(self, kind: str) -> List[Dict]:
+        return list(self._by_kind.get(kind, []))
+
+
+def _replay_delay(entry: Dict, latency: Union[str, float, None]) -> float:
+    """
+    'recorded' replays the latency measured while recording, 'recorded*0.5'
+    scales it, a number is a fixed delay per call and None/0 means no delay.
+    """
+    if not latency:
+        return 0.0
+    if isinstance(latency, str) and latency.startswith("recorded"):
+        factor = float(latency.split("*", 1)[1]) if "*" in latency else 1.0
+        return entry.get("latency_s", 0.0) * factor
+    return float(latency)
+
+
+class RecordingLLM(LLM):
+    """A regular crewai LLM that writes every call to a cassette."""
+
+    def __init__(self, cassette: Cassette, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._cassette = cassette
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        start = time.perf_counter()
+        response = super().call(messages, tools=tools, callbacks=callbacks,
+                                available_functions=available_functions)
+        self._cassette.record("llm", _normalize_messages(messages), response,
+                              latency_s=time.perf_counter() - start, model=self.model)
+        return response
+
+
+class ReplayLLM(BaseLLM):
+    """Stub LLM that serves recorded responses back, never touching the network."""
+
+    def __init__(self, cassette: Cassette, model: str = "replay",
+                 latency: Union[str, float, None] = None, context_window: int = 128000):
+        super().__init__(model=model)
+        self._cassette = cassette
+        self._latency = latency
+        self._context_window = context_window
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        # recorded calls were laid out by the client (see llm/client.py) before reaching the cassette
+        entry = self._cassette.lookup("llm", _normalize_messages(layout(messages, self.model)))
+        delay = _replay_delay(entry, self._latency)
+        if delay:
+            time.sleep(delay)
+        return entry["response"]
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return self._context_window
+
+
+def install_human_input_hook(cassette: Cassette):
+    """
+    Record (or replay) the answers given to `human_input: true` tasks, so
+    replayed runs of GenModernCrew never block on the terminal.
+    """
+    from crewai.agents.agent_builder.base_agent_executor_mixin import CrewAgentExecutorMixin
+
+    original = CrewAgentExecutorMixin._ask_human_input
+    if getattr(original, "_cassette_hook", False):
+        return
+
+    def _ask_human_input(self, final_answer: str) -> str:
+        if cassette.mode == MODE_REPLAY:
+            return cassette.lookup("human_input", final_answer)["response"]
+        response = original(self, final_answer)
+        cassette.record("human_input", final_answer, response)
+        return response
+
+    _ask_human_input._cassette_hook = True
+    CrewAgentExecutorMixin._ask_human_input = _ask_human_input
+
+
+# ────────── Process-wide cassette ──────────
+
+_active: Optional[Cassette] = None
+_active_lock = threading.Lock()
+
+
+def cassette_mode() -> str:
+    return os.getenv("REFORGE_CASSETTE_MODE", MODE_OFF).lower()
+
+
+def replay_latency() -> Union[str, float, None]:
+    value = os.getenv("REFORGE_REPLAY_LATENCY")
+    if not value:
+        return None
+    return value if value.startswith("recorded") else float(value)
+
+
+def active_cassette() -> Optional[Cassette]:
+    """Return the cassette configured through the environment, if any."""
+    global _active
+    mode = cassette_mode()
+    if mode == MODE_OFF:
+        return None
+    with _active_lock:
+        if _active is None:
+            path = os.getenv("REFORGE_CASSETTE")
+            if not path:
+                raise RuntimeError("REFORGE_CASSETTE_MODE is set but REFORGE_CASSETTE is not.")
+            strict = os.getenv("REFORGE_CASSETTE_STRICT", "1") != "0"
+            _active = Cassette(path, mode, strict=strict)
+            install_human_input_hook(_active)
+        return _active
+
+
+def note_kickoff(crew_name: str, inputs: Dict[str, Any], crew_args: List[Any]):
+    """
+    Store how a crew was built and kicked off, so a replay (see
+    bench/bench_crew_replay.py) can rebuild it with the very same inputs.
+    """
+    cassette = active_cassette()
+    if cassette and cassette.mode == MODE_RECORD:
+        cassette.record("kickoff", crew_name, {"inputs": inputs, "crew_args": crew_args})
@@ -0,0 +1,53 @@
+"""
+Cassette-backed stand-ins for SerperDevTool (see llm/cassette.py).
+
+Kept apart from the cassette itself because importing crewai_tools is slow
+and only needed once a crew actually asks for a search tool.
+"""
+import time
+from typing import Any, Type, Union
+
+from pydantic import BaseModel, PrivateAttr
+from crewai.tools.base_tool import BaseTool
+from crewai_tools import SerperDevTool
+
+from llm.cassette import Cassette, _replay_delay
+
+
+class RecordingSerperDevTool(SerperDevTool):
+    """SerperDevTool that writes every search and its results to a cassette."""
+
+    _cassette: Cassette = PrivateAttr()
+
+    def __init__(self, cassette: Cassette, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._cassette = cassette
+
+    def _run(self, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        result = super()._run(**kwargs)
+        self._cassette.record("search", kwargs, result, latency_s=time.perf_counter() - start)
+        return result
+
+
+class ReplaySerperDevTool(BaseTool):
+    """Stand-in for SerperDevTool that serves recorded search results."""
+
+    name: str = SerperDevTool.model_fields["name"].default
+    description: str = SerperDevTool.model_fields["description"].default
+    args_schema: Type[BaseModel] = SerperDevTool.model_fields["args_schema"].default
+
+    _cassette: Cassette = PrivateAttr()
+    _latency: Union[str, float, None] = PrivateAttr()
+
+    def __init__(self, cassette: Cassette, latency: Union[str, float, None] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._cassette = cassette
+        self._latency = latency
+
+    def _run(self, **kwargs: Any) -> Any:
+        entry = self._cassette.lookup("search", kwargs)
+        delay = _replay_delay(entry, self._latency)
+        if delay:
+            time.sleep(delay)
+        return entry["response"]
@@ -0,0 +1,70 @@
+"""
+Construction of the LLM client and web-search tool shared by the crews.
+
+Crews keep choosing their own provider and model; going through these
+helpers is what lets a run be recorded to, or replayed from, a cassette
+(see llm/cassette.py), and what puts every call of the process through the
+shared rate limiter (see llm/scheduler.py) and the prompt layout that keeps
+the shared context of a run in a cacheable prefix (see llm/prompt_layout.py),
+without touching the crew code. "mock/..." models are answered by the local
+mock provider (see llm/mock_provider.py).
+"""
+from typing import Any
+
+from crewai import LLM
+
+from llm.cassette import MODE_RECORD, RecordingLLM, ReplayLLM, active_cassette, replay_latency
+from llm.mock_provider import MockLLM
+from llm.prompt_layout import layout, prompt_cache_callbacks
+from llm.scheduler import scheduler
+
+
+class _Scheduled:
+    """Mixin for LLM classes: every call waits for the rate limiter of its model and is retried on 429s."""
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        parent = super()
+        messages = layout(messages, self.model)
+        # the usage of every response is reported to the prompt-cache stats as well (the process's and the run's)
+        callbacks = list(callbacks or []) + prompt_cache_callbacks()
+        return scheduler().call(
+            self.model,
+            lambda: parent.call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions),
+            messages,
+        )
+
+
+class ScheduledLLM(_Scheduled, LLM):
+    pass
+
+
+class ScheduledRecordingLLM(_Scheduled, RecordingLLM):
+    pass
+
+
+class ScheduledMockLLM(_Scheduled, MockLLM):
+    pass
+
+
+def build_llm(model: str, api_key: str = None, **kwargs: Any):
+    cassette = active_cassette()
+    if cassette is not None and cassette.mode != MODE_RECORD:
+        # replayed calls never reach a provider, so they are not rate limited
+        return ReplayLLM(cassette, model=model, latency=replay_latency())
+    if model and model.startswith("mock/"):
+        return ScheduledMockLLM(model=model)
+    if cassette is None:
+        return ScheduledLLM(model=model, api_key=api_key, **kwargs)
+    return ScheduledRecordingLLM(cassette, model=model, api_key=api_key, **kwargs)
+
+
+def build_search_tool(**kwargs: Any):
+    # crewai_tools is only imported once a crew actually asks for search
+    cassette = active_cassette()
+    if cassette is None:
+        from crewai_tools import SerperDevTool
+        return SerperDevTool(**kwargs)
+    from llm.cassette_tools import RecordingSerperDevTool, ReplaySerperDevTool
+    if cassette.mode == MODE_RECORD:
+        return RecordingSerperDevTool(cassette, **kwargs)
+    return ReplaySerperDevTool(cassette, latency=replay_latency(), **kwargs)
@@ -0,0 +1,195 @@
+"""
+Local stand-in for an LLM provider that enforces a quota.
+
+MockProvider counts requests and tokens over a sliding minute and, like
+OpenAI, answers over-quota requests with a 429 carrying retry-after and
+x-ratelimit-* headers; it can also fail a share of the requests with a 529
+(overloaded). MockLLM puts a crewai LLM in front of it, so crews and the
+scheduler (see llm/scheduler.py) can be exercised without network access
+or API keys:
+
+    LLM_PROVIDER=mock REFORGE_MOCK_RPM=20 python3 gen_docs.py temp_codebase/kitchensink/
+
+Every answer is a ReAct final answer, so an agent finishes its task on the
+first call.
+
+Like OpenAI, it also keeps a prefix cache: a prompt whose first
+`cache_min_tokens` or more tokens match a recent prompt (in blocks of
+`cache_block_tokens`) reports those as cached_tokens in its usage, which
+is how the prompt layout of llm/prompt_layout.py is measured offline.
+"""
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+from crewai.llms.base_llm import BaseLLM
+
+from llm.scheduler import estimate_tokens
+
+
+class MockProviderError(RuntimeError):
+    """An error response of the mock provider; carries status_code and headers like litellm's errors."""
+
+    def __init__(self, message: str, status_code: int, headers: Dict[str, str]):
+        super().__init__(message)
+        self.status_code = status_code
+        self.headers = headers
+
+
+class MockRateLimitError(MockProviderError):
+    pass
+
+
+class MockProvider:
+    def __init__(self, rpm: Optional[int] = 60, tpm: Optional[int] = 100_000,
+                 latency_s: float = 0.05, overload_rate: float = 0.0, seed: Optional[int] = None,
+                 window_s: float = 60.0, cache_min_tokens: int = 1024, cache_block_tokens: int = 128,
+                 cache_entries: int = 4096):
+        # rpm and tpm are counted per window_s; benchmarks shorten it to compress time
+        self.rpm = rpm
+        self.tpm = tpm
+        self.latency_s = latency_s
+        self.overload_rate = overload_rate
+        self.window_s = window_s
+        self.cache_min_tokens = cache_min_tokens
+        self.cache_block_tokens = cache_block_tokens
+        self.cache_entries = cache_entries
+        self.stats = {"requests": 0, "rate_limited": 0, "overloaded": 0, "prompt_tokens": 0, "cached_tokens": 0}
+        self._window: Deque[Tuple[float, int]] = deque()
+        self._prefixes: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    def _headers(self, now: float, requests: int, tokens: int) -> Dict[str, str]:
+        reset = (self._window[0][0] + self.window_s - now) if self._window else 0.0
+        headers = {"x-ratelimit-reset-requests": f"{reset:.3f}s", "x-ratelimit-reset-tokens": f"{reset:.3f}s"}
+        if self.rpm is not None:
+            headers["x-ratelimit-limit-requests"] = str(self.rpm)
+            headers["x-ratelimit-remaining-requests"] = str(max(0, self.rpm - requests))
+        if self.tpm is not None:
+            headers["x-ratelimit-limit-tokens"] = str(self.tpm)
+            headers["x-ratelimit-remaining-tokens"] = str(max(0, self.tpm - tokens))
+        return headers
+
+    def admit(self, tokens: int) -> Dict[str, str]:
+        """Count one request of `tokens` against the quota; raise a 429 (or a random 529) when refused."""
+        with self._lock:
+            now = time.monotonic()
+            while self._window and self._window[0][0] <= now - self.window_s:
+                self._window.popleft()
+            requests = len(self._window)
+            used = sum(t for _, t in self._window)
+            self.stats["requests"] += 1
+            if self._random.random() < self.overload_rate:
+                self.stats["overloaded"] += 1
+                raise MockProviderError("Overloaded", 529, {})
+            over_tokens = self.tpm is not None and used + tokens > self.tpm and bool(self._window)
+            if (self.rpm is not None and requests >= self.rpm) or over_tokens:
+                self.stats["rate_limited"] += 1
+                headers = self._headers(now, requests, used)
+                headers["retry-after"] = str(max(1, math.ceil(self._window[0][0] + self.window_s - now)))
+                raise MockRateLimitError("Rate limit reached for requests", 429, headers)
+            self._window.append((now, tokens))
+            return self._headers(now, requests + 1, used + tokens)
+
+    def cache_lookup(self, messages: Union[str, List[Dict[str, Any]]]) -> int:
+        """Tokens of the prompt's longest recently seen prefix (0 below cache_min_tokens); remember its prefixes."""
+        text = messages if isinstance(messages, str) else "".join(
+            json.dumps([m.get("role"), m.get("content")], sort_keys=True, default=str) for m in messages)
+        block = self.cache_block_tokens * 4  # characters, as in estimate_tokens
+        digest = hashlib.sha256()
+        cached = 0
+        with self._lock:
+            for end in range(block, len(text) + 1, block):
+                digest.update(text[end - block:end].encode("utf-8"))
+                key = digest.copy().hexdigest()
+                if key in self._prefixes:
+                    self._prefixes.move_to_end(key)
+                    if cached == end - block:
+                        cached = end
+                else:
+                    self._prefixes[key] = None
+            while len(self._prefixes) > self.cache_entries:
+                self._prefixes.popitem(last=False)
+        tokens = cached // 4
+        return tokens if tokens >= self.cache_min_tokens else 0
+
+    def respond(self, messages: Union[str, List[Dict[str, Any]]]) -> Tuple[str, Dict[str, Any]]:
+        """(answer, usage) of one request, usage in the OpenAI format."""
+        prompt_tokens = estimate_tokens(messages)
+        self.admit(prompt_tokens)
+        cached = self.cache_lookup(messages)
+        with self._lock:
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["cached_tokens"] += cached
+        if self.latency_s:
+            # like real providers, the cached part of the prompt is (almost) free to process
+            time.sleep(self.latency_s * (1 - 0.5 * cached / prompt_tokens))
+        prompt = messages if isinstance(messages, str) else (messages[-1].get("content") or "")
+        answer = ("Thought: I now know the final answer\n"
+                  f"Final Answer: Mock answer to: {' '.join(str(prompt).split())[:200]}")
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": estimate_tokens(answer),
+                 "prompt_tokens_details": {"cached_tokens": cached}}
+        return answer, usage
+
+    def complete(self, messages: Union[str, List[Dict[str, Any]]]) -> str:
+        return self.respond(messages)[0]
+
+
+_provider: Optional[MockProvider] = None
+_provider_lock = threading.Lock()
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return int(value) if value else None
+
+
+def mock_provider() -> MockProvider:
+    """The process-wide mock provider (one quota for all its clients), configured from the environment."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = MockProvider(
+                rpm=_env_int("REFORGE_MOCK_RPM", 60),
+                tpm=_env_int("REFORGE_MOCK_TPM", 100_000),
+                latency_s=float(os.getenv("REFORGE_MOCK_LATENCY", "0.05")),
+                overload_rate=float(os.getenv("REFORGE_MOCK_OVERLOAD_RATE", "0")),
+            )
+        return _provider
+
+
+class MockLLM(BaseLLM):
+    """crewai LLM answered by a MockProvider."""
+
+    def __init__(self, model: str = "mock/reforge", provider: Optional[MockProvider] = None,
+                 context_window: int = 128000, **kwargs: Any):
+        super().__init__(model=model)
+        self._provider = provider or mock_provider()
+        self._context_window = context_window
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        answer, usage = self._provider.respond(messages)
+        for callback in callbacks or []:
+            # as crewai's LLM does with litellm's usage
+            if hasattr(callback, "log_success_event"):
+                callback.log_success_event(kwargs={"model": self.model, "messages": messages},
+                                           response_obj={"usage": usage}, start_time=0, end_time=0)
+        return answer
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return self._context_window
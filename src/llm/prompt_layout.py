@@ -0,0 +1,189 @@
+"""
+Stable prompt-prefix layout, so provider prompt caching can work.
+
+Providers cache the longest prompt prefix they have seen recently
+(OpenAI and Gemini do it automatically, Anthropic at explicit
+`cache_control` breakpoints), but a prefix only matches when it is
+byte-identical. The large shared context of a run (the codebase inventory,
+the static-analysis findings) used to be interpolated into the middle of
+each task description, after the agent's own system prompt, so every task
+and every agent sent it at a different offset.
+
+The entry points now declare that context for the duration of a kickoff:
+
+    with shared_context({"codebase_inventory": report, "migration_findings": findings}):
+        crew.kickoff(inputs)
+
+and every LLM call made inside the block (see llm/client.py) is laid out
+as:
+
+  1. one system message with all the shared blocks, normalized and in
+     canonical (name) order, identical for every call of the run;
+  2. the agent's system prompt (stable for all the calls of an agent);
+  3. the conversation, where each shared block the task interpolated is
+     replaced by a short reference to it.
+
+For models that take explicit breakpoints, the end of (1) and of (2) are
+marked with cache_control. The cached share of the prompt tokens reported
+by the provider is recorded per task in prompt_cache_stats() and in the
+collector of the current run, which the entry points save next to their
+state (see run_stats.py); the mock provider (see
+llm/mock_provider.py) simulates a prefix cache, so the reuse can be
+measured offline.
+"""
+import contextlib
+import contextvars
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from llm.task_context import current_task_name, track_tasks
+
+SHARED_HEADER = ("Shared project context for all the tasks of this run. "
+                 "Task descriptions refer to its sections as [shared context: <name>].")
+# providers that cache only up to explicit breakpoints
+BREAKPOINT_MODELS = ("anthropic/", "claude", "bedrock/anthropic", "vertex_ai/claude")
+
+# ((name, raw text, normalized text), ...) in canonical order
+_shared: contextvars.ContextVar[Tuple[Tuple[str, str, str], ...]] = contextvars.ContextVar(
+    "prompt_shared_context", default=())
+
+
+def normalize(text: str) -> str:
+    """Line endings and trailing whitespace made canonical, so equal content is byte-identical."""
+    return "\n".join(line.rstrip() for line in text.replace("\r\n", "\n").split("\n")).strip()
+
+
+@contextlib.contextmanager
+def shared_context(blocks: Dict[str, str]) -> Iterator[None]:
+    """Put `blocks` first in the prompts of the LLM calls made inside the block (in this thread)."""
+    track_tasks()
+    entries = tuple((name, text, normalize(text)) for name, text in sorted(blocks.items()) if text and text.strip())
+    token = _shared.set(entries)
+    try:
+        yield
+    finally:
+        _shared.reset(token)
+
+
+def supports_breakpoints(model: Optional[str]) -> bool:
+    model = (model or "").lower()
+    return any(model.startswith(prefix) or prefix in model for prefix in BREAKPOINT_MODELS)
+
+
+def _text(content: Any) -> Optional[str]:
+    return content if isinstance(content, str) else None
+
+
+def _mark(message: Dict[str, Any]) -> Dict[str, Any]:
+    text = _text(message.get("content"))
+    if text is None:
+        return message
+    return {**message, "content": [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]}
+
+
+def layout(messages: Any, model: Optional[str] = None) -> Any:
+    """The messages of one LLM call, with the shared context of this run moved in front of them."""
+    entries = _shared.get()
+    if not entries or not isinstance(messages, list):
+        return messages
+
+    body: List[Dict[str, Any]] = []
+    for message in messages:
+        text = _text(message.get("content"))
+        if text is not None:
+            for name, raw, _ in entries:
+                if raw in text:
+                    text = text.replace(raw, f"[shared context: {name}]")
+            message = {**message, "content": text}
+        body.append(message)
+
+    sections = [SHARED_HEADER] + [f"## {name}\n{normalized}" for name, _, normalized in entries]
+    prefix = {"role": "system", "content": "\n\n".join(sections)}
+    if not supports_breakpoints(model):
+        return [prefix] + body
+    # second breakpoint after the agent's system prompt, shared by all the calls of that agent
+    first = next((i for i, m in enumerate(body) if m.get("role") == "system"), None)
+    if first is not None:
+        body[first] = _mark(body[first])
+    return [_mark(prefix)] + body
+
+
+# ────────── Stats ──────────
+def _field(value: Any, name: str) -> Any:
+    return value.get(name) if isinstance(value, dict) else getattr(value, name, None)
+
+
+def cached_tokens(usage: Any) -> Tuple[int, int]:
+    """(prompt tokens, prompt tokens read from the provider's cache) of a litellm / OpenAI usage."""
+    prompt = _field(usage, "prompt_tokens") or 0
+    details = _field(usage, "prompt_tokens_details")
+    cached = (details is not None and _field(details, "cached_tokens")) or _field(usage, "cache_read_input_tokens") or 0
+    return int(prompt), int(cached)
+
+
+class PromptCacheStats:
+    def __init__(self):
+        self._rows: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0})
+        self._lock = threading.Lock()
+
+    def record(self, task: Optional[str], prompt_tokens: int, cached: int):
+        with self._lock:
+            row = self._rows[task or "(no task)"]
+            row["calls"] += 1
+            row["prompt_tokens"] += prompt_tokens
+            row["cached_tokens"] += cached
+
+    def log_success_event(self, kwargs: Dict[str, Any], response_obj: Any, start_time: Any, end_time: Any):
+        """litellm-style callback: crewai and the mock LLM call it with the usage of every response."""
+        usage = _field(response_obj, "usage")
+        if usage is not None:
+            self.record(current_task_name(), *cached_tokens(usage))
+
+    def reset(self):
+        with self._lock:
+            self._rows.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = {task: dict(row) for task, row in self._rows.items()}
+        total = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0}
+        for row in rows.values():
+            for key in total:
+                total[key] += row[key]
+        for row in list(rows.values()) + [total]:
+            row["hit_rate"] = round(row["cached_tokens"] / row["prompt_tokens"], 3) if row["prompt_tokens"] else 0.0
+        return {"tasks": rows, "total": total}
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+_stats = PromptCacheStats()
+# the stats of the current run, besides the process-wide ones (see collect_prompt_cache_stats)
+_run_stats: contextvars.ContextVar[Optional[PromptCacheStats]] = contextvars.ContextVar(
+    "run_prompt_cache_stats", default=None)
+
+
+def prompt_cache_stats() -> PromptCacheStats:
+    """Every LLM response of the process."""
+    return _stats
+
+
+@contextlib.contextmanager
+def collect_prompt_cache_stats() -> Iterator[PromptCacheStats]:
+    """Also count the LLM responses of this block (this context) in a PromptCacheStats of their own."""
+    stats = PromptCacheStats()
+    token = _run_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _run_stats.reset(token)
+
+
+def prompt_cache_callbacks() -> List[PromptCacheStats]:
+    """The stats an LLM call reports its usage to: the process-wide ones and the current run's."""
+    run = _run_stats.get()
+    return [_stats] if run is None else [_stats, run]
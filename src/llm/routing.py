@@ -0,0 +1,323 @@
+"""
+Per-task model routing by cost and latency tier.
+
+Every agent of a crew used to run on the crew's one model, so mechanical
+tasks (listing file metadata, reading a build result) paid for the same
+model as planning a migration. A `routing` entry on a task in tasks.yaml,
+or on an agent in agents.yaml, now picks a tier from llm/routing.yaml
+(override with REFORGE_ROUTING_FILE):
+
+    build_solution:
+      ...
+      routing:
+        tier: fast                # where the task starts
+        fallbacks: [standard]     # default: every stronger tier, in `order`
+        max_latency_s: 120        # a call that takes longer times out and falls back
+        expect:                   # checked on the task output
+          min_chars: 200
+          contains: ["BUILD"]
+
+A task's routing applies to the agent doing it, including coworkers it is
+delegated to; an agent's routing applies to its other work, and the
+manager only ever uses its own. Work with no routing keeps the crew's
+model, as before.
+
+A call moves down the tier list when it fails (timeout or error, after
+rate-limit waits) or when the model's answer cannot be parsed as a ReAct
+step. When the task output misses its `expect`, crewai retries the task
+(as a guardrail failure) and the retry starts one tier stronger. Calls,
+errors, fallbacks, escalations, latency and estimated cost are recorded per
+tier and model in routing_stats() and in the collector of the current run,
+which the entry points save next to their state (see run_stats.py).
+"""
+import contextlib
+import contextvars
+import json
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+from crewai.agents.parser import CrewAgentParser, OutputParserException
+from crewai.llms.base_llm import BaseLLM
+from crewai.tasks.task_output import TaskOutput
+
+from llm.client import build_llm
+from llm.scheduler import estimate_tokens, fail_fast
+from llm.task_context import task_stack, track_tasks
+
+DEFAULT_ROUTING_FILE = Path(__file__).with_name("routing.yaml")
+
+
+@dataclass
+class Tiers:
+    order: List[str]
+    models: Dict[str, Dict[str, str]]
+    prices: Dict[str, List[float]] = field(default_factory=dict)
+
+    def model(self, tier: str, provider: str) -> Optional[str]:
+        return self.models.get(tier, {}).get(provider)
+
+    def stronger(self, tier: str) -> List[str]:
+        return self.order[self.order.index(tier) + 1:] if tier in self.order else []
+
+
+@lru_cache(maxsize=None)
+def load_tiers(path: Optional[str] = None) -> Tiers:
+    path = path or os.getenv("REFORGE_ROUTING_FILE") or str(DEFAULT_ROUTING_FILE)
+    with open(path) as f:
+        data = yaml.safe_load(f) or {}
+    models = data.get("tiers", {})
+    return Tiers(order=list(data.get("order") or models), models=models, prices=data.get("prices") or {})
+
+
+@dataclass
+class Route:
+    chain: List[str]
+    max_latency_s: Optional[float] = None
+    expect: Dict[str, Any] = field(default_factory=dict)
+
+
+# ────────── Stats ──────────
+class RoutingStats:
+    """Per tier and model: calls, failures, latency and estimated cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=2000))
+        self._tasks: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, tier: str, model: str, task: Optional[str], outcome: str, latency_s: float,
+               tokens_in: int = 0, tokens_out: int = 0, slow: bool = False):
+        """outcome: ok, invalid (unparseable answer), error, escalated or fallback (moved to the next tier)."""
+        price_in, price_out = load_tiers().prices.get(model, [0.0, 0.0])
+        key = f"{tier}:{model}"
+        with self._lock:
+            row = self._rows.setdefault(key, {
+                "tier": tier, "model": model, "calls": 0, "ok": 0, "invalid": 0, "error": 0,
+                "escalated": 0, "fallback": 0, "slow": 0, "tokens_in": 0, "tokens_out": 0, "cost_usd": 0.0,
+            })
+            row["calls"] += 1
+            row[outcome] += 1
+            row["slow"] += int(slow)
+            row["tokens_in"] += tokens_in
+            row["tokens_out"] += tokens_out
+            row["cost_usd"] += (tokens_in * price_in + tokens_out * price_out) / 1e6
+            self._latencies[key].append(latency_s)
+            self._tasks[task or "-"][tier] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            tiers = []
+            for key, row in self._rows.items():
+                ordered = sorted(self._latencies[key])
+                tiers.append({**row, "cost_usd": round(row["cost_usd"], 4),
+                              "p50_s": round(statistics.median(ordered), 3) if ordered else None,
+                              "p95_s": round(ordered[int(0.95 * (len(ordered) - 1))], 3) if ordered else None})
+            return {"tiers": tiers, "tasks": {t: dict(c) for t, c in self._tasks.items()}}
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+_stats = RoutingStats()
+# the stats of the current run, besides the process-wide ones (see collect_routing_stats)
+_run_stats: contextvars.ContextVar[Optional[RoutingStats]] = contextvars.ContextVar("run_routing_stats", default=None)
+
+
+def routing_stats() -> RoutingStats:
+    """Every LLM call of the process."""
+    return _stats
+
+
+@contextlib.contextmanager
+def collect_routing_stats() -> Iterator[RoutingStats]:
+    """Also count the LLM calls made in this block (this context) in a RoutingStats of their own."""
+    stats = RoutingStats()
+    token = _run_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _run_stats.reset(token)
+
+
+def _record(*args, **kwargs):
+    _stats.record(*args, **kwargs)
+    run = _run_stats.get()
+    if run is not None:
+        run.record(*args, **kwargs)
+
+
+def _expects_react(messages: Any) -> bool:
+    text = messages if isinstance(messages, str) else " ".join(str(m.get("content", "")) for m in messages)
+    return "Final Answer:" in text
+
+
+def _parses(response: Any) -> bool:
+    if not isinstance(response, str):
+        return True
+    try:
+        CrewAgentParser().parse(response)
+        return True
+    except OutputParserException:
+        return False
+
+
+# ────────── Router ──────────
+class ModelRouter:
+    """Routes of one crew, built from the `routing` entries of its agents and tasks configs."""
+
+    def __init__(self, agents_config: Dict[str, Any], tasks_config: Dict[str, Any], default_llm: BaseLLM,
+                 provider: Optional[str] = None):
+        track_tasks()
+        self.tiers = load_tiers()
+        self.provider = (provider or os.getenv("LLM_PROVIDER", "openai")).lower()
+        self.default_llm = default_llm
+        self._agents = {name: cfg.get("routing") for name, cfg in (agents_config or {}).items()
+                        if isinstance(cfg, dict) and cfg.get("routing")}
+        self._tasks = {name: cfg.get("routing") for name, cfg in (tasks_config or {}).items()
+                       if isinstance(cfg, dict) and cfg.get("routing")}
+        self._levels: Dict[str, int] = defaultdict(int)
+        self._clients: Dict[Tuple[str, Optional[float]], BaseLLM] = {}
+        self._lock = threading.Lock()
+
+    def _route(self, config: Optional[Dict[str, Any]]) -> Optional[Route]:
+        if not config or config.get("tier") not in self.tiers.models:
+            return None
+        tier = config["tier"]
+        fallbacks = config.get("fallbacks")
+        chain = [tier] + list(self.tiers.stronger(tier) if fallbacks is None else fallbacks)
+        chain = [t for t in chain if self.tiers.model(t, self.provider)]
+        return Route(chain, config.get("max_latency_s"), config.get("expect") or {}) if chain else None
+
+    def task_key(self, task: Any) -> Optional[str]:
+        """The tasks.yaml key of a task (the @task method may add a `_task` suffix); None if it has no routing."""
+        name = getattr(task, "name", None) or ""
+        for key in (name, name.removesuffix("_task")):
+            if key in self._tasks:
+                return key
+        return None
+
+    def current_task(self) -> Optional[str]:
+        # a delegated task is unnamed: the routing of the task it was delegated from applies
+        for task in reversed(task_stack()):
+            key = self.task_key(task)
+            if key:
+                return key
+        return None
+
+    def route(self, agent_name: str, manager: bool = False) -> Tuple[Optional[str], Optional[Route]]:
+        """(routed task, route) for a call of `agent_name` right now; no route means the crew's model."""
+        task = None if manager else self.current_task()
+        route = self._route(self._tasks.get(task)) if task else None
+        if route is None:
+            route = self._route(self._agents.get(agent_name))
+        if route is not None and task:
+            # retries of a task that missed its `expect` start further down the chain
+            route.chain = route.chain[min(self._levels[task], len(route.chain) - 1):]
+        return task, route
+
+    def client(self, tier: str, timeout: Optional[float]) -> BaseLLM:
+        with self._lock:
+            key = (tier, timeout)
+            if key not in self._clients:
+                kwargs = {"timeout": timeout} if timeout else {}
+                self._clients[key] = build_llm(
+                    model=self.tiers.model(tier, self.provider),
+                    api_key=os.getenv(f"{self.provider.upper()}_API_KEY"),
+                    **kwargs,
+                )
+            return self._clients[key]
+
+    def llm_for(self, agent_name: str, manager: bool = False) -> "RoutedLLM":
+        return RoutedLLM(self, agent_name, manager)
+
+    # ────────── Task outputs ──────────
+    def _guardrail(self, key: str, expect: Dict[str, Any]) -> Callable[[TaskOutput], Tuple[bool, Any]]:
+        def check(output: TaskOutput) -> Tuple[bool, Any]:
+            raw = output.raw or ""
+            problems = []
+            if len(raw) < expect.get("min_chars", 0):
+                problems.append(f"the answer is shorter than {expect['min_chars']} characters")
+            missing = [s for s in expect.get("contains", []) if s not in raw]
+            if missing:
+                problems.append(f"the answer does not mention {', '.join(missing)}")
+            if not problems:
+                return True, output
+            with self._lock:
+                self._levels[key] += 1
+            return False, "; ".join(problems).capitalize() + "."
+        return check
+
+    def install(self, crew: Any):
+        """Check the output of every task with an `expect` (a miss retries the task one tier stronger)."""
+        for task in crew.tasks:
+            key = self.task_key(task)
+            expect = (self._tasks.get(key) or {}).get("expect") if key else None
+            if expect and task.guardrail is None:
+                task.guardrail = self._guardrail(key, expect)
+                task._guardrail = task.guardrail
+        return crew
+
+
+class RoutedLLM(BaseLLM):
+    """An agent's LLM: each call goes to the model of the tier its routing picks at that moment."""
+
+    def __init__(self, router: ModelRouter, agent_name: str, manager: bool = False):
+        super().__init__(model=router.default_llm.model)
+        self.router = router
+        self.agent_name = agent_name
+        self.manager = manager
+
+    def _call(self, llm: BaseLLM, messages, tools, callbacks, available_functions):
+        if self.stop:
+            # crewai sets the ReAct stop words on the agent's LLM
+            llm.stop = sorted(set((llm.stop or []) + list(self.stop)))
+        return llm.call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None):
+        task, route = self.router.route(self.agent_name, self.manager)
+        if route is None:
+            return self._call(self.router.default_llm, messages, tools, callbacks, available_functions)
+
+        react = _expects_react(messages)
+        tokens_in = estimate_tokens(messages)
+        for i, tier in enumerate(route.chain):
+            last = i == len(route.chain) - 1
+            llm = self.router.client(tier, route.max_latency_s)
+            start = time.perf_counter()
+            try:
+                with contextlib.nullcontext() if last else fail_fast():
+                    response = self._call(llm, messages, tools, callbacks, available_functions)
+            except Exception:
+                _record(tier, llm.model, task, "error" if last else "fallback",
+                              time.perf_counter() - start, tokens_in)
+                if last:
+                    raise
+                continue
+            latency = time.perf_counter() - start
+            slow = bool(route.max_latency_s and latency > route.max_latency_s)
+            valid = not react or _parses(response)
+            outcome = "ok" if valid else ("invalid" if last else "escalated")
+            _record(tier, llm.model, task, outcome, latency, tokens_in,
+                          estimate_tokens(response if isinstance(response, str) else None), slow)
+            if valid or last:
+                return response
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        # crewai trims the conversation against the crew's model, the reference for every tier
+        return self.router.default_llm.get_context_window_size()
@@ -0,0 +1,352 @@
+"""
+Process-wide rate limiting and retries for LLM calls.
+
+Every crew builds its own LLM client, so agents running in parallel (the
+batch runners, the job server) each hit the provider at full speed and,
+after a 429, all retry at once. Calls made through build_llm() (see
+llm/client.py) go through one LLMScheduler per process instead, with a
+limiter per provider/model:
+
+  * two token buckets, one for requests and one for tokens per minute
+    (REFORGE_LLM_RPM / REFORGE_LLM_TPM; unset means no limit until the
+    provider pushes back). Tokens are estimated from the prompt before the
+    call and corrected with the response after it;
+  * waiting calls are served by priority, then in arrival order; code on
+    the critical path raises its priority with `with llm_priority(...)`;
+  * a rate-limit error halves the request rate (every successful call
+    raises it again by a few percent, up to the configured limit) and
+    pauses the whole limiter until the provider's reset time, taken from
+    the retry-after / x-ratelimit-* / anthropic-ratelimit-* headers when
+    the error carries them;
+  * rate-limit, overload, 5xx and connection errors are retried with
+    jittered exponential backoff (REFORGE_LLM_MAX_RETRIES, default 6).
+
+    with llm_priority(PRIORITY_CRITICAL):
+        crew.kickoff(inputs)
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+PRIORITY_CRITICAL = 10
+PRIORITY_NORMAL = 0
+PRIORITY_BACKGROUND = -10
+
+# share of a minute's quota a full bucket lets through in one burst
+BURST = 1 / 6
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 60.0
+# a request rate lowered by a 429 grows back by this factor with every successful call
+RECOVER_FACTOR = 1.05
+MIN_RPM = 6.0
+
+_DURATION = re.compile(r"(?:([\d.]+)h)?(?:([\d.]+)m(?!s))?(?:([\d.]+)s)?(?:([\d.]+)ms)?")
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=PRIORITY_NORMAL)
+_fail_fast: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_fail_fast", default=False)
+
+
+@contextlib.contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """Serve the LLM calls made inside the block (in this thread) before lower-priority ones."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextlib.contextmanager
+def fail_fast() -> Iterator[None]:
+    """Inside the block, only rate limits are retried; other errors are raised at once (the caller has a fallback)."""
+    token = _fail_fast.set(True)
+    try:
+        yield
+    finally:
+        _fail_fast.reset(token)
+
+
+def estimate_tokens(messages: Union[str, List[Dict[str, Any]], None]) -> int:
+    """Rough token count (4 characters a token), good enough to pace requests."""
+    if messages is None:
+        return 0
+    text = messages if isinstance(messages, str) else json.dumps(messages, default=str)
+    return max(1, len(text) // 4)
+
+
+# ────────── Errors ──────────
+def _headers(error: BaseException) -> Mapping[str, str]:
+    for holder in (error, getattr(error, "response", None)):
+        headers = getattr(holder, "headers", None)
+        if headers:
+            # litellm prefixes the provider's headers on some responses
+            return {str(k).lower().replace("llm_provider-", ""): str(v) for k, v in dict(headers).items()}
+    return {}
+
+
+def _status(error: BaseException) -> Optional[int]:
+    for holder in (error, getattr(error, "response", None)):
+        status = getattr(holder, "status_code", None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def is_rate_limit(error: BaseException) -> bool:
+    return _status(error) == 429 or "RateLimit" in type(error).__name__
+
+
+def is_retryable(error: BaseException) -> bool:
+    if is_rate_limit(error):
+        return True
+    status = _status(error)
+    if status is not None:
+        # 529: Anthropic is overloaded
+        return status in (408, 409, 529) or status >= 500
+    name = type(error).__name__
+    return any(part in name for part in ("Timeout", "APIConnection", "ServiceUnavailable", "InternalServer"))
+
+
+def _duration_s(value: str) -> Optional[float]:
+    """'1.5', '20ms', '6m0s', '1h2m3.5s', an HTTP date or an RFC 3339 time -> seconds from now."""
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    match = _DURATION.fullmatch(value)
+    if match and any(match.groups()):
+        hours, minutes, seconds, millis = (float(g or 0) for g in match.groups())
+        return hours * 3600 + minutes * 60 + seconds + millis / 1000
+    for parse in (lambda v: datetime.fromisoformat(v.replace("Z", "+00:00")), parsedate_to_datetime):
+        try:
+            return max(0.0, parse(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def retry_after_s(error: BaseException) -> Optional[float]:
+    """How long the provider asked us to wait, from the headers (or attributes) of a rate-limit error."""
+    headers = _headers(error)
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    waits = []
+    if "retry-after" in headers:
+        waits.append(_duration_s(headers["retry-after"]))
+    for kind in ("requests", "tokens", "input-tokens", "output-tokens"):
+        for remaining, reset in ((f"x-ratelimit-remaining-{kind}", f"x-ratelimit-reset-{kind}"),
+                                 (f"anthropic-ratelimit-{kind}-remaining", f"anthropic-ratelimit-{kind}-reset")):
+            if headers.get(remaining, "").strip() in ("0", "0.0") and reset in headers:
+                waits.append(_duration_s(headers[reset]))
+    waits = [w for w in waits if w is not None]
+    if waits:
+        return max(waits)
+    value = getattr(error, "retry_after", None)
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+# ────────── Limiter ──────────
+class _Bucket:
+    """Token bucket refilled with `per_minute` every `minute_s` seconds; None means unlimited."""
+
+    def __init__(self, per_minute: Optional[float], minute_s: float = 60.0):
+        self.per_minute = per_minute
+        self.minute_s = minute_s
+        self.level = self.capacity
+
+    @property
+    def capacity(self) -> float:
+        return float("inf") if self.per_minute is None else max(1.0, self.per_minute * BURST)
+
+    def refill(self, elapsed_s: float):
+        if self.per_minute is not None:
+            self.level = min(self.capacity, self.level + elapsed_s * self.per_minute / self.minute_s)
+
+    def wait_s(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (an oversized amount only needs a full bucket)."""
+        if self.per_minute is None:
+            return 0.0
+        needed = min(amount, self.capacity) - self.level
+        return 0.0 if needed <= 0 else needed * self.minute_s / self.per_minute
+
+
+class RateLimiter:
+    """Request and token buckets of one provider/model, served in priority order."""
+
+    def __init__(self, key: str, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 minute_s: float = 60.0):
+        self.key = key
+        self.max_rpm = rpm
+        self.minute_s = minute_s
+        self.requests = _Bucket(rpm, minute_s)
+        self.tokens = _Bucket(tpm, minute_s)
+        self.paused_until = 0.0
+        self.stats = {"calls": 0, "rate_limited": 0, "retries": 0, "waited_s": 0.0}
+        self._refilled = time.monotonic()
+        self._recent: Deque[float] = deque()
+        self._waiting: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._changed = threading.Condition()
+
+    def _refill(self, now: float):
+        elapsed = now - self._refilled
+        self._refilled = now
+        self.requests.refill(elapsed)
+        self.tokens.refill(elapsed)
+
+    def acquire(self, tokens: int, priority: int = PRIORITY_NORMAL):
+        """Block until this call may go out: nothing more urgent waits and both buckets have room."""
+        ticket = (-priority, next(self._seq))
+        start = time.monotonic()
+        with self._changed:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = max(self.paused_until - now, self.requests.wait_s(1), self.tokens.wait_s(tokens))
+                    if self._waiting[0] == ticket and wait <= 0:
+                        break
+                    # woken early when a call ahead of us goes out or the limits change
+                    self._changed.wait(wait if wait > 0 else None)
+                heapq.heappop(self._waiting)
+                self.requests.level -= 1
+                self.tokens.level -= tokens
+                self._observed_rpm(now)
+                self._recent.append(now)
+                self.stats["calls"] += 1
+                self.stats["waited_s"] += now - start
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                raise
+            finally:
+                self._changed.notify_all()
+
+    def settle(self, tokens: int):
+        """Charge the tokens of the response (the prompt's were taken before the call)."""
+        with self._changed:
+            self.tokens.level -= tokens
+            self._changed.notify_all()
+
+    def _observed_rpm(self, now: float) -> float:
+        while self._recent and self._recent[0] < now - self.minute_s:
+            self._recent.popleft()
+        return float(len(self._recent))
+
+    def on_success(self):
+        with self._changed:
+            if self.requests.per_minute is None or self.requests.per_minute == self.max_rpm:
+                return
+            raised = self.requests.per_minute * RECOVER_FACTOR
+            if self.max_rpm is not None:
+                self.requests.per_minute = min(raised, self.max_rpm)
+            elif raised >= 2 * self._observed_rpm(time.monotonic()):
+                # a learned limit well above the actual traffic no longer limits anything
+                self.requests = _Bucket(None, self.minute_s)
+            else:
+                self.requests.per_minute = raised
+            self._changed.notify_all()
+
+    def on_rate_limit(self, wait_s: Optional[float]):
+        """Halve the request rate and hold every call back until the provider's reset time."""
+        with self._changed:
+            now = time.monotonic()
+            self.stats["rate_limited"] += 1
+            current = self.requests.per_minute or self._observed_rpm(now)
+            self.requests.per_minute = max(min(MIN_RPM, self.max_rpm or MIN_RPM), current / 2)
+            self.requests.level = min(self.requests.level, 0.0)
+            if wait_s:
+                self.paused_until = max(self.paused_until, now + wait_s)
+            self._changed.notify_all()
+
+
+# ────────── Scheduler ──────────
+class LLMScheduler:
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None, max_retries: int = 6,
+                 minute_s: float = 60.0):
+        # minute_s only differs from 60 in benchmarks against a mock provider with a shorter window
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.minute_s = minute_s
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, key: str) -> RateLimiter:
+        with self._lock:
+            if key not in self._limiters:
+                self._limiters[key] = RateLimiter(key, self.rpm, self.tpm, self.minute_s)
+            return self._limiters[key]
+
+    def configure(self, key: str, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """Set the limits of one provider/model (before its first call)."""
+        with self._lock:
+            self._limiters[key] = RateLimiter(key, rpm, tpm, self.minute_s)
+
+    def call(self, key: str, fn: Callable[[], Any], messages: Any = None,
+             priority: Optional[int] = None) -> Any:
+        """Run `fn` (one LLM request) within the limits of `key`, retrying transient errors."""
+        limiter = self.limiter(key)
+        priority = _priority.get() if priority is None else priority
+        estimate = estimate_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire(estimate, priority)
+            try:
+                response = fn()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e) or (_fail_fast.get() and not is_rate_limit(e)):
+                    raise
+                wait = retry_after_s(e) if is_rate_limit(e) else None
+                if is_rate_limit(e):
+                    limiter.on_rate_limit(wait)
+                limiter.stats["retries"] += 1
+                # full jitter, so the callers that failed together do not retry together
+                backoff = random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** attempt))
+                time.sleep(max(wait or 0.0, backoff))
+                continue
+            limiter.settle(estimate_tokens(response if isinstance(response, str) else None))
+            limiter.on_success()
+            return response
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {key: {**limiter.stats, "rpm": limiter.requests.per_minute}
+                    for key, limiter in self._limiters.items()}
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+def scheduler() -> LLMScheduler:
+    """The process-wide scheduler, configured from the environment on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                rpm=_env_float("REFORGE_LLM_RPM"),
+                tpm=_env_float("REFORGE_LLM_TPM"),
+                max_retries=int(os.getenv("REFORGE_LLM_MAX_RETRIES", "6")),
+            )
+        return _scheduler
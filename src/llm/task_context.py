@@ -0,0 +1,56 @@
+"""
+Which crew task the current thread is working on.
+
+The agents of a crew emit execution events on crewai's event bus (handlers
+run synchronously, in the agent's thread); track_tasks() keeps a per-thread
+stack of the tasks being executed, so code deep in an LLM call (routing,
+prompt-cache accounting) can tell which task a call belongs to. Delegation
+nests one task in another, hence a stack.
+"""
+import threading
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.agent_events import (
+    AgentExecutionCompletedEvent, AgentExecutionErrorEvent, AgentExecutionStartedEvent,
+)
+
+_local = threading.local()
+
+
+def task_stack() -> List[Any]:
+    """Tasks the agents of this thread are executing, innermost last."""
+    if not hasattr(_local, "tasks"):
+        _local.tasks = []
+    return _local.tasks
+
+
+@lru_cache(maxsize=None)
+def track_tasks():
+    """Register the event handlers (once per process)."""
+
+    @crewai_event_bus.on(AgentExecutionStartedEvent)
+    def _started(source, event):
+        task_stack().append(event.task)
+
+    @crewai_event_bus.on(AgentExecutionCompletedEvent)
+    def _completed(source, event):
+        _pop(event.task)
+
+    @crewai_event_bus.on(AgentExecutionErrorEvent)
+    def _failed(source, event):
+        _pop(event.task)
+
+    def _pop(task):
+        stack = task_stack()
+        if stack and stack[-1] is task:
+            stack.pop()
+
+
+def current_task_name() -> Optional[str]:
+    """Name of the innermost named task of this thread (delegated tasks are unnamed), or None."""
+    for task in reversed(task_stack()):
+        if getattr(task, "name", None):
+            return task.name
+    return None
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Long-running job server for the documentation and modernization crews.
+
+gen_docs.py, gen_modern.py and gen_modern_docs.py are one-shot scripts: each
+run pays the crewai/tool imports and rebuilds the LLM client, the tools and
+their caches. This server does that once and keeps the process alive, so
+jobs submitted over HTTP start warm:
+
+  * crewai, the crews, their tools and the LLM client are imported and built
+    at start-up;
+  * the Java source indexes (tools/java_source_index.py) stay resident per
+    codebase and are only refreshed for files that changed;
+  * web-search results are shared by every job (see gen_docs_batch.py);
+  * the on-disk static-analysis and checkpoint caches are reused as usual.
+
+Jobs wait in a queue and run on a bounded pool of worker threads. Two jobs
+on the same codebase never run at the same time. What a job prints (crew
+logs included) is captured as its progress and can be streamed while it
+runs; cancelling a running job stops it at the agent's next step, and
+terminates the external command (mvn, jdeps, git clone, ...) it is
+waiting for.
+
+    python3 reforge_server.py --port 8765 --workers 2
+    python3 reforge_server.py --socket /tmp/reforge.sock
+
+    POST   /jobs                   {"kind": "docs", "source": "<path or git url>", "resume": false, "priority": 10}
+                                   {"kind": "modern", "code_path": ..., "kb_path": ..., "state_path": ...}
+                                   {"kind": "modern_docs", "code_path": ..., "kb_path": ..., "state_path": ...}
+    GET    /jobs                   all jobs
+    GET    /jobs/<id>              one job
+    GET    /jobs/<id>/events       progress as JSON lines (?since=<seq>; ?follow=1 streams until the job ends)
+    DELETE /jobs/<id>              cancel
+    GET    /health
+
+A docs job reuses the unchanged checkpoints of earlier jobs on the same
+codebase unless it is submitted with "resume": false. Each job saves the
+routing, prompt-cache and command stats of its own calls in its state
+folder (see run_stats.py); /health reports those of the whole process.
+
+Jobs share the process-wide LLM rate limiter (see llm/scheduler.py); the
+LLM calls of a job with a higher `priority` are served first.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import re
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# LangTrace setup and the single-repo steps are shared with gen_docs.py
+from gen_docs import document, prepare_codebase
+from gen_docs_batch import search_cache_factory
+from llm.scheduler import PRIORITY_NORMAL, llm_priority, scheduler
+from registry import crew_class, tool
+from tools.subprocess_runner import cancel_commands, command_stats
+
+JOB_KINDS = ("docs", "modern", "modern_docs")
+MAX_EVENTS = 5000
+FINISHED = ("done", "failed", "cancelled")
+
+
+class JobCancelled(BaseException):
+    """Raised in a job's thread to stop its crew (a BaseException, so crewai's retries do not catch it)."""
+
+
+# ────────── Jobs ──────────
+class Job:
+    def __init__(self, kind: str, params: Dict[str, Any], log_dir: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.cancel_requested = False
+        self.cancel_event = threading.Event()
+        self.log_path = os.path.join(log_dir, f"{self.id}.log")
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=MAX_EVENTS)
+        self._seq = itertools.count(1)
+        self._partial = ""
+        self._changed = threading.Condition()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "kind": self.kind, "params": self.params, "status": self.status,
+            "created": self.created, "started": self.started, "finished": self.finished,
+            "result": self.result, "error": self.error, "log": self.log_path,
+        }
+
+    # ────────── Progress ──────────
+    def event(self, type: str, **fields):
+        with self._changed:
+            self._events.append({"seq": next(self._seq), "at": time.time(), "type": type, **fields})
+            self._changed.notify_all()
+
+    def write(self, text: str):
+        """Collect printed output; every complete line becomes a `log` event."""
+        with open(self.log_path, "a") as f:
+            f.write(text)
+        lines = (self._partial + text).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            if line.strip():
+                self.event("log", line=line)
+
+    def set_status(self, status: str, **fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+        self.status = status
+        self.event("status", status=status, **fields)
+
+    def events(self, since: int = 0, wait: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Events after `since`; with `wait`, block up to that long for one while the job is unfinished."""
+        with self._changed:
+            if wait and self.status not in FINISHED and not any(e["seq"] > since for e in self._events):
+                self._changed.wait(wait)
+            return [e for e in self._events if e["seq"] > since]
+
+    def step_callback(self, step: Any):
+        """Crew step callback: report the step, and stop the crew when the job was cancelled."""
+        if self.cancel_requested:
+            raise JobCancelled()
+        tool_name = getattr(step, "tool", None)
+        self.event("step", agent_step=type(step).__name__, **({"tool": tool_name} if tool_name else {}))
+
+
+class _JobOutput:
+    """sys.stdout replacement: output of a job's thread goes to that job, everything else passes through."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    @property
+    def job(self) -> Optional[Job]:
+        return getattr(self._local, "job", None)
+
+    @job.setter
+    def job(self, job: Optional[Job]):
+        self._local.job = job
+
+    def write(self, text: str) -> int:
+        job = self.job
+        if job is None:
+            return self._stream.write(text)
+        job.write(text)
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self._stream, name)
+
+
+# ────────── Server ──────────
+class JobServer:
+    def __init__(self, out_dir: str, kb_dir: str, workers: int = 2):
+        self.out_dir = os.path.abspath(out_dir)
+        self.kb_dir = kb_dir
+        self.jobs: Dict[str, Job] = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._codebase_locks: Dict[str, threading.Lock] = {}
+        self._cache_factory: Optional[Callable] = None
+        self._output = _JobOutput(sys.stdout)
+        os.makedirs(os.path.join(self.out_dir, "jobs"), exist_ok=True)
+
+    def warm_up(self):
+        """Import the crews and tools and build the LLM client once, before the first job."""
+        from crews.documentation.documentation_crew import llm_client
+        for name in ("documentation", "gen_modern", "gen_modern_docs"):
+            crew_class(name)
+        llm_client()
+        tool("static_analyzer")
+        self._cache_factory = search_cache_factory()
+        sys.stdout = self._output
+
+    # ────────── Queue ──────────
+    def submit(self, request: Dict[str, Any]) -> Job:
+        kind = request.get("kind")
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'. Known kinds: {', '.join(JOB_KINDS)}")
+        params = {k: v for k, v in request.items() if k != "kind"}
+        if kind == "docs" and not params.get("source"):
+            raise ValueError("A docs job needs a `source` (codebase path or git URL)")
+        if kind != "docs":
+            missing = [k for k in ("code_path", "kb_path", "state_path") if not params.get(k)]
+            if missing:
+                raise ValueError(f"A {kind} job needs {', '.join(missing)}")
+        job = Job(kind, params, os.path.join(self.out_dir, "jobs"))
+        with self._lock:
+            self.jobs[job.id] = job
+        job.event("status", status="queued")
+        self._pool.submit(self._execute, job)
+        return job
+
+    def cancel(self, job: Job) -> Job:
+        job.cancel_requested = True
+        job.cancel_event.set()
+        if job.status == "queued":
+            job.set_status("cancelled", finished=time.time())
+        elif job.status == "running":
+            job.event("cancel_requested")
+        return job
+
+    @staticmethod
+    def _codebase_key(job: Job) -> str:
+        """The identity of the job's codebase: its git URL or real path. Locks and job folders use it."""
+        key = str(job.params.get("source") or job.params.get("code_path"))
+        return key.rstrip("/") if key.startswith("http") else os.path.realpath(key)
+
+    def _codebase_lock(self, job: Job) -> threading.Lock:
+        with self._lock:
+            return self._codebase_locks.setdefault(self._codebase_key(job), threading.Lock())
+
+    def _execute(self, job: Job):
+        if job.cancel_requested:
+            return
+        with self._codebase_lock(job):
+            if job.cancel_requested:
+                return
+            job.set_status("running", started=time.time())
+            self._output.job = job
+            try:
+                # a job submitted with a higher priority gets its LLM calls served first
+                with llm_priority(int(job.params.get("priority", PRIORITY_NORMAL))), \
+                        cancel_commands(job.cancel_event):
+                    result = getattr(self, f"_run_{job.kind}")(job)
+                job.set_status("done", result=result, finished=time.time())
+            except JobCancelled:
+                job.set_status("cancelled", finished=time.time())
+            except Exception as e:
+                if job.cancel_requested:
+                    # e.g. the clone or build it was waiting for was terminated
+                    job.set_status("cancelled", finished=time.time())
+                    return
+                job.write(traceback.format_exc())
+                job.set_status("failed", error=str(e), finished=time.time())
+            finally:
+                self._output.job = None
+
+    # ────────── Job kinds ──────────
+    def _job_dir(self, job: Job) -> str:
+        key = self._codebase_key(job)
+        name = job.params.get("name") or re.sub(r"\.git$", "", key.rstrip("/").rsplit("/", 1)[-1])
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", name) or "repo"
+        # one folder per codebase, so `resume` finds the checkpoints of earlier jobs; the hash keeps
+        # a/api.git and b/api.git apart, matching the per-codebase lock
+        digest = hashlib.sha1(key.encode()).hexdigest()[:8]
+        return os.path.join(self.out_dir, f"{name}-{digest}")
+
+    def _run_docs(self, job: Job) -> str:
+        repo_dir = self._job_dir(job)
+        codebase = prepare_codebase(job.params["source"], clone_dir=os.path.join(repo_dir, "codebase"),
+                                    compile=job.params.get("compile", True))
+        return document(codebase, os.path.join(repo_dir, "docs"), os.path.join(repo_dir, "state"),
+                        job.params.get("kb") or self.kb_dir, resume=job.params.get("resume", True),
+                        cache_handler=self._cache_factory(), step_callback=job.step_callback)
+
+    def _run_modern(self, job: Job) -> str:
+        from gen_modern import modernize
+        p = job.params
+        kwargs = {"plan_step": p["plan_step"]} if p.get("plan_step") else {}
+        return modernize(p["code_path"], p["kb_path"], p["state_path"], unattended=True,
+                         step_callback=job.step_callback, **kwargs)
+
+    def _run_modern_docs(self, job: Job) -> str:
+        from gen_modern_docs import modernize_docs
+        p = job.params
+        return modernize_docs(p["code_path"], p["kb_path"], p["state_path"], unattended=True,
+                              step_callback=job.step_callback)
+
+    def health(self) -> Dict[str, Any]:
+        from crews.plan_cache import plan_cache
+        from llm.routing import routing_stats
+        counts: Dict[str, int] = {}
+        for job in list(self.jobs.values()):
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"ok": True, "warm": self._cache_factory is not None, "jobs": counts, "llm": scheduler().stats(),
+                "routing": routing_stats().summary(), "plans": plan_cache().stats(),
+                "commands": command_stats().summary()["programs"]}
+
+
+# ────────── HTTP ──────────
+class JobRequestHandler(BaseHTTPRequestHandler):
+    server_version = "reforge"
+    jobs: JobServer  # set on the subclass made by serve()
+
+    def address_string(self) -> str:
+        # unix-socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args):
+        sys.__stderr__.write(f"{self.address_string()} {format % args}\n")
+
+    def _send(self, status: int, body: Any):
+        payload = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _route(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        job = None
+        if len(parts) >= 2 and parts[0] == "jobs":
+            job = self.jobs.jobs.get(parts[1])
+            if job is None:
+                self._send(404, {"error": f"No job '{parts[1]}'"})
+                return None
+        return parts, query, job
+
+    def do_GET(self):
+        route = self._route()
+        if route is None:
+            return
+        parts, query, job = route
+        if parts == ["health"]:
+            self._send(200, self.jobs.health())
+        elif parts == ["jobs"]:
+            self._send(200, [j.to_dict() for j in self.jobs.jobs.values()])
+        elif len(parts) == 2 and job:
+            self._send(200, job.to_dict())
+        elif len(parts) == 3 and job and parts[2] == "events":
+            self._events(job, int(query.get("since", 0)), query.get("follow") in ("1", "true"))
+        else:
+            self._send(404, {"error": f"No route for GET {self.path}"})
+
+    def _events(self, job: Job, since: int, follow: bool):
+        if not follow:
+            self._send(200, job.events(since))
+            return
+        # JSON lines until the job ends; the connection closing marks the end of the stream
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            while True:
+                finished = job.status in FINISHED
+                for event in job.events(since, wait=None if finished else 15):
+                    self.wfile.write((json.dumps(event, default=str) + "\n").encode())
+                    since = event["seq"]
+                self.wfile.flush()
+                if finished:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def do_POST(self):
+        route = self._route()
+        if route is None:
+            return
+        parts, _, job = route
+        if parts == ["jobs"]:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(request, dict):
+                    raise ValueError("The body must be a JSON object")
+                self._send(202, self.jobs.submit(request).to_dict())
+            except ValueError as e:
+                self._send(400, {"error": str(e)})
+        elif len(parts) == 3 and job and parts[2] == "cancel":
+            self._send(200, self.jobs.cancel(job).to_dict())
+        else:
+            self._send(404, {"error": f"No route for POST {self.path}"})
+
+    def do_DELETE(self):
+        route = self._route()
+        if route is None:
+            return
+        parts, _, job = route
+        if len(parts) == 2 and job:
+            self._send(200, self.jobs.cancel(job).to_dict())
+        else:
+            self._send(404, {"error": f"No route for DELETE {self.path}"})
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        # BaseHTTPRequestHandler expects these
+        self.server_name, self.server_port = "localhost", 0
+
+
+def serve(jobs: JobServer, host: str = "127.0.0.1", port: int = 8765, unix_socket: Optional[str] = None):
+    handler = type("Handler", (JobRequestHandler,), {"jobs": jobs})
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.remove(unix_socket)
+        httpd = ThreadingUnixHTTPServer(unix_socket, handler)
+        where = unix_socket
+    else:
+        httpd = ThreadingHTTPServer((host, port), handler)
+        where = f"http://{host}:{httpd.server_port}"
+    print(f"🚀 Reforge job server listening on {where}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        if unix_socket and os.path.exists(unix_socket):
+            os.remove(unix_socket)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve documentation and modernization jobs from a warm process")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (0 picks a free one)")
+    parser.add_argument("--socket", help="Listen on this unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=2, help="Jobs run at the same time")
+    parser.add_argument("--out", default="1-documentation/server", help="Folder for the docs, state and job logs")
+    parser.add_argument("--kb", default="kb-docs", help="KB folder for docs jobs (a job can override it with `kb`)")
+    args = parser.parse_args()
+
+    if args.socket and not hasattr(socket, "AF_UNIX"):
+        print("❌ Unix sockets are not supported on this platform."); sys.exit(1)
+
+    jobs = JobServer(args.out, args.kb, workers=max(1, args.workers))
+    print("Warming up crews, tools and the LLM client...")
+    jobs.warm_up()
+    serve(jobs, args.host, args.port, args.socket)
+
+
+if __name__ == "__main__":
+    main()
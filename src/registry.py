@@ -0,0 +1,74 @@
+"""
+Lazy registry of the tools and crews used by the entry points.
+
+Importing crewai_tools, langchain_community or a crew module costs seconds,
+so nothing here is imported until a tool or crew is actually requested:
+entry points can parse arguments, validate paths and fail fast before any
+of that cost is paid, and an agent only pulls in the tools it uses.
+
+    from registry import tool, crew_class
+    reader = tool("file_read")
+    DocumentationCrew = crew_class("documentation")
+"""
+import importlib
+from functools import lru_cache
+from typing import Any, Callable, Dict
+
+from tools.profiling import profile_tool
+
+# name -> "module:attribute"; the attribute is a class or a factory function
+TOOLS: Dict[str, str] = {
+    "batch_fs": "tools.batch_fs_tool:BatchFileOpsTool",
+    "code_parser": "tools.code_parser:CodeParserTool",
+    "db_parser": "tools.db_parser:DBParserTool",
+    "dependency_mapper": "tools.dependency_mapper:DependencyMapperTool",
+    "java_check": "tools.java_check_tool:JavaCheckTool",
+    "java_chunks": "tools.java_chunk_index:JavaChunksTool",
+    "jdeps": "tools.jdeps_tool:JDepsTool",
+    "maven_build": "tools.maven_build_tool:MavenBuildTool",
+    "patch_edit": "tools.patch_edit_tool:PatchEditTool",
+    "static_analyzer": "tools.static_analyzer_tool:StaticAnalyzerTool",
+    "table_access": "tools.table_access_index:TableAccessTool",
+    "shell": "tools.shell_session_tool:PersistentShellTool",
+    "test_runner": "tools.test_runner_tool:TestRunnerTool",
+    "directory_read": "crewai_tools:DirectoryReadTool",
+    "file_read": "crewai_tools:FileReadTool",
+    "file_writer": "crewai_tools:FileWriterTool",
+    "web_search": "llm.client:build_search_tool",
+    "file_management_toolkit": "langchain_community.agent_toolkits.file_management.toolkit:FileManagementToolkit",
+}
+
+CREWS: Dict[str, str] = {
+    "documentation": "crews.documentation.documentation_crew:DocumentationCrew",
+    "gen_modern": "crews.gen_modern.gen_modern_crew:GenModernCrew",
+    "gen_modern_code": "crews.gen_modern.gen_modern_code_crew:GenModernCrew",
+    "gen_modern_docs": "crews.gen_modern.gen_modern_docs_crew:GenModernCrew",
+}
+
+
+@lru_cache(maxsize=None)
+def _resolve(spec: str) -> Callable:
+    module_name, attribute = spec.split(":", 1)
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def tool_class(name: str) -> Callable:
+    if name not in TOOLS:
+        raise KeyError(f"Unknown tool '{name}'. Known tools: {', '.join(sorted(TOOLS))}")
+    # with REFORGE_PROFILE set, every call of the tool is counted and sampled (see tools/profiling.py)
+    return profile_tool(name, _resolve(TOOLS[name]))
+
+
+def tool(name: str, **kwargs: Any) -> Any:
+    """Import (on first use) and instantiate the tool registered as `name`."""
+    instance = tool_class(name)(**kwargs)
+    # tools built by a factory function (web_search): their class is only known now
+    profile_tool(name, type(instance))
+    return instance
+
+
+def crew_class(name: str) -> Callable:
+    """Import (on first use) and return the crew class registered as `name`."""
+    if name not in CREWS:
+        raise KeyError(f"Unknown crew '{name}'. Known crews: {', '.join(sorted(CREWS))}")
+    return _resolve(CREWS[name])
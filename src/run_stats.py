@@ -0,0 +1,33 @@
+# run_stats.py
+
+"""
+Stats of one documentation or modernization run.
+
+routing_stats(), prompt_cache_stats() and command_stats() count everything
+the process did, which is what the job server's /health reports. The files
+a run saves next to its state only count that run's own LLM calls and
+commands: collect_run_stats() gives the block a collector of each kind
+(through context variables, so the parallel runs of gen_docs_batch.py and
+the job server keep theirs apart) and writes them to `state_dir` once the
+block completes.
+"""
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def collect_run_stats(state_dir: str) -> Iterator[None]:
+    from llm.prompt_layout import collect_prompt_cache_stats
+    from llm.routing import collect_routing_stats
+    from tools.subprocess_runner import collect_command_stats
+
+    with collect_routing_stats() as routing, collect_prompt_cache_stats() as prompt_cache, \
+            collect_command_stats() as commands:
+        yield
+    # calls, cost and latency per model tier (see llm/routing.py)
+    routing.save(os.path.join(state_dir, "routing_stats.json"))
+    # prompt tokens served from the provider's prefix cache, per task (see llm/prompt_layout.py)
+    prompt_cache.save(os.path.join(state_dir, "prompt_cache_stats.json"))
+    # duration and output volume of the external commands (mvn, jdeps, git, ...) (see tools/subprocess_runner.py)
+    commands.save(os.path.join(state_dir, "command_stats.json"))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Check that BatchFileOpsTool never deletes, moves or replaces its own root.
+
+Run from the src folder:
+
+    python test_batch_fs.py
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+from tools.batch_fs_tool import BatchFileOpsTool
+
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "root"
+        (root / "pkg").mkdir(parents=True)
+        (root / "pkg" / "A.java").write_text("class A {}\n")
+        tool = BatchFileOpsTool(root_dir=str(root))
+
+        cases = [
+            {"op": "delete", "path": ".", "recursive": True},
+            {"op": "delete", "path": "", "recursive": True},
+            {"op": "delete", "path": "pkg/..", "recursive": True},
+            {"op": "move", "path": ".", "destination": "moved"},
+            {"op": "move", "path": "pkg", "destination": ".", "overwrite": True},
+            {"op": "copy", "path": "pkg", "destination": ".", "overwrite": True},
+            {"op": "copy", "path": ".", "destination": "pkg/copy"},
+        ]
+        for case in cases:
+            result = tool._run(operations=[case])
+            intact = (root / "pkg" / "A.java").is_file()
+            if result["ok"] or not intact:
+                failures += 1
+                print(f"❌ {case} was not rejected: {result['results'][0]}")
+            else:
+                print(f"✅ {case} rejected: {result['results'][0]['error']}")
+
+        result = tool._run(operations=[{"op": "copy", "path": "pkg", "destination": "pkg2"},
+                                       {"op": "delete", "path": "pkg2", "recursive": True}])
+        if result["ok"] and not (root / "pkg2").exists():
+            print("✅ operations below the root still work")
+        else:
+            failures += 1
+            print(f"❌ operations below the root failed: {result}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
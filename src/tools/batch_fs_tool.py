@@ -0,0 +1,173 @@
+# tools/batch_fs_tool.py
+
+"""
+Batched file operations for agents.
+
+FileManagementToolkit exposes one tool call per copy or delete, so moving a
+package around costs the agent dozens of steps. BatchFileOpsTool takes the
+whole list of copy, move, delete and mkdir operations in one call and
+reports a result per operation.
+
+Operations run on a thread pool. Two operations whose paths overlap (the
+same path, or one inside the other) keep their order: each operation goes
+in the first wave after every earlier operation it overlaps with, and the
+waves run one after the other. Independent operations run concurrently.
+
+All paths are relative to root_dir and may not leave it. The root itself
+can be the target of mkdir and the parent of copies, but never deleted,
+moved or overwritten.
+"""
+import asyncio
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Literal, Optional, Type
+
+from pydantic import BaseModel, Field, PrivateAttr
+from crewai.tools.base_tool import BaseTool
+
+MAX_WORKERS = 8
+
+
+class FileOperation(BaseModel):
+    op: Literal["copy", "move", "delete", "mkdir"] = Field(..., description="Operation to perform")
+    path: str = Field(..., description="Source path (the path to delete or create for delete/mkdir)")
+    destination: Optional[str] = Field(None, description="Destination path, for copy and move")
+    overwrite: bool = Field(False, description="Replace an existing destination (copy and move)")
+    recursive: bool = Field(False, description="Allow deleting a non-empty directory")
+
+
+class BatchFileOpsInput(BaseModel):
+    operations: List[FileOperation] = Field(
+        ..., description="File operations, applied in order where their paths overlap"
+    )
+
+
+class BatchFileOpsTool(BaseTool):
+    name: str = "batch_file_operations"
+    description: str = (
+        "Copy, move, delete files or folders and create folders in a single call. "
+        "Pass all the operations of a restructuring at once; each one gets its own result."
+    )
+    args_schema: Type[BatchFileOpsInput] = BatchFileOpsInput
+
+    _root: Path = PrivateAttr()
+    _pool: ThreadPoolExecutor = PrivateAttr()
+
+    def __init__(self, root_dir: Optional[str] = None, max_workers: int = MAX_WORKERS):
+        super().__init__()
+        self._root = Path(root_dir or os.getcwd()).resolve()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch-fs")
+
+    # ────────── Paths ──────────
+    def _resolve(self, relative: str) -> Path:
+        path = (self._root / relative).resolve()
+        if path != self._root and self._root not in path.parents:
+            raise PermissionError(f"'{relative}' is outside of {self._root}")
+        return path
+
+    def _resolve_inside(self, relative: str) -> Path:
+        """Like _resolve, for paths that get deleted or replaced: the root itself is refused."""
+        path = self._resolve(relative)
+        if path == self._root:
+            raise PermissionError(f"'{relative}' is the root {self._root}; it cannot be deleted, moved or replaced")
+        return path
+
+    @staticmethod
+    def _overlaps(a: Path, b: Path) -> bool:
+        return a == b or a in b.parents or b in a.parents
+
+    def _waves(self, operations: List[FileOperation]) -> List[List[int]]:
+        """Group operation indexes so overlapping operations land in successive waves, in input order."""
+        touched: List[List[Path]] = []
+        wave_of: List[int] = []
+        for i, operation in enumerate(operations):
+            paths = []
+            for relative in (operation.path, operation.destination):
+                if relative:
+                    try:
+                        paths.append(self._resolve(relative))
+                    except PermissionError:
+                        # rejected when executed; it has nothing to wait for
+                        pass
+            wave = 0
+            for j in range(i):
+                if any(self._overlaps(p, q) for p in paths for q in touched[j]):
+                    wave = max(wave, wave_of[j] + 1)
+            touched.append(paths)
+            wave_of.append(wave)
+        waves: List[List[int]] = [[] for _ in range(max(wave_of, default=-1) + 1)]
+        for i, wave in enumerate(wave_of):
+            waves[wave].append(i)
+        return waves
+
+    # ────────── Operations ──────────
+    def _apply(self, operation: FileOperation) -> Dict:
+        result = {"op": operation.op, "path": operation.path}
+        if operation.destination:
+            result["destination"] = operation.destination
+        try:
+            if operation.op in ("delete", "move"):
+                source = self._resolve_inside(operation.path)
+            else:
+                source = self._resolve(operation.path)
+            if operation.op == "mkdir":
+                source.mkdir(parents=True, exist_ok=True)
+            elif operation.op == "delete":
+                if source.is_dir() and not source.is_symlink():
+                    if any(source.iterdir()) and not operation.recursive:
+                        raise IsADirectoryError(f"'{operation.path}' is not empty; set recursive to delete it")
+                    shutil.rmtree(source)
+                else:
+                    source.unlink()
+            else:
+                if not operation.destination:
+                    raise ValueError(f"'{operation.op}' needs a destination")
+                target = self._resolve_inside(operation.destination)
+                if not source.exists():
+                    raise FileNotFoundError(f"'{operation.path}' does not exist")
+                if source in target.parents:
+                    raise ValueError(f"cannot {operation.op} '{operation.path}' into itself")
+                if target.exists():
+                    if not operation.overwrite:
+                        raise FileExistsError(f"'{operation.destination}' exists; set overwrite to replace it")
+                    if target.is_dir() and not target.is_symlink():
+                        shutil.rmtree(target)
+                    else:
+                        target.unlink()
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if operation.op == "move":
+                    shutil.move(str(source), str(target))
+                elif source.is_dir():
+                    shutil.copytree(source, target)
+                else:
+                    shutil.copy2(source, target)
+            result["ok"] = True
+        except (OSError, ValueError) as e:
+            result["ok"] = False
+            result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    @staticmethod
+    def _summary(results: List[Dict]) -> Dict:
+        failed = sum(1 for r in results if not r["ok"])
+        return {"ok": failed == 0, "succeeded": len(results) - failed, "failed": failed, "results": results}
+
+    def _run(self, operations: List[FileOperation]) -> dict:
+        operations = [FileOperation.model_validate(o) for o in operations]
+        results: List[Optional[Dict]] = [None] * len(operations)
+        for wave in self._waves(operations):
+            for i, result in zip(wave, self._pool.map(lambda i: self._apply(operations[i]), wave)):
+                results[i] = result
+        return self._summary(results)
+
+    async def _arun(self, operations: List[FileOperation]) -> dict:
+        operations = [FileOperation.model_validate(o) for o in operations]
+        loop = asyncio.get_running_loop()
+        results: List[Optional[Dict]] = [None] * len(operations)
+        for wave in self._waves(operations):
+            done = await asyncio.gather(*(loop.run_in_executor(self._pool, self._apply, operations[i]) for i in wave))
+            for i, result in zip(wave, done):
+                results[i] = result
+        return self._summary(results)
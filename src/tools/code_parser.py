@@ -3,13 +3,14 @@
 import os
 import subprocess
 from pathlib import Path
-from typing import Optional, List, Dict, Type
+from typing import Optional, Dict, Type
 
-import javalang
 from pydantic import BaseModel, Field, PrivateAttr
 from mdutils.mdutils import MdUtils
 
 from crewai.tools.base_tool import BaseTool
+
+from tools.java_chunk_index import chunk_index
 class CodeParserInput(BaseModel):
     code_path: Optional[str] = Field(
         None, description="Root directory of Java source files."
@@ -20,16 +21,16 @@ class CodeParserTool(BaseTool):
     description: str = "Parse Java source into AST and extract class/method signatures."
     args_schema: Type[CodeParserInput] = CodeParserInput
 
+    # default root, so crews of different codebases can share a process (CODE_PATH is per process)
+    _code_path: Optional[str] = PrivateAttr(default=None)
+
+    def __init__(self, code_path: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._code_path = code_path
+
     def _run(self, code_path: Optional[str] = None) -> Dict:
-        root = Path(code_path or os.getenv("CODE_PATH") or ".").resolve()
-        signatures: List[str] = []
-        for java_file in root.rglob("*.java"):
-            source = java_file.read_text(encoding="utf-8", errors="ignore")
-            tree = javalang.parse.parse(source)
-            pkg = tree.package.name if tree.package else ""
-            for type_decl in tree.types:
-                cls = type_decl.name
-                for method in getattr(type_decl, "methods", []):
-                    params = ", ".join(param.type.name for param in method.parameters)
-                    signatures.append(f"{pkg}.{cls}.{method.name}({params})")
-        return {"signatures": signatures}
\ No newline at end of file
+        root = Path(code_path or self._code_path or os.getenv("CODE_PATH") or ".").resolve()
+        # the method chunks of the shared chunk index: only files changed since the last call are parsed again
+        index = chunk_index(str(root))
+        index.refresh()
+        return {"signatures": index.signatures()}
\ No newline at end of file
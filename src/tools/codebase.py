@@ -0,0 +1,21 @@
+# tools/codebase.py
+
+"""
+Where the Java tools find the codebase they work on.
+
+A tool is given its codebase by the crew that builds it, or per call; the
+fallback is the CODE_PATH environment variable that gen_docs.py sets. There
+is no built-in default, so a tool without either fails with a clear error
+instead of working on some other folder.
+"""
+import os
+from pathlib import Path
+from typing import Optional
+
+
+def codebase_path(path: Optional[str] = None) -> Path:
+    """Resolve `path`, or CODE_PATH when it is not given."""
+    path = path or os.getenv("CODE_PATH")
+    if not path:
+        raise ValueError("📁 No codebase path: pass one to the tool or set CODE_PATH.")
+    return Path(path).resolve()
@@ -1,12 +1,13 @@
 import os
 import re
-import subprocess
 import json
 from typing import Type
 
 from pydantic import BaseModel, Field, PrivateAttr
 from crewai.tools.base_tool import BaseTool
 
+from tools.subprocess_runner import run_command
+
 
 class DBParserInput(BaseModel):
     """
@@ -84,15 +85,9 @@ class DBParserTool(BaseTool):
 
         # Use the helper JAR for robust parsing
         cmd = [self._java_cmd, '-jar', self._helper_jar, sql_query]
-        try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"SQL parse failed (exit {e.returncode}): {e.stderr.strip()}")
+        result = run_command(cmd, timeout=120)
+        if not result.ok:
+            raise RuntimeError(f"SQL parse failed ({result.failure()})")
 
         # Expect JSON output from the helper JAR
         try:
@@ -1,13 +1,14 @@
 # crewai_tools/dependency_mapper.py
 
 import os
-import subprocess
 from pathlib import Path
 from typing import Optional, Type, Dict
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from crewai.tools.base_tool import BaseTool
 
+from tools.subprocess_runner import run_command
+
 def resolve_build_file(base_path: Optional[str] = None) -> Path:
     """
     Resolve the path to 'pom.xml' or 'build.gradle':
@@ -47,13 +48,16 @@ class DependencyMapperTool(BaseTool):
     description: str = "Map all Maven/Gradle dependencies into a structured JSON graph."
     args_schema: Type[DependencyMapperInput] = DependencyMapperInput
 
-    def _run(self, code_path: Optional[str] = None) -> Dict:
+    # default root, so crews of different codebases can share a process (CODE_PATH is per process)
+    _code_path: Optional[str] = PrivateAttr(default=None)
 
-        root = resolve_build_file("/Users/gp/Developer/java-samples/reforge-ai/src/temp_codebase/")
+    def __init__(self, code_path: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._code_path = code_path
 
+    def _run(self, code_path: Optional[str] = None) -> Dict:
         # Resolve the build file path
-        # build_file = resolve_build_file(code_path)
-        build_file = resolve_build_file("/Users/gp/Developer/java-samples/reforge-ai/src/temp_codebase/")
+        build_file = resolve_build_file(code_path or self._code_path)
 
         # Determine the build tool based on the file name
         if build_file.name == "pom.xml":
@@ -70,11 +74,11 @@ class DependencyMapperTool(BaseTool):
             raise RuntimeError(f"Unsupported build file: {build_file.name}")
 
         # Execute the command
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"Dependency command failed: {result.stderr.strip()}")
+        result = run_command(cmd, head_chars=20000, tail_chars=20000)
+        if not result.ok:
+            raise RuntimeError(f"Dependency command failed ({result.failure()})")
 
         tree_output = result.stdout
         # TODO: parse DOT or plain-text into structured JSON if desired
-        return {"dependency_tree": tree_output}
+        return {"dependency_tree": tree_output, "full_output": result.stdout_path}
 
@@ -0,0 +1,379 @@
+# tools/fs_watcher.py
+
+"""
+Filesystem watcher that keeps the indexes and caches of the tools current
+while agents edit the codebase.
+
+Without it every tool call found out what changed by walking the tree
+(stamps() of every .java file in java_check, test_runner, the source and
+table-access indexes). With a watcher running on the codebase:
+
+    with watching(codebase_path):
+        crew.kickoff(inputs)
+
+the changes are reported by the kernel (inotify on Linux, called through
+ctypes) and coalesced: a burst of writes to one file is one change. Each
+consumer holds a WatchedPaths, which collects the paths changed since it
+last asked:
+
+    self._watch = WatchedPaths(root, suffixes=(".java",))
+    dirty = self._watch.pending()   # None: rescan everything; else the changed paths
+
+or a WatchedStamps, the (mtime, size) of every file of the tree, which
+it keeps current from the same reports (a drop-in for stamps(root)).
+
+pending() first drains the events the kernel has queued, so an edit made
+right before a tool call is never missed. It returns None (the consumer
+falls back to its full rescan) when no watcher runs on the root, on the
+first call after one started, when the kernel queue overflowed and when a
+directory was deleted or moved away. Directories created or moved in are
+watched and their files reported as changed.
+
+Where inotify is not available (macOS, watch limit reached) the watcher
+polls the tree in the background instead; consumers are the same.
+"""
+import contextlib
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# build output and VCS churn is not watched (the folders java_source_index.py skips)
+SKIP_DIRS = {".git", "target", "build", "node_modules", ".idea", ".gradle"}
+# coalescing window: events closer together than this are delivered as one batch
+DEBOUNCE_S = 0.2
+POLL_INTERVAL_S = 1.0
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")
+
+# None is "everything may have changed"
+Listener = Callable[[Optional[Set[str]]], None]
+
+
+def _directories(root: str) -> Iterator[str]:
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        yield dirpath
+
+
+def _files(root: str) -> Iterator[str]:
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            yield os.path.join(dirpath, name)
+
+
+def _skipped(path: str, root: str) -> bool:
+    return any(part in SKIP_DIRS for part in Path(os.path.relpath(path, root)).parts)
+
+
+# ────────── Backends ──────────
+class _Inotify:
+    """Recursive inotify watch of a tree; read() returns (changed paths, full rescan needed)."""
+
+    def __init__(self, root: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self.root = root
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        try:
+            for directory in _directories(root):
+                self._watch(directory)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _watch(self, directory: str):
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            if errno in (2, 20):  # ENOENT, ENOTDIR: already gone
+                return
+            raise OSError(errno, f"inotify_add_watch failed for {directory} (fs.inotify.max_user_watches?)")
+        self._dirs[wd] = directory
+
+    def read(self) -> Tuple[Set[str], bool]:
+        changed: Set[str] = set()
+        full = False
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return changed, full
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0"))
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    full = True
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    # which files went with it is unknown here
+                    full = True
+                    continue
+                path = os.path.join(directory, name)
+                if _skipped(path, self.root):
+                    continue
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        for sub in _directories(path):
+                            self._watch(sub)
+                        changed.update(_files(path))
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        full = True
+                    continue
+                changed.add(path)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _Polling:
+    """Fallback: compare the (mtime, size) of every file of the tree with the previous scan."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.fd = None
+        self._stamps = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[float, int]]:
+        found = {}
+        for path in _files(self.root):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            found[path] = (st.st_mtime, st.st_size)
+        return found
+
+    def read(self) -> Tuple[Set[str], bool]:
+        current = self._scan()
+        changed = {p for p, stamp in current.items() if self._stamps.get(p) != stamp}
+        changed |= set(self._stamps) - set(current)
+        self._stamps = current
+        return changed, False
+
+    def close(self):
+        pass
+
+
+# ────────── Watcher ──────────
+class FileWatcher:
+    def __init__(self, root: str, debounce_s: float = DEBOUNCE_S, poll_interval_s: float = POLL_INTERVAL_S):
+        self.root = str(Path(root).resolve())
+        self.debounce_s = debounce_s
+        self.poll_interval_s = poll_interval_s
+        self._listeners: List[Listener] = []
+        self._pending: Set[str] = set()
+        self._full = False
+        self._last_event = 0.0
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"backend": None, "events": 0, "batches": 0, "full_rescans": 0}
+        try:
+            if not sys.platform.startswith("linux"):
+                raise OSError("inotify is Linux only")
+            self._backend = _Inotify(self.root)
+            self.stats["backend"] = "inotify"
+        except (OSError, AttributeError) as e:
+            self._backend = _Polling(self.root)
+            self.stats["backend"] = f"polling ({e})"
+
+    def subscribe(self, listener: Listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _collect(self):
+        changed, full = self._backend.read()
+        if changed or full:
+            self._pending |= changed
+            self._full = self._full or full
+            self._last_event = time.monotonic()
+            self.stats["events"] += len(changed) + int(full)
+
+    def _dispatch(self):
+        if not self._pending and not self._full:
+            return
+        batch = None if self._full else set(self._pending)
+        self._pending, self._full = set(), False
+        self.stats["batches"] += 1
+        self.stats["full_rescans"] += int(batch is None)
+        for listener in list(self._listeners):
+            listener(batch)
+
+    def sync(self):
+        """Deliver every change made so far now, without waiting for the coalescing window."""
+        with self._lock:
+            self._collect()
+            self._dispatch()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if self._backend.fd is not None:
+                select.select([self._backend.fd], [], [], self.debounce_s)
+            else:
+                self._stop.wait(self.poll_interval_s)
+            with self._lock:
+                self._collect()
+                if time.monotonic() - self._last_event >= self.debounce_s:
+                    self._dispatch()
+
+    def start(self) -> "FileWatcher":
+        self._thread = threading.Thread(target=self._loop, name=f"fs-watch:{self.root}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            self._backend.close()
+            self._listeners.clear()
+
+
+_watchers: Dict[str, FileWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def watcher_for(path: str) -> Optional[FileWatcher]:
+    """The running watcher covering `path` (its root or an ancestor of it), if any."""
+    path = str(Path(path).resolve())
+    with _watchers_lock:
+        for root, watcher in _watchers.items():
+            if path == root or path.startswith(root + os.sep):
+                return watcher
+    return None
+
+
+@contextlib.contextmanager
+def watching(root: str) -> Iterator[FileWatcher]:
+    """Watch `root` for the duration of the block (reusing a watcher already running on it)."""
+    existing = watcher_for(root)
+    if existing is not None:
+        yield existing
+        return
+    watcher = FileWatcher(root).start()
+    with _watchers_lock:
+        _watchers[watcher.root] = watcher
+    try:
+        yield watcher
+    finally:
+        with _watchers_lock:
+            _watchers.pop(watcher.root, None)
+        watcher.stop()
+
+
+# ────────── Consumers ──────────
+class WatchedPaths:
+    """The paths under `root` (with one of `suffixes`) changed since the last pending() call."""
+
+    def __init__(self, root: str, suffixes: Tuple[str, ...] = (".java",)):
+        self.root = str(Path(root).resolve())
+        self.suffixes = suffixes
+        self._watcher: Optional[FileWatcher] = None
+        self._dirty: Set[str] = set()
+        self._full = True
+        self._lock = threading.Lock()
+
+    def _on_change(self, paths: Optional[Set[str]]):
+        with self._lock:
+            if paths is None:
+                self._full = True
+            else:
+                self._dirty |= {p for p in paths if p.endswith(self.suffixes)
+                                and (p == self.root or p.startswith(self.root + os.sep))}
+
+    def pending(self) -> Optional[Set[str]]:
+        """Changed paths since the last call; None when the consumer has to rescan everything."""
+        watcher = watcher_for(self.root)
+        if watcher is not self._watcher:
+            # started, stopped or replaced since the last call
+            if self._watcher is not None:
+                self._watcher.unsubscribe(self._on_change)
+            self._watcher = watcher
+            if watcher is not None:
+                watcher.subscribe(self._on_change)
+            with self._lock:
+                self._full, self._dirty = True, set()
+        if watcher is None:
+            return None
+        watcher.sync()
+        with self._lock:
+            full, dirty = self._full, self._dirty
+            self._full, self._dirty = False, set()
+        return None if full else dirty
+
+
+def _stamp(path: str) -> Optional[Tuple[float, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+class WatchedStamps:
+    """(mtime, size) of every file under `root` with one of `suffixes`; rescanned only when the watcher can't tell."""
+
+    def __init__(self, root: str, suffixes: Tuple[str, ...] = (".java",)):
+        self.root = str(Path(root).resolve())
+        self.suffixes = suffixes
+        self._watch = WatchedPaths(self.root, suffixes)
+        self._stamps: Optional[Dict[str, Tuple[float, int]]] = None
+
+    def current(self) -> Dict[str, Tuple[float, int]]:
+        dirty = self._watch.pending()
+        if dirty is None or self._stamps is None:
+            self._stamps = {}
+            for path in _files(self.root):
+                if path.endswith(self.suffixes):
+                    stamp = _stamp(path)
+                    if stamp is not None:
+                        self._stamps[path] = stamp
+        else:
+            for path in dirty:
+                stamp = _stamp(path) if os.path.isfile(path) else None
+                if stamp is None:
+                    self._stamps.pop(path, None)
+                else:
+                    self._stamps[path] = stamp
+        return dict(self._stamps)
@@ -0,0 +1,382 @@
+# tools/inventory_docs.py
+
+"""
+Deterministic generation of the metadata and inventory documents of the
+documentation crew (1-Metadata.md and 4-ComponentsInventory.md).
+
+Everything in them is static data: the files, packages, types and lines of
+code come from parsing the Java sources, the dependencies from the
+pom.xml / build.gradle files, and the frameworks from imports and
+descriptors (persistence.xml, web.xml, ...). Nothing is asked of an LLM,
+so both documents take seconds instead of two long agent loops:
+
+    inventory = collect_inventory(code_path)
+    write_metadata_doc(inventory, "docs/1-Metadata.md")
+    write_inventory_doc(inventory, "docs/4-ComponentsInventory.md")
+
+An LLM is only used for the optional prose summary (summarize()), which is
+written at the top of the inventory. inventory_report() is the short text
+the documentation crew passes to the tasks that used to read these
+documents from the conversation.
+"""
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import javalang
+from mdutils.mdutils import MdUtils
+
+from tools.java_source_index import SKIP_DIRS, source_index
+
+# import prefix -> framework; the first match wins, so specific prefixes come first
+FRAMEWORKS = [
+    ("javax.ejb", "EJB"), ("jakarta.ejb", "EJB"),
+    ("javax.persistence", "JPA"), ("jakarta.persistence", "JPA"),
+    ("javax.ws.rs", "JAX-RS"), ("jakarta.ws.rs", "JAX-RS"),
+    ("javax.faces", "JSF"), ("jakarta.faces", "JSF"),
+    ("javax.servlet", "Servlet API"), ("jakarta.servlet", "Servlet API"),
+    ("javax.enterprise", "CDI"), ("jakarta.enterprise", "CDI"),
+    ("javax.inject", "CDI"), ("jakarta.inject", "CDI"),
+    ("javax.validation", "Bean Validation"), ("jakarta.validation", "Bean Validation"),
+    ("javax.xml.bind", "JAXB"), ("jakarta.xml.bind", "JAXB"),
+    ("javax.jms", "JMS"), ("jakarta.jms", "JMS"),
+    ("javax.transaction", "JTA"), ("jakarta.transaction", "JTA"),
+    ("javax.annotation", "Common Annotations"), ("jakarta.annotation", "Common Annotations"),
+    ("org.springframework.boot", "Spring Boot"), ("org.springframework", "Spring"),
+    ("org.hibernate", "Hibernate"),
+    ("org.apache.log4j", "Log4j"), ("org.apache.logging.log4j", "Log4j 2"),
+    ("org.slf4j", "SLF4J"), ("java.util.logging", "java.util.logging"),
+    ("org.jboss.arquillian", "Arquillian"), ("org.jboss.shrinkwrap", "ShrinkWrap"),
+    ("org.junit.jupiter", "JUnit 5"), ("org.junit", "JUnit 4"), ("junit.framework", "JUnit 3"),
+    ("org.mockito", "Mockito"), ("org.testng", "TestNG"),
+    ("com.fasterxml.jackson", "Jackson"),
+]
+
+# descriptor file name -> what its presence means
+DESCRIPTORS = {
+    "persistence.xml": "JPA persistence unit",
+    "web.xml": "Servlet deployment descriptor",
+    "beans.xml": "CDI bean archive",
+    "faces-config.xml": "JSF configuration",
+    "ejb-jar.xml": "EJB deployment descriptor",
+    "application.xml": "EAR deployment descriptor",
+    "jboss-web.xml": "JBoss web descriptor",
+    "jboss-deployment-structure.xml": "JBoss deployment structure",
+    "arquillian.xml": "Arquillian test configuration",
+    "application.properties": "Spring Boot configuration",
+    "application.yml": "Spring Boot configuration",
+}
+DATASOURCE = re.compile(r"-ds\.xml$")
+
+GRADLE_DEPENDENCY = re.compile(
+    r"^\s*(\w+)\s*\(?\s*['\"]([\w.\-]+):([\w.\-]+)(?::([\w.\-${}]+))?['\"]", re.MULTILINE)
+PROPERTY = re.compile(r"\$\{([^}]+)\}")
+
+
+def _walk(root: str):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        yield dirpath, sorted(filenames)
+
+
+def _lines_of_code(source: str) -> int:
+    return sum(1 for line in source.splitlines() if line.strip() and not line.strip().startswith(("//", "*", "/*")))
+
+
+# ────────── Java sources ──────────
+def _types(path: str, source: str, tokenized: List[str]) -> List[Dict[str, Any]]:
+    """Types declared in one file, with their kind, annotations and method count.
+
+    Files javalang cannot parse keep the type names found by the tokenizer
+    of the source index, with an unknown kind.
+    """
+    try:
+        tree = javalang.parse.parse(source)
+    except (javalang.parser.JavaSyntaxError, javalang.tokenizer.LexerError, TypeError, IndexError):
+        return [{"name": name, "kind": "?", "annotations": [], "methods": 0} for name in tokenized]
+    found = []
+    for decl in tree.types:
+        found.append({
+            "name": decl.name,
+            "kind": type(decl).__name__.replace("Declaration", "").lower(),
+            "annotations": [a.name for a in getattr(decl, "annotations", []) or []],
+            "methods": len(getattr(decl, "methods", []) or []),
+        })
+    return found
+
+
+def _framework(name: str) -> Optional[str]:
+    for prefix, framework in FRAMEWORKS:
+        if name == prefix or name.startswith(prefix + "."):
+            return framework
+    return None
+
+
+# ────────── Build files ──────────
+def _text(element: Optional[ET.Element]) -> str:
+    return (element.text or "").strip() if element is not None else ""
+
+
+def _pom(path: str) -> Dict[str, Any]:
+    tree = ET.parse(path)
+    root = tree.getroot()
+    ns = {"m": root.tag[1:].split("}")[0]} if root.tag.startswith("{") else {}
+    q = (lambda tag: "/".join(f"m:{t}" for t in tag.split("/"))) if ns else (lambda tag: tag)
+    find = lambda element, tag: element.find(q(tag), ns) if element is not None else None
+
+    properties = {}
+    props = find(root, "properties")
+    for prop in (list(props) if props is not None else []):
+        properties[prop.tag.split("}")[-1]] = _text(prop)
+    parent = find(root, "parent")
+    # groupId and version are inherited from the parent when omitted
+    group = _text(find(root, "groupId")) or _text(find(parent, "groupId"))
+    version = _text(find(root, "version")) or _text(find(parent, "version"))
+    properties.update({"project.groupId": group, "project.version": version, "project.artifactId": _text(find(root, "artifactId"))})
+
+    def resolve(value: str) -> str:
+        return PROPERTY.sub(lambda m: properties.get(m.group(1), m.group(0)), value)
+
+    def dependencies(xpath: str, kind: str) -> List[Dict[str, str]]:
+        found = []
+        for dep in root.findall(q(xpath), ns):
+            found.append({
+                "group": resolve(_text(find(dep, "groupId"))),
+                "artifact": resolve(_text(find(dep, "artifactId"))),
+                "version": resolve(_text(find(dep, "version"))),
+                "scope": _text(find(dep, "scope")) or ("import" if _text(find(dep, "type")) == "pom" else "compile"),
+                "kind": kind,
+            })
+        return found
+
+    java = (properties.get("maven.compiler.release") or properties.get("maven.compiler.source")
+            or properties.get("java.version") or "")
+    return {
+        "file": path,
+        "tool": "maven",
+        "coordinates": f"{group}:{_text(find(root, 'artifactId'))}:{version}",
+        "packaging": _text(find(root, "packaging")) or "jar",
+        "parent": (f"{_text(find(parent, 'groupId'))}:{_text(find(parent, 'artifactId'))}:{_text(find(parent, 'version'))}"
+                   if parent is not None else ""),
+        "java": resolve(java),
+        "modules": [_text(m) for m in root.findall(q("modules/module"), ns)],
+        "dependencies": (dependencies("dependencies/dependency", "dependency")
+                         + dependencies("dependencyManagement/dependencies/dependency", "managed")),
+        "plugins": [f"{resolve(_text(find(p, 'groupId'))) or 'org.apache.maven.plugins'}:{_text(find(p, 'artifactId'))}"
+                    for p in root.findall(q("build/plugins/plugin"), ns)],
+    }
+
+
+def _gradle(path: str) -> Dict[str, Any]:
+    source = Path(path).read_text(encoding="utf-8", errors="ignore")
+    java = re.search(r"(?:sourceCompatibility|languageVersion\.set\(JavaLanguageVersion\.of\()\s*=?\s*['\"]?([\w.]+)", source)
+    return {
+        "file": path,
+        "tool": "gradle",
+        "coordinates": "",
+        "packaging": "",
+        "parent": "",
+        "java": java.group(1) if java else "",
+        "modules": re.findall(r"include\s*\(?['\"]:?([\w\-]+)['\"]", source),
+        "dependencies": [{"group": g, "artifact": a, "version": v or "", "scope": conf, "kind": "dependency"}
+                         for conf, g, a, v in GRADLE_DEPENDENCY.findall(source)],
+        "plugins": re.findall(r"id\s*\(?['\"]([\w.\-]+)['\"]", source),
+    }
+
+
+# ────────── Inventory ──────────
+def collect_inventory(code_path: str) -> Dict[str, Any]:
+    """Files, packages, types, build files, dependencies and frameworks of a codebase."""
+    root = str(Path(code_path).resolve())
+    index = source_index(root)
+    index.refresh()
+
+    files, packages = [], {}
+    frameworks: Dict[str, Counter] = {}
+    parse_errors = []
+    for path in sorted(index.files):
+        info = index.files[path]
+        source = Path(path).read_text(encoding="utf-8", errors="ignore")
+        types = _types(path, source, info.types)
+        loc = _lines_of_code(source)
+        rel = os.path.relpath(path, root)
+        if info.error or any(t["kind"] == "?" for t in types):
+            parse_errors.append(rel)
+        files.append({"path": rel, "package": info.package, "types": types, "loc": loc,
+                      "test": f"{os.sep}test{os.sep}" in f"{os.sep}{rel}"})
+        package = packages.setdefault(info.package or "(default)", {"files": 0, "loc": 0, "types": 0})
+        package["files"] += 1
+        package["loc"] += loc
+        package["types"] += len(types)
+        for name in info.imports + info.wildcard_imports:
+            framework = _framework(name)
+            if framework:
+                frameworks.setdefault(framework, Counter())[rel] += 1
+
+    builds, descriptors, others = [], [], Counter()
+    for dirpath, filenames in _walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root)
+            if name == "pom.xml":
+                try:
+                    builds.append({**_pom(path), "file": rel})
+                except ET.ParseError as e:
+                    parse_errors.append(f"{rel} ({e})")
+            elif name in ("build.gradle", "build.gradle.kts", "settings.gradle"):
+                builds.append({**_gradle(path), "file": rel})
+            if name in DESCRIPTORS:
+                descriptors.append({"path": rel, "meaning": DESCRIPTORS[name]})
+            elif DATASOURCE.search(name):
+                descriptors.append({"path": rel, "meaning": "JBoss datasource definition"})
+            if not name.endswith(".java"):
+                others[os.path.splitext(name)[1].lower() or name] += 1
+
+    kinds = Counter(t["kind"] for f in files for t in f["types"])
+    return {
+        "codebase": os.path.basename(root),
+        "root": root,
+        "files": files,
+        "packages": packages,
+        "kinds": dict(kinds),
+        "loc": sum(f["loc"] for f in files),
+        "frameworks": {name: dict(users) for name, users in sorted(frameworks.items())},
+        "builds": builds,
+        "descriptors": descriptors,
+        "other_files": dict(others.most_common()),
+        "parse_errors": parse_errors,
+    }
+
+
+def inventory_report(inventory: Dict[str, Any], max_packages: int = 30) -> str:
+    """Plain-text digest of collect_inventory(), for the task descriptions of the documentation crew."""
+    kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(inventory["kinds"].items()))
+    lines = [f"{len(inventory['files'])} Java files, {inventory['loc']} lines of code ({kinds})."]
+    lines.append("Packages (files, types, LOC):")
+    ordered = sorted(inventory["packages"].items(), key=lambda item: -item[1]["loc"])
+    for name, package in ordered[:max_packages]:
+        lines.append(f"  {name}: {package['files']}, {package['types']}, {package['loc']}")
+    if len(ordered) > max_packages:
+        lines.append(f"  ... and {len(ordered) - max_packages} more packages")
+    for build in inventory["builds"]:
+        lines.append(f"Build {build['file']} ({build['tool']}) {build['coordinates']}"
+                     + (f", Java {build['java']}" if build["java"] else ""))
+        for dep in build["dependencies"]:
+            lines.append(f"  {dep['group']}:{dep['artifact']}:{dep['version'] or '(managed)'} [{dep['scope']}]")
+    if inventory["frameworks"]:
+        lines.append("Frameworks (files using them): "
+                     + ", ".join(f"{name} ({len(users)})" for name, users in inventory["frameworks"].items()))
+    if inventory["descriptors"]:
+        lines.append("Descriptors: " + ", ".join(d["path"] for d in inventory["descriptors"]))
+    return "\n".join(lines)
+
+
+def summarize(inventory: Dict[str, Any], llm: Any) -> str:
+    """Optional prose summary of the inventory, the only part written by an LLM."""
+    prompt = ("You are documenting a legacy Java codebase before its migration to Java 21 and Spring Boot. "
+              "In at most two short paragraphs, describe what kind of application this is, its architecture "
+              "and the technologies that matter most for the migration. Use only the facts below.\n\n"
+              + inventory_report(inventory))
+    return str(llm.call([{"role": "user", "content": prompt}])).strip()
+
+
+# ────────── Documents ──────────
+def _table(md: MdUtils, header: List[str], rows: List[List[Any]]):
+    if not rows:
+        md.new_paragraph("None found.")
+        return
+    cells = list(header)
+    for row in rows:
+        cells.extend(str(value).replace("|", "\\|") for value in row)
+    md.new_table(columns=len(header), rows=len(rows) + 1, text=cells, text_align="left")
+
+
+def write_metadata_doc(inventory: Dict[str, Any], out_file: str) -> str:
+    """1-Metadata.md: file index (tree by package) and totals."""
+    md = MdUtils(file_name=out_file, title=f"File Metadata: {inventory['codebase']}")
+    md.new_header(level=2, title="Summary", add_table_of_contents="n")
+    kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(inventory["kinds"].items())) or "no types"
+    md.new_list([
+        f"Java files: {len(inventory['files'])} ({sum(1 for f in inventory['files'] if f['test'])} test files)",
+        f"Lines of code: {inventory['loc']}",
+        f"Packages: {len(inventory['packages'])}",
+        f"Declared types: {kinds}",
+        f"Parsing errors: {len(inventory['parse_errors'])}",
+    ])
+
+    md.new_header(level=2, title="Packages", add_table_of_contents="n")
+    _table(md, ["Package", "Files", "Types", "LOC"],
+           [[name, p["files"], p["types"], p["loc"]] for name, p in sorted(inventory["packages"].items())])
+
+    md.new_header(level=2, title="File Index", add_table_of_contents="n")
+    by_package: Dict[str, List[Dict[str, Any]]] = {}
+    for f in inventory["files"]:
+        by_package.setdefault(f["package"] or "(default)", []).append(f)
+    for package, files in sorted(by_package.items()):
+        md.new_header(level=3, title=package, add_table_of_contents="n")
+        items: List[Any] = []
+        for f in files:
+            items.append(f"`{f['path']}` ({f['loc']} LOC)")
+            items.append([f"{t['kind']} `{t['name']}`"
+                          + (f" {' '.join('@' + a for a in t['annotations'])}" if t["annotations"] else "")
+                          + f", {t['methods']} methods" for t in f["types"]] or ["no type declared"])
+        md.new_list(items)
+
+    if inventory["parse_errors"]:
+        md.new_header(level=2, title="Parsing Errors", add_table_of_contents="n")
+        md.new_list([f"`{path}`" for path in inventory["parse_errors"]])
+    md.create_md_file()
+    return out_file
+
+
+def write_inventory_doc(inventory: Dict[str, Any], out_file: str, summary: Optional[str] = None) -> str:
+    """4-ComponentsInventory.md: build files, dependencies, frameworks, descriptors and runtime."""
+    md = MdUtils(file_name=out_file, title=f"Component & Technology Inventory: {inventory['codebase']}")
+    if summary:
+        md.new_header(level=2, title="Overview", add_table_of_contents="n")
+        md.new_paragraph(summary + "\n")
+
+    md.new_header(level=2, title="Build and Runtime", add_table_of_contents="n")
+    _table(md, ["Build file", "Tool", "Coordinates", "Packaging", "Parent", "Java"],
+           [[b["file"], b["tool"], b["coordinates"], b["packaging"], b["parent"], b["java"] or "-"]
+            for b in inventory["builds"]])
+
+    md.new_header(level=2, title="Libraries", add_table_of_contents="n")
+    rows = []
+    for build in inventory["builds"]:
+        for dep in build["dependencies"]:
+            rows.append([dep["group"], dep["artifact"], dep["version"] or "(managed)", dep["scope"],
+                         dep["kind"], build["file"]])
+    _table(md, ["Group", "Artifact", "Version", "Scope", "Declared as", "Build file"], rows)
+
+    plugins = sorted({p for build in inventory["builds"] for p in build["plugins"]})
+    if plugins:
+        md.new_header(level=2, title="Build Plugins", add_table_of_contents="n")
+        md.new_list([f"`{p}`" for p in plugins])
+
+    md.new_header(level=2, title="Frameworks and APIs (from imports)", add_table_of_contents="n")
+    _table(md, ["Framework", "Files", "Used in"],
+           [[name, len(users), ", ".join(f"`{os.path.basename(p)}`" for p in sorted(users)[:8])
+             + (" ..." if len(users) > 8 else "")]
+            for name, users in inventory["frameworks"].items()])
+
+    md.new_header(level=2, title="Descriptors and Configuration", add_table_of_contents="n")
+    _table(md, ["File", "Meaning"], [[f"`{d['path']}`", d["meaning"]] for d in inventory["descriptors"]])
+
+    md.new_header(level=2, title="Other Files", add_table_of_contents="n")
+    _table(md, ["Extension", "Files"], [[ext, count] for ext, count in inventory["other_files"].items()])
+    md.create_md_file()
+    return out_file
+
+
+def generate_inventory_docs(code_path: str, doc_path: str, llm: Any = None) -> Dict[str, Any]:
+    """Write 1-Metadata.md and 4-ComponentsInventory.md under doc_path; return the inventory."""
+    os.makedirs(doc_path, exist_ok=True)
+    inventory = collect_inventory(code_path)
+    summary = summarize(inventory, llm) if llm is not None else None
+    write_metadata_doc(inventory, os.path.join(doc_path, "1-Metadata.md"))
+    write_inventory_doc(inventory, os.path.join(doc_path, "4-ComponentsInventory.md"), summary)
+    return inventory
@@ -0,0 +1,252 @@
+# tools/java_check_tool.py
+
+"""
+Fast compile check for the agent edit loop.
+
+Instead of a full Maven build, the tool compiles only the Java files that
+changed since the previous check plus the files that depend on them (see
+java_source_index.py), against the project's existing classpath: the
+modules' target/classes folders and the dependency jars Maven resolves
+once per pom.xml change. Compilation happens in a long-lived JVM running
+javax.tools (CompileServer below), so after the first call javac is warm
+and a check of a handful of files takes well under a second.
+
+Nothing is written to target/: class files go to a scratch folder. The
+maven-build tool is still the final word at the end of a step.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel, Field, PrivateAttr
+from crewai.tools.base_tool import BaseTool
+
+from tools.codebase import codebase_path
+from tools.fs_watcher import WatchedStamps
+from tools.java_source_index import JavaSourceIndex, source_index
+from tools.subprocess_runner import run_command
+
+MAX_DIAGNOSTICS = 50
+
+# Protocol: the client writes two lines per request, the tab-separated javac
+# options and the tab-separated source files; the server answers with one
+# "D\tkind\tfile\tline\tcolumn\tmessage" line per diagnostic and "END\tOK|FAILED".
+COMPILE_SERVER_SOURCE = r"""
+import javax.tools.*;
+import java.io.*;
+import java.nio.charset.StandardCharsets;
+import java.util.*;
+
+public class CompileServer {
+    public static void main(String[] args) throws IOException {
+        JavaCompiler compiler = ToolProvider.getSystemJavaCompiler();
+        if (compiler == null) {
+            System.out.println("NOJAVAC");
+            return;
+        }
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        PrintStream out = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        StandardJavaFileManager files = compiler.getStandardFileManager(null, Locale.ROOT, StandardCharsets.UTF_8);
+        out.println("READY");
+        String options;
+        while ((options = in.readLine()) != null) {
+            String sources = in.readLine();
+            if (sources == null) break;
+            DiagnosticCollector<JavaFileObject> diagnostics = new DiagnosticCollector<>();
+            boolean ok;
+            try {
+                Iterable<? extends JavaFileObject> units = files.getJavaFileObjectsFromStrings(split(sources));
+                ok = compiler.getTask(null, files, diagnostics, split(options), null, units).call();
+                files.flush();
+            } catch (RuntimeException e) {
+                ok = false;
+                out.println("D\tERROR\t\t0\t0\t" + escape(String.valueOf(e)));
+            }
+            for (Diagnostic<? extends JavaFileObject> d : diagnostics.getDiagnostics()) {
+                String source = d.getSource() == null ? "" : d.getSource().getName();
+                out.println("D\t" + d.getKind() + "\t" + escape(source) + "\t" + d.getLineNumber()
+                        + "\t" + d.getColumnNumber() + "\t" + escape(d.getMessage(Locale.ROOT)));
+            }
+            out.println("END\t" + (ok ? "OK" : "FAILED"));
+        }
+    }
+
+    static List<String> split(String line) {
+        return line.isEmpty() ? new ArrayList<>() : new ArrayList<>(Arrays.asList(line.split("\t")));
+    }
+
+    static String escape(String s) {
+        return s.replace("\\", "\\\\").replace("\t", "\\t").replace("\r", "").replace("\n", "\\n");
+    }
+}
+"""
+
+
+def _unescape(value: str) -> str:
+    return value.replace("\\n", "\n").replace("\\t", "\t").replace("\\\\", "\\")
+
+
+class CompileServer:
+    """A JVM running javac in-process, started on first use and kept for the life of the tool."""
+
+    def __init__(self, java_cmd: str = "java"):
+        self.java_cmd = java_cmd
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        if shutil.which(self.java_cmd) is None:
+            raise RuntimeError(f"'{self.java_cmd}' not found; a JDK 11+ is needed for the compile check.")
+        source = Path(tempfile.gettempdir()) / "reforge-compile-server" / "CompileServer.java"
+        source.parent.mkdir(parents=True, exist_ok=True)
+        if not source.exists() or source.read_text() != COMPILE_SERVER_SOURCE:
+            source.write_text(COMPILE_SERVER_SOURCE)
+        # single-file source launch (JDK 11+): no separate javac step for the server itself
+        self._proc = subprocess.Popen(
+            [self.java_cmd, str(source)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding="utf-8", bufsize=1,
+        )
+        greeting = self._proc.stdout.readline().strip()
+        if greeting != "READY":
+            self.close()
+            raise RuntimeError("The compile server did not start (is this a JDK rather than a JRE?).")
+
+    def compile(self, options: List[str], sources: List[str]) -> Tuple[bool, List[Dict]]:
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                self._start()
+            self._proc.stdin.write("\t".join(options) + "\n" + "\t".join(sources) + "\n")
+            self._proc.stdin.flush()
+            diagnostics = []
+            for line in self._proc.stdout:
+                fields = line.rstrip("\n").split("\t")
+                if fields[0] == "END":
+                    return fields[1] == "OK", diagnostics
+                if fields[0] == "D" and len(fields) >= 6:
+                    diagnostics.append({
+                        "kind": fields[1],
+                        "file": _unescape(fields[2]),
+                        "line": int(fields[3]),
+                        "column": int(fields[4]),
+                        "message": _unescape("\t".join(fields[5:])),
+                    })
+            self._proc = None
+            raise RuntimeError("The compile server exited unexpectedly.")
+
+    def close(self):
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc = None
+
+
+def maven_classpath(root: Path, mvn_cmd: str = "mvn") -> List[str]:
+    """Dependency jars of every module of the Maven project at root (empty if there is no pom or no mvn)."""
+    pom = root / "pom.xml"
+    if not pom.exists() or shutil.which(mvn_cmd) is None:
+        return []
+    # relative outputFile is resolved per module, so each module writes its own list
+    output = "target/reforge-classpath.txt"
+    run_command([mvn_cmd, "-q", "-f", str(pom), "dependency:build-classpath", f"-Dmdep.outputFile={output}"])
+    entries: List[str] = []
+    for listing in root.rglob(output):
+        for entry in listing.read_text().strip().split(os.pathsep):
+            if entry and entry not in entries:
+                entries.append(entry)
+    return entries
+
+
+class JavaCheckInput(BaseModel):
+    files: Optional[List[str]] = Field(
+        None,
+        description="Java files to check in addition to those changed since the last check"
+    )
+
+
+class JavaCheckTool(BaseTool):
+    name: str = "java-check"
+    description: str = (
+        "Quickly compile only the Java files changed since the last check plus the files that depend "
+        "on them, and return the compiler errors. Use it after every edit; run maven-build at the end."
+    )
+    args_schema: Type[JavaCheckInput] = JavaCheckInput
+
+    _base_path: Path = PrivateAttr()
+    _index: JavaSourceIndex = PrivateAttr()
+    _server: CompileServer = PrivateAttr()
+    _mvn_cmd: str = PrivateAttr()
+    _sources: WatchedStamps = PrivateAttr()
+    _stamps: Dict[str, Tuple[float, int]] = PrivateAttr(default_factory=dict)
+    _pending: Set[str] = PrivateAttr(default_factory=set)
+    _classpath: Optional[List[str]] = PrivateAttr(default=None)
+    _classpath_key: Optional[Tuple] = PrivateAttr(default=None)
+    _out_dir: str = PrivateAttr()
+
+    def __init__(self, base_path: Optional[str] = None, java_home: Optional[str] = None):
+        super().__init__()
+        self._base_path = codebase_path(base_path)
+        java_cmd = os.path.join(java_home, "bin", "java") if java_home else "java"
+        self._mvn_cmd = "mvn"
+        self._server = CompileServer(java_cmd)
+        self._index = source_index(str(self._base_path))
+        self._out_dir = tempfile.mkdtemp(prefix="reforge-check-")
+        # baseline: what the sources look like before the agent starts editing
+        self._sources = WatchedStamps(str(self._base_path))
+        self._stamps = self._sources.current() if self._base_path.is_dir() else {}
+
+    def _resolve_classpath(self) -> List[str]:
+        poms = sorted(self._base_path.rglob("pom.xml"))
+        key = tuple((str(p), p.stat().st_mtime) for p in poms)
+        if self._classpath is None or key != self._classpath_key:
+            self._classpath = maven_classpath(self._base_path, self._mvn_cmd)
+            self._classpath_key = key
+        class_dirs = [str(p) for p in self._base_path.rglob("target/classes") if p.is_dir()]
+        class_dirs += [str(p) for p in self._base_path.rglob("target/test-classes") if p.is_dir()]
+        return class_dirs + self._classpath
+
+    def _run(self, files: Optional[List[str]] = None) -> dict:
+        if not self._base_path.is_dir():
+            raise FileNotFoundError(f"📁 Directory '{self._base_path}' not found.")
+        start = time.perf_counter()
+
+        # only what the watcher reported is re-stat'ed while one runs on the codebase
+        current = self._sources.current()
+        changed = {p for p, stamp in current.items() if self._stamps.get(p) != stamp}
+        deleted = set(self._stamps) - set(current)
+        explicit = {str((self._base_path / f).resolve()) for f in files or []}
+        targets = (changed | self._pending | explicit) & set(current)
+
+        self._index.refresh()
+        dependents = self._index.dependents(targets | deleted) & set(current)
+        to_check = sorted(targets | dependents)
+        if not to_check:
+            self._stamps = current
+            return {"ok": True, "checked": [], "message": "ℹ️  No Java file changed since the last check."}
+
+        options = [
+            "-d", self._out_dir,
+            "-classpath", os.pathsep.join(self._resolve_classpath()) or ".",
+            "-sourcepath", os.pathsep.join(self._index.source_roots()) or ".",
+            "-implicit:none", "-proc:none", "-nowarn", "-encoding", "UTF-8",
+        ]
+        ok, diagnostics = self._server.compile(options, to_check)
+
+        errors = [d for d in diagnostics if d["kind"] == "ERROR"]
+        # files with errors are checked again next time even if left untouched
+        self._pending = {d["file"] for d in errors if d["file"] in current}
+        self._stamps = current
+
+        relative = lambda p: os.path.relpath(p, self._base_path) if p else p
+        return {
+            "ok": ok,
+            "checked": [relative(p) for p in sorted(targets)],
+            "dependents": [relative(p) for p in sorted(dependents)],
+            "errors": len(errors),
+            "diagnostics": [{**d, "file": relative(d["file"])} for d in diagnostics[:MAX_DIAGNOSTICS]],
+            "elapsed_s": round(time.perf_counter() - start, 3),
+        }
@@ -0,0 +1,536 @@
+# tools/java_chunk_index.py
+
+"""
+Java sources split into chunks along the AST, with precomputed token counts.
+
+Agents could only read whole files or raw line slices; when a prompt got
+too big the code was cut wherever the limit fell, often in the middle of a
+method. This index splits every compilation unit into:
+
+  file         the package, imports and top-level comments;
+  class        a type declaration (nested types are children of their type);
+  method       a method, constructor or annotation member;
+  field_group  consecutive fields (and the initializers between them).
+
+Each chunk has a stable id (`com/acme/Foo.java#Foo.bar(int,String)`,
+`...#Foo.Inner`, `...#Foo.fields:count`), its parent and children, its
+span (comments, javadoc and annotations included) and two token counts:
+`tokens` for its own text, where each child is a one-line placeholder
+(`// [#Foo.bar(int,String) 120]`: its id after the file, its total
+tokens), and `total_tokens` for the whole span. Spans come from the
+javalang AST, whose nodes only carry a start position, extended over the
+token stream the way patch_edit_tool finds a member. A file that does not
+parse (half-edited, or syntax javalang does not know) is a single file
+chunk.
+
+Only spans and counts are stored, in a SQLite file per codebase in the
+system temp dir; text is read from the file when asked for. refresh() only
+re-chunks files whose mtime or size changed (only the files a watcher
+reported while one runs, see fs_watcher.py). read() cuts a file or class
+at chunk boundaries to fit a token budget: whole children while they fit,
+then the skeletons of the classes, then placeholders. chunk_index(root)
+returns one instance per root for the process.
+"""
+import bisect
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import javalang
+from pydantic import BaseModel, Field, PrivateAttr
+from crewai.tools.base_tool import BaseTool
+
+from tools.codebase import codebase_path
+from tools.fs_watcher import WatchedStamps
+
+# bump when the chunker changes, so existing indexes are rebuilt
+CHUNKER_VERSION = "2"
+# the queries of JavaChunksTool
+QUERIES = ("outline", "get", "read", "find")
+# a run of fields longer than this is split into several groups
+FIELD_GROUP_TOKENS = 600
+PARSE_ERRORS = (javalang.parser.JavaSyntaxError, javalang.tokenizer.LexerError,
+                TypeError, ValueError, IndexError, KeyError, StopIteration)
+
+# roughly what BPE tokenizers split code into: a word or a camelCase part, a few
+# digits, a punctuation mark, a newline with its indentation
+_PIECES = re.compile(r"\n[ \t]*|[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d{1,3}|[^\w\s]|\w+")
+
+
+def count_tokens(text: str) -> int:
+    """Estimated LLM tokens of a piece of code (no tokenizer download, stable across runs)."""
+    return len(_PIECES.findall(text))
+
+
+@dataclass
+class Chunk:
+    id: str
+    kind: str
+    name: str
+    start: int
+    end: int
+    parent: Optional[str] = None
+    signature: str = ""
+    tokens: int = 0
+    total_tokens: int = 0
+    children: List["Chunk"] = field(default_factory=list)
+
+
+# ────────── Chunking ──────────
+def _offsets(source: str) -> List[int]:
+    starts, total = [], 0
+    for line in source.splitlines(keepends=True):
+        starts.append(total)
+        total += len(line)
+    return starts + [total]
+
+
+def _type_name(parameter) -> str:
+    # the simple name: javalang chains java.util.List through sub_type, with the dimensions on `java`
+    node = parameter.type
+    while getattr(node, "sub_type", None) is not None:
+        node = node.sub_type
+    name = node.name + "[]" * len(parameter.type.dimensions or [])
+    return name + "..." if parameter.varargs else name
+
+
+class _Spans:
+    """Offsets of the declarations of one file, from the AST positions and the token stream."""
+
+    def __init__(self, source: str, tokens: list):
+        self.source = source
+        self.tokens = tokens
+        self.starts = _offsets(source)
+        self.index = {t.position: i for i, t in enumerate(tokens)}
+
+    def offset(self, i: int) -> int:
+        position = self.tokens[i].position
+        return self.starts[position.line - 1] + position.column - 1
+
+    def span(self, position, is_field: bool = False) -> Tuple[int, int]:
+        tokens = self.tokens
+        first = self.index[position]
+        # back over modifiers and annotations to the end of the previous member (or the type's '{')
+        depth = 0
+        while first > 0:
+            value = tokens[first - 1].value
+            if value == ")":
+                depth += 1
+            elif value == "(":
+                depth -= 1
+            elif depth == 0 and value in (";", "{", "}"):
+                break
+            first -= 1
+
+        # forward to the body's closing '}' or the ';' of a field or abstract method
+        last, depth = self.index[position], 0
+        while last < len(tokens):
+            value = tokens[last].value
+            if value in ("(", "[") or (is_field and value == "{"):
+                depth += 1
+            elif value in (")", "]") or (is_field and value == "}"):
+                depth -= 1
+            elif depth == 0 and value == ";":
+                break
+            elif depth == 0 and value == "{":
+                braces = 0
+                while last < len(tokens):
+                    braces += {"{": 1, "}": -1}.get(tokens[last].value, 0)
+                    if braces == 0:
+                        break
+                    last += 1
+                break
+            last += 1
+        last = min(last, len(tokens) - 1)
+
+        # from the line after the previous member (its javadoc and comments belong to this one), blank lines skipped
+        begin = self.offset(first)
+        start = 0
+        if first > 0:
+            previous = tokens[first - 1].position.line
+            start = self.starts[previous] if tokens[first].position.line > previous \
+                else self.offset(first - 1) + len(tokens[first - 1].value)
+        while True:
+            newline = self.source.find("\n", start, begin)
+            if newline == -1 or self.source[start:newline].strip():
+                break
+            start = newline + 1
+        # to the end of the line, trailing comment included, unless another member starts on it
+        end = self.offset(last) + len(tokens[last].value)
+        if last + 1 == len(tokens) or tokens[last + 1].position.line > tokens[last].position.line:
+            newline = self.source.find("\n", end)
+            end = newline + 1 if newline != -1 else len(self.source)
+        return start, end
+
+
+def _members(declaration) -> list:
+    body = declaration.body
+    return list(body.declarations) if isinstance(body, javalang.tree.EnumBody) else list(body or [])
+
+
+def _placeholder(source: str, chunk: Chunk) -> str:
+    text = source[chunk.start:chunk.end]
+    indent = text[:len(text) - len(text.lstrip(" \t\n"))].rsplit("\n", 1)[-1]
+    # the id without its file part: the file is the one being read
+    key = chunk.id.split("#", 1)[-1]
+    return f"{indent}// [#{key} {chunk.total_tokens}]" + ("\n" if text.endswith("\n") else "")
+
+
+def own_text(source: str, chunk: Chunk) -> str:
+    """The chunk's text with each of its children replaced by a placeholder line."""
+    pieces, at = [], chunk.start
+    for child in chunk.children:
+        pieces.append(source[at:child.start])
+        pieces.append(_placeholder(source, child))
+        at = child.end
+    pieces.append(source[at:chunk.end])
+    return "".join(pieces)
+
+
+def chunk_source(source: str, file_id: str) -> Tuple[str, List[Chunk]]:
+    """(package, chunks in source order, the file chunk first); raises on a file that does not parse."""
+    tree = javalang.parse.parse(source)
+    spans = _Spans(source, list(javalang.tokenizer.tokenize(source)))
+    package = tree.package.name if tree.package else ""
+    root = Chunk(file_id, "file", os.path.basename(file_id), 0, len(source))
+    seen: Dict[str, int] = {}
+
+    def add(parent: Chunk, kind: str, name: str, span: Tuple[int, int], key: str, signature: str = "") -> Chunk:
+        chunk_id = f"{file_id}#{key}"
+        seen[chunk_id] = seen.get(chunk_id, 0) + 1
+        if seen[chunk_id] > 1:
+            chunk_id += f"~{seen[chunk_id]}"
+        chunk = Chunk(chunk_id, kind, name, *span, parent=parent.id, signature=signature)
+        parent.children.append(chunk)
+        return chunk
+
+    def add_type(parent: Chunk, declaration, qualified: str):
+        chunk = add(parent, "class", qualified, spans.span(declaration.position), qualified)
+        fields: List[Any] = []
+
+        def close_fields():
+            if fields:
+                names = [d.name for f in fields for d in f.declarators]
+                add(chunk, "field_group", names[0], (spans.span(fields[0].position, True)[0],
+                                                    spans.span(fields[-1].position, True)[1]),
+                    f"{qualified}.fields:{names[0]}", ", ".join(names))
+                fields.clear()
+
+        for member in _members(declaration):
+            if isinstance(member, javalang.tree.FieldDeclaration) and member.position is not None:
+                if fields:
+                    start = spans.span(fields[0].position, True)[0]
+                    if count_tokens(source[start:spans.span(member.position, True)[1]]) > FIELD_GROUP_TOKENS:
+                        close_fields()
+                fields.append(member)
+                continue
+            if isinstance(member, javalang.tree.TypeDeclaration):
+                close_fields()
+                add_type(chunk, member, f"{qualified}.{member.name}")
+            elif isinstance(member, (javalang.tree.MethodDeclaration, javalang.tree.ConstructorDeclaration,
+                                     javalang.tree.AnnotationMethod)) and member.position is not None:
+                close_fields()
+                parameters = [_type_name(p) for p in getattr(member, "parameters", None) or []]
+                add(chunk, "method", member.name, spans.span(member.position),
+                    f"{qualified}.{member.name}({','.join(parameters)})",
+                    f"{member.name}({', '.join(parameters)})")
+            # initializer blocks and enum constants stay in the type's own text
+        close_fields()
+
+    for declaration in tree.types:
+        add_type(root, declaration, declaration.name)
+
+    ordered: List[Chunk] = []
+
+    def count(chunk: Chunk):
+        ordered.append(chunk)
+        # children first: the placeholders in the parent's own text show their counts
+        for child in chunk.children:
+            count(child)
+        chunk.total_tokens = count_tokens(source[chunk.start:chunk.end])
+        chunk.tokens = count_tokens(own_text(source, chunk))
+
+    count(root)
+    return package, ordered
+
+
+# ────────── Index ──────────
+def _index_file(root: str) -> Path:
+    # outside the project, like the static-analysis cache
+    key = hashlib.sha256(root.encode()).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / "reforge-chunks" / f"{key}.db"
+
+
+class JavaChunkIndex:
+    def __init__(self, root: str, db_path: Optional[str] = None):
+        self.root = str(Path(root).resolve())
+        self.db_path = db_path or str(_index_file(self.root))
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stamps = WatchedStamps(self.root)
+
+    # ────────── Connection ──────────
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL, size INTEGER,
+                                                  package TEXT, error TEXT);
+                CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, path TEXT, seq INTEGER, kind TEXT,
+                                                   name TEXT, signature TEXT, parent TEXT, start_offset INTEGER,
+                                                   end_offset INTEGER, line INTEGER, end_line INTEGER,
+                                                   tokens INTEGER, total_tokens INTEGER);
+                CREATE INDEX IF NOT EXISTS chunks_path ON chunks(path);
+                CREATE INDEX IF NOT EXISTS chunks_parent ON chunks(parent);
+                CREATE INDEX IF NOT EXISTS chunks_name ON chunks(name);
+            """)
+            version = self._conn.execute("SELECT value FROM meta WHERE key = 'chunker'").fetchone()
+            if version is None or version[0] != CHUNKER_VERSION:
+                with self._conn:
+                    for table in ("files", "chunks"):
+                        self._conn.execute(f"DELETE FROM {table}")
+                    self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('chunker', ?)", (CHUNKER_VERSION,))
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def file_id(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    # ────────── Refresh ──────────
+    def refresh(self) -> Dict[str, Any]:
+        """Re-chunk the new and modified files and forget deleted ones; return what was done."""
+        start = time.perf_counter()
+        with self._lock:
+            conn = self._connection()
+            known = {path: (mtime, size) for path, mtime, size in conn.execute("SELECT path, mtime, size FROM files")}
+            current = self._stamps.current()
+            changed = [p for p, stamp in current.items() if known.get(p) != stamp]
+            removed = [p for p in known if p not in current]
+            with conn:
+                for path in changed + removed:
+                    for table in ("files", "chunks"):
+                        conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+                for path in changed:
+                    source = Path(path).read_text(encoding="utf-8", errors="ignore")
+                    file_id = self.file_id(path)
+                    try:
+                        package, chunks = chunk_source(source, file_id)
+                        error = None
+                    except PARSE_ERRORS as e:
+                        whole = Chunk(file_id, "file", os.path.basename(file_id), 0, len(source),
+                                      tokens=count_tokens(source), total_tokens=count_tokens(source))
+                        package, chunks, error = "", [whole], f"{type(e).__name__}: {e}"
+                    starts = _offsets(source)
+                    conn.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?)", (path, *current[path], package, error))
+                    conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+                        (c.id, path, seq, c.kind, c.name, c.signature, c.parent, c.start, c.end,
+                         bisect.bisect_right(starts, c.start), bisect.bisect_right(starts, max(c.end - 1, c.start)),
+                         c.tokens, c.total_tokens)
+                        for seq, c in enumerate(chunks)])
+        return {"files": len(current), "chunked": len(changed), "removed": len(removed),
+                "elapsed_s": round(time.perf_counter() - start, 3)}
+
+    # ────────── Queries ──────────
+    _COLUMNS = "id, path, kind, name, signature, parent, start_offset, end_offset, line, end_line, tokens, total_tokens"
+
+    def _rows(self, where: str, args: Tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connection().execute(f"SELECT {self._COLUMNS} FROM chunks WHERE {where} ORDER BY path, seq",
+                                              args).fetchall()
+        return [dict(zip(("id", "path", "kind", "name", "signature", "parent", "start", "end", "line", "end_line",
+                          "tokens", "total_tokens"), row)) for row in rows]
+
+    def chunk(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._rows("id = ?", (chunk_id,))
+        return rows[0] if rows else None
+
+    def resolve(self, target: str) -> Optional[Dict[str, Any]]:
+        """The chunk `target` (`file#key`, the file absolute or relative), or the file chunk of the .java file `target`."""
+        found = self.chunk(target)
+        if found is None:
+            file_part, _, key = target.partition("#")
+            path = Path(file_part) if os.path.isabs(file_part) else Path(self.root) / file_part
+            file_id = self.file_id(str(path.resolve()))
+            found = self.chunk(f"{file_id}#{key}" if key else file_id)
+        return found
+
+    def children(self, chunk_id: str) -> List[Dict[str, Any]]:
+        return self._rows("parent = ?", (chunk_id,))
+
+    def find(self, name: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Chunks named `name` first, then those whose name or id contains it."""
+        exact = self._rows("name = ? OR name LIKE ?", (name, f"%.{name}"))
+        like = [c for c in self._rows("name LIKE ? OR id LIKE ?", (f"%{name}%", f"%{name}%"))
+                if c["id"] not in {e["id"] for e in exact}]
+        return (exact + like)[:limit]
+
+    def outline(self, chunk_id: str) -> Dict[str, Any]:
+        """The chunk and its descendants: ids, kinds, lines and token counts, without text."""
+        chunk = self.chunk(chunk_id)
+        if chunk is None:
+            raise KeyError(chunk_id)
+        rows = self._rows("path = ?", (chunk["path"],))
+        below: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            below.setdefault(row["parent"], []).append(row)
+
+        def node(row: Dict[str, Any]) -> Dict[str, Any]:
+            entry = {"id": row["id"], "kind": row["kind"], "name": row["signature"] or row["name"],
+                     "lines": f"{row['line']}-{row['end_line']}", "tokens": row["tokens"],
+                     "total_tokens": row["total_tokens"]}
+            if row["id"] in below:
+                entry["children"] = [node(child) for child in below[row["id"]]]
+            return entry
+
+        return node(chunk)
+
+    def signatures(self) -> List[str]:
+        """`package.Type.method(ParamType, ...)` of every method and constructor."""
+        with self._lock:
+            packages = dict(self._connection().execute("SELECT path, package FROM files"))
+        types = {c["id"]: c["name"] for c in self._rows("kind = 'class'", ())}
+        return [".".join(filter(None, (packages.get(c["path"]), types.get(c["parent"], "?"), c["signature"])))
+                for c in self._rows("kind = 'method'", ())]
+
+    # ────────── Text ──────────
+    def _tree(self, chunk_id: str) -> Tuple[str, Chunk]:
+        """The file's current source and the chunk `chunk_id` with its descendants."""
+        chunk = self.chunk(chunk_id)
+        if chunk is None:
+            raise KeyError(chunk_id)
+        with self._lock:
+            stamp = self._connection().execute("SELECT mtime, size FROM files WHERE path = ?",
+                                               (chunk["path"],)).fetchone()
+        st = os.stat(chunk["path"])
+        if stamp is None or (st.st_mtime, st.st_size) != tuple(stamp):
+            # edited since the last refresh: the stored spans would cut the new text in the wrong places
+            self.refresh()
+            chunk = self.chunk(chunk_id)
+            if chunk is None:
+                raise KeyError(chunk_id)
+        source = Path(chunk["path"]).read_text(encoding="utf-8", errors="ignore")
+        nodes = {row["id"]: Chunk(row["id"], row["kind"], row["name"], row["start"], row["end"], row["parent"],
+                                  row["signature"], row["tokens"], row["total_tokens"])
+                 for row in self._rows("path = ?", (chunk["path"],))}
+        for node in nodes.values():
+            if node.parent in nodes:
+                nodes[node.parent].children.append(node)
+        return source, nodes[chunk_id]
+
+    def text(self, chunk_id: str) -> str:
+        """The chunk's own text: its children (members of a class, types of a file) as placeholders."""
+        source, chunk = self._tree(chunk_id)
+        return own_text(source, chunk)
+
+    def read(self, chunk_id: str, max_tokens: Optional[int] = None) -> str:
+        """
+        The chunk's text within `max_tokens`: whole if it fits; otherwise its
+        own text with, in source order, each child whole if it still fits,
+        else rendered the same way (classes), else as its placeholder.
+        A chunk whose own text exceeds the budget is returned anyway: chunks
+        are never cut.
+        """
+        source, chunk = self._tree(chunk_id)
+
+        def emit(node: Chunk, budget: Optional[int]) -> str:
+            if budget is None or node.total_tokens <= budget:
+                return source[node.start:node.end]
+            remaining = budget - node.tokens
+            pieces, at = [], node.start
+            for child in node.children:
+                pieces.append(source[at:child.start])
+                placeholder = _placeholder(source, child)
+                # the placeholder is already counted in the parent's own tokens
+                spare = remaining + count_tokens(placeholder)
+                if child.total_tokens <= spare or (child.children and child.tokens <= spare):
+                    text = emit(child, spare)
+                    remaining = spare - count_tokens(text)
+                else:
+                    text = placeholder
+                pieces.append(text)
+                at = child.end
+            pieces.append(source[at:node.end])
+            return "".join(pieces)
+
+        return emit(chunk, max_tokens)
+
+
+_indexes: Dict[str, JavaChunkIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def chunk_index(root: str) -> JavaChunkIndex:
+    """The process-wide index of `root` (call refresh() before use)."""
+    key = str(Path(root).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = JavaChunkIndex(key)
+        return _indexes[key]
+
+
+class JavaChunksInput(BaseModel):
+    query: str = Field(
+        "outline",
+        description="outline (the chunks of a file or class: ids, kinds, lines and token counts), "
+                    "get (the text of one chunk, its members as placeholders), read (a file or chunk cut at "
+                    "chunk boundaries to fit max_tokens), or find (chunks whose name contains `target`).",
+    )
+    target: str = Field(..., description="A .java file (relative to the project root), a chunk id from outline, or "
+                                         "<file>#<key> for a placeholder `// [#<key> ...]`; for find, a class, "
+                                         "method or field name.")
+    max_tokens: Optional[int] = Field(None, description="Token budget, for query=read.")
+    code_path: Optional[str] = Field(
+        None, description="Path to project root (defaults to the codebase under analysis)."
+    )
+
+
+class JavaChunksTool(BaseTool):
+    name: str = "java_chunks"
+    description: str = (
+        "Read Java code by class, method and field group instead of whole files: outline a file to see its "
+        "chunks and their token counts, then get exactly the chunks you need, or read a file cut to a token "
+        "budget without splitting any method."
+    )
+    args_schema: Type[JavaChunksInput] = JavaChunksInput
+
+    _code_path: Optional[str] = PrivateAttr()
+
+    def __init__(self, code_path: Optional[str] = None):
+        super().__init__()
+        # resolved per call, falling back to CODE_PATH (see tools/codebase.py)
+        self._code_path = code_path
+
+    def _run(self, target: str, query: str = "outline", max_tokens: Optional[int] = None,
+             code_path: Optional[str] = None) -> Any:
+        if query not in QUERIES:
+            return f"❌ Unknown query '{query}'; use one of: {', '.join(QUERIES)}."
+        root = codebase_path(code_path or self._code_path)
+        if not root.is_dir():
+            raise FileNotFoundError(f"📁 Directory '{root}' not found.")
+        index = chunk_index(str(root))
+        index.refresh()
+        if query == "find":
+            return index.find(target) or f"ℹ️  No chunk named like '{target}'."
+        chunk = index.resolve(target)
+        if chunk is None:
+            return f"❌ No chunk or .java file '{target}'; use query=find to look it up by name."
+        if query == "get":
+            return index.text(chunk["id"])
+        if query == "read":
+            return index.read(chunk["id"], max_tokens)
+        return index.outline(chunk["id"])
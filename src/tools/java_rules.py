@@ -0,0 +1,244 @@
+# tools/java_rules.py
+
+"""
+Rule engine behind StaticAnalyzerTool.
+
+Rules are declarative (see rules/java21_migration.yaml): each one names the
+imports, calls, instance-method calls, instantiations, type uses,
+superclasses or method declarations that make a file a migration hazard. A file is parsed once
+with javalang and its AST walked once for all rules; the result is a list
+of (rule id, line) pairs.
+
+Files javalang cannot parse (Java 14+ syntax, or a half-edited file) are
+still checked for their imports, from the raw lines, and reported with
+their parse error.
+
+Instance-method calls are matched on the receiver's type as far as one
+file tells it: variables, fields and parameters declared with the type (or
+a class of the file extending it), `new Type(...).m()`, and chains through
+the type's static factories such as `Thread.currentThread().stop()`.
+
+This module does not import crewai, so the worker processes that run
+analyze_files() start quickly.
+"""
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import javalang
+import yaml
+
+DEFAULT_RULES_PATH = str(Path(__file__).resolve().parent / "rules" / "java21_migration.yaml")
+MATCHERS = ("imports", "calls", "member_calls", "creators", "types", "extends", "method_declarations")
+IMPORT_LINE = re.compile(r"^\s*import\s+(?:static\s+)?([\w.]+)")
+
+
+@dataclass
+class Rule:
+    id: str
+    severity: str
+    message: str
+    imports: List[str] = field(default_factory=list)
+    exclude_imports: List[str] = field(default_factory=list)
+    calls: List[str] = field(default_factory=list)
+    member_calls: List[Dict] = field(default_factory=list)
+    creators: List[str] = field(default_factory=list)
+    types: List[str] = field(default_factory=list)
+    extends: List[str] = field(default_factory=list)
+    method_declarations: List[Dict] = field(default_factory=list)
+
+
+def load_rules(path: Optional[str] = None) -> List[Rule]:
+    path = path or DEFAULT_RULES_PATH
+    with open(path, "r", encoding="utf-8") as f:
+        catalogue = yaml.safe_load(f) or {}
+    rules = []
+    for entry in catalogue.get("rules", []):
+        rule = Rule(**entry)
+        if not any(getattr(rule, m) for m in MATCHERS):
+            raise ValueError(f"Rule '{rule.id}' in {path} has no matcher.")
+        rules.append(rule)
+    return rules
+
+
+def rules_digest(rules: List[Rule]) -> str:
+    """Changes whenever a rule changes, so cached findings are not reused across catalogues."""
+    return hashlib.sha256(json.dumps([asdict(r) for r in rules], sort_keys=True).encode()).hexdigest()
+
+
+def _prefix_match(name: str, prefixes: List[str]) -> bool:
+    # a.b matches a.b and a.b.*, not a.bc
+    return any(name == p or name.startswith(p + ".") for p in prefixes)
+
+
+def _import_rules(name: str, rules: List[Rule]) -> List[str]:
+    return [r.id for r in rules
+            if _prefix_match(name, r.imports) and not _prefix_match(name, r.exclude_imports)]
+
+
+def _type_name(node) -> str:
+    """Full dotted name of a ReferenceType (javalang chains java.lang.Integer through sub_type)."""
+    parts = []
+    while node is not None:
+        parts.append(node.name)
+        node = getattr(node, "sub_type", None)
+    return ".".join(parts)
+
+
+def _name_match(name: str, wanted: List[str]) -> bool:
+    # either the simple name or the fully qualified one
+    return name in wanted or name.rpartition(".")[2] in wanted
+
+
+def _simple(name: str) -> str:
+    return name.rpartition(".")[2]
+
+
+def _member_rules(receiver_types: Set[str], member: str, arguments: int,
+                  member_calls: Dict[str, List[Dict]]) -> List[str]:
+    return [rule_id for rule_id, wanted in member_calls.items()
+            if any(m["receiver"] in receiver_types and member in m["members"]
+                   and m.get("arguments") in (None, arguments) for m in wanted)]
+
+
+def _children(node):
+    for child in node.children:
+        if isinstance(child, javalang.ast.Node):
+            yield child
+        elif isinstance(child, (list, tuple, set)):
+            for item in child:
+                if isinstance(item, javalang.ast.Node):
+                    yield item
+
+
+def analyze_source(source: str, rules: List[Rule]) -> Tuple[List[Tuple[str, int]], Optional[str]]:
+    """Return the sorted, de-duplicated (rule id, line) findings of one file and its parse error, if any."""
+    found = set()
+    try:
+        tree = javalang.parse.parse(source)
+    except (javalang.parser.JavaSyntaxError, javalang.tokenizer.LexerError,
+            TypeError, ValueError, IndexError, StopIteration) as e:
+        for number, line in enumerate(source.splitlines(), 1):
+            match = IMPORT_LINE.match(line)
+            if match:
+                found.update((rule_id, number) for rule_id in _import_rules(match.group(1), rules))
+        at = getattr(getattr(e, "at", None), "position", None)
+        detail = getattr(e, "description", None) or str(e)
+        return sorted(found), f"{type(e).__name__}: {detail}" + (f" (line {at.line})" if at else "")
+
+    calls = {r.id: r.calls for r in rules if r.calls}
+    creators = {r.id: r.creators for r in rules if r.creators}
+    types = {r.id: r.types for r in rules if r.types}
+    extends = {r.id: r.extends for r in rules if r.extends}
+    declarations = {r.id: r.method_declarations for r in rules if r.method_declarations}
+    member_calls = {r.id: r.member_calls for r in rules if r.member_calls}
+    members = {name for wanted in member_calls.values() for m in wanted for name in m["members"]}
+    factories = {(m["receiver"], f) for wanted in member_calls.values() for m in wanted for f in m.get("factories", [])}
+    # receiver types are only known once the whole file is read (fields may come after their uses):
+    # collect the candidate calls as (receiver type, receiver variable, member, arguments, line)
+    invocations: List[Tuple[Optional[str], Optional[str], str, int, int]] = []
+    variables: Dict[str, Set[str]] = {}
+    supers: Dict[str, str] = {}
+
+    # iterative walk: deep expression trees would exceed the recursion limit of javalang's own iterator;
+    # nodes without a position (types, creators) take the line of the closest positioned ancestor
+    stack = [(tree, 0)]
+    while stack:
+        node, line = stack.pop()
+        position = getattr(node, "position", None)
+        if position is not None:
+            line = position.line
+        kind = type(node).__name__
+
+        if kind == "Import":
+            found.update((rule_id, line) for rule_id in _import_rules(node.path, rules))
+        elif kind == "MethodInvocation" and node.qualifier:
+            qualifier = node.qualifier.rpartition(".")[2]
+            for rule_id, wanted in calls.items():
+                if f"{qualifier}.{node.member}" in wanted or f"{node.qualifier}.{node.member}" in wanted:
+                    found.add((rule_id, line))
+            if node.member in members:
+                # Type.m() or variable.m(); which of the two is decided after the walk
+                invocations.append((qualifier, qualifier, node.member, len(node.arguments), line))
+        elif kind in ("LocalVariableDeclaration", "FieldDeclaration"):
+            for declarator in node.declarators:
+                variables.setdefault(declarator.name, set()).add(_simple(_type_name(node.type)))
+        elif kind == "FormalParameter":
+            variables.setdefault(node.name, set()).add(_simple(_type_name(node.type)))
+        elif kind == "ClassCreator":
+            name = _type_name(node.type)
+            found.update((rule_id, line) for rule_id, wanted in creators.items() if _name_match(name, wanted))
+        elif kind == "ReferenceType":
+            name = _type_name(node)
+            found.update((rule_id, line) for rule_id, wanted in types.items() if _name_match(name, wanted))
+            # sub_type is part of this name, not a type of its own: only walk the type arguments
+            while node is not None:
+                stack.extend((child, line) for child in _children(node) if child is not node.sub_type)
+                node = node.sub_type
+            continue
+        elif kind == "ClassDeclaration" and node.extends is not None:
+            name = _type_name(node.extends)
+            found.update((rule_id, line) for rule_id, wanted in extends.items() if _name_match(name, wanted))
+            supers[node.name] = _simple(name)
+        elif kind == "MethodDeclaration":
+            for rule_id, wanted in declarations.items():
+                for declaration in wanted:
+                    count = declaration.get("parameters")
+                    if node.name == declaration["name"] and (count is None or len(node.parameters) == count):
+                        found.add((rule_id, line))
+
+        if member_calls and getattr(node, "selectors", None):
+            # a chain: the receiver of the first selector is what this node evaluates to
+            receiver, variable = None, None
+            if kind == "MethodInvocation" and node.qualifier:
+                qualifier = _simple(node.qualifier)
+                if (qualifier, node.member) in factories:
+                    receiver = qualifier
+            elif kind == "ClassCreator":
+                receiver = _simple(_type_name(node.type))
+            for selector in node.selectors:
+                name = type(selector).__name__
+                if name == "MethodInvocation":
+                    if selector.member in members and (receiver or variable):
+                        invocations.append((receiver, variable, selector.member, len(selector.arguments), line))
+                    receiver = receiver if (receiver, selector.member) in factories else None
+                    variable = None
+                elif name == "MemberReference":
+                    # this.field
+                    receiver, variable = None, selector.member
+                else:
+                    receiver, variable = None, None
+
+        stack.extend((child, line) for child in reversed(list(_children(node))))
+
+    for receiver, variable, member, arguments, line in invocations:
+        receiver_types = ({receiver} if receiver else set()) | variables.get(variable, set())
+        # classes of this file stand for their superclasses too
+        pending = list(receiver_types)
+        while pending:
+            parent = supers.get(pending.pop())
+            if parent and parent not in receiver_types:
+                receiver_types.add(parent)
+                pending.append(parent)
+        found.update((rule_id, line) for rule_id in _member_rules(receiver_types, member, arguments, member_calls))
+    return sorted(found), None
+
+
+def analyze_files(paths: List[str], rules: List[Rule]) -> Dict[str, Dict]:
+    """Analyze a batch of files: {path: {"findings": [[rule id, line], ...], "error": str or None}}.
+
+    Module-level so a process pool can run it; batches keep the rules from being pickled per file.
+    """
+    results = {}
+    for path in paths:
+        try:
+            source = Path(path).read_text(encoding="utf-8", errors="ignore")
+        except OSError as e:
+            results[path] = {"findings": [], "error": f"{type(e).__name__}: {e}"}
+            continue
+        findings, error = analyze_source(source, rules)
+        results[path] = {"findings": [list(f) for f in findings], "error": error}
+    return results
@@ -0,0 +1,261 @@
+# tools/java_source_index.py
+
+"""
+Shared, incrementally refreshed index of the Java sources under a root.
+
+Each file is tokenized (not parsed: files an agent is halfway through
+editing still index) to record its package, the types it declares, its
+imports and the identifiers it mentions. From that the index derives a
+file-level dependency graph:
+
+  A depends on B when A imports a type declared in B, imports B's package
+  with a wildcard and mentions one of B's types, or shares B's package and
+  mentions one of B's types.
+
+refresh() only re-tokenizes files whose mtime or size changed, so the
+index can be asked again after every edit; while a watcher runs on the
+root (see fs_watcher.py) it only looks at the files reported changed
+instead of walking the tree. source_index(root) returns one instance per
+root for all the tools of a process.
+"""
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import javalang
+
+from tools.fs_watcher import WatchedPaths
+
+SKIP_DIRS = {".git", "target", "build", "node_modules", ".idea", ".gradle"}
+TYPE_KEYWORDS = {"class", "interface", "enum"}
+
+
+@dataclass
+class JavaFileInfo:
+    path: str
+    stamp: Tuple[float, int]
+    package: str = ""
+    types: List[str] = field(default_factory=list)
+    imports: List[str] = field(default_factory=list)
+    wildcard_imports: List[str] = field(default_factory=list)
+    identifiers: Set[str] = field(default_factory=set)
+    error: Optional[str] = None
+
+    def fqns(self) -> List[str]:
+        return [f"{self.package}.{t}" if self.package else t for t in self.types]
+
+
+def _stamp(path: str) -> Tuple[float, int]:
+    st = os.stat(path)
+    return (st.st_mtime, st.st_size)
+
+
+def java_files(root: str) -> List[str]:
+    """All .java files under root, skipping VCS and build output folders."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        found.extend(os.path.join(dirpath, f) for f in filenames if f.endswith(".java"))
+    return sorted(found)
+
+
+def stamps(root: str) -> Dict[str, Tuple[float, int]]:
+    """(mtime, size) of every .java file under root; cheap enough to take before and after each edit."""
+    found = {}
+    for path in java_files(root):
+        try:
+            found[path] = _stamp(path)
+        except OSError:
+            continue
+    return found
+
+
+def _read_name(tokens: list, i: int) -> Tuple[str, int, bool]:
+    """Read a dotted name starting at tokens[i] up to ';'. Returns (name, next index, is_wildcard)."""
+    parts, wildcard = [], False
+    while i < len(tokens) and tokens[i].value != ";":
+        value = tokens[i].value
+        if value == "*":
+            wildcard = True
+        elif value != ".":
+            parts.append(value)
+        i += 1
+    return ".".join(parts), i + 1, wildcard
+
+
+def scan_source(path: str, source: str) -> JavaFileInfo:
+    info = JavaFileInfo(path=path, stamp=_stamp(path))
+    try:
+        tokens = list(javalang.tokenizer.tokenize(source))
+    except (javalang.tokenizer.LexerError, TypeError, ValueError, IndexError) as e:
+        info.error = f"{type(e).__name__}: {e}"
+        return info
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        kind, value = type(token).__name__, token.value
+        if kind == "Keyword" and value == "package":
+            info.package, i, _ = _read_name(tokens, i + 1)
+            continue
+        if kind == "Keyword" and value == "import":
+            i += 1
+            static = i < len(tokens) and tokens[i].value == "static"
+            name, i, wildcard = _read_name(tokens, i + 1 if static else i)
+            if static:
+                # import static a.b.C.member / a.b.C.*: the dependency is on a.b.C
+                name = name if wildcard else name.rsplit(".", 1)[0]
+                info.imports.append(name)
+            elif wildcard:
+                info.wildcard_imports.append(name)
+            else:
+                info.imports.append(name)
+            continue
+        if kind == "Identifier":
+            info.identifiers.add(value)
+            # records are contextual in javalang's tokenizer: "record Name ("
+            is_record = (value == "record" and i + 2 < len(tokens)
+                         and type(tokens[i + 1]).__name__ == "Identifier" and tokens[i + 2].value in ("(", "<"))
+            if is_record:
+                info.types.append(tokens[i + 1].value)
+        elif kind == "Keyword" and value in TYPE_KEYWORDS and i + 1 < len(tokens):
+            previous = tokens[i - 1].value if i else ""
+            if type(tokens[i + 1]).__name__ == "Identifier" and previous != ".":
+                info.types.append(tokens[i + 1].value)
+        i += 1
+    return info
+
+
+class JavaSourceIndex:
+    def __init__(self, root: str):
+        self.root = str(Path(root).resolve())
+        self.files: Dict[str, JavaFileInfo] = {}
+        self._lock = threading.RLock()
+        self._deps: Optional[Dict[str, Set[str]]] = None
+        self._rdeps: Optional[Dict[str, Set[str]]] = None
+        self._watch = WatchedPaths(self.root)
+
+    # ────────── Refresh ──────────
+    def refresh(self, paths: Optional[Iterable[str]] = None) -> Set[str]:
+        """Re-scan new or modified files (all of root, or just `paths`); return the paths that changed."""
+        with self._lock:
+            if paths is None:
+                # the watcher knows what changed: no need to walk the tree
+                paths = self._watch.pending()
+            if paths is None:
+                current = java_files(self.root)
+                removed = set(self.files) - set(current)
+            else:
+                candidates = [str(Path(p).resolve()) for p in paths]
+                current = [p for p in candidates if os.path.isfile(p)]
+                removed = {p for p in candidates if p in self.files and not os.path.isfile(p)}
+
+            changed = set(removed)
+            for path in removed:
+                del self.files[path]
+            for path in current:
+                try:
+                    stamp = _stamp(path)
+                except OSError:
+                    continue
+                known = self.files.get(path)
+                if known is not None and known.stamp == stamp:
+                    continue
+                source = Path(path).read_text(encoding="utf-8", errors="ignore")
+                self.files[path] = scan_source(path, source)
+                changed.add(path)
+            if changed:
+                self._deps = self._rdeps = None
+            return changed
+
+    # ────────── Graph ──────────
+    def _build_graph(self):
+        by_fqn: Dict[str, str] = {}
+        by_package: Dict[str, Dict[str, str]] = {}
+        for path, info in self.files.items():
+            for simple, fqn in zip(info.types, info.fqns()):
+                by_fqn.setdefault(fqn, path)
+                by_package.setdefault(info.package, {}).setdefault(simple, path)
+
+        deps: Dict[str, Set[str]] = {}
+        for path, info in self.files.items():
+            found: Set[str] = set()
+            for name in info.imports:
+                # a.b.Outer.Inner resolves to the file declaring a.b.Outer
+                while name and name not in by_fqn:
+                    name = name.rpartition(".")[0]
+                if name:
+                    found.add(by_fqn[name])
+            for package in info.wildcard_imports + [info.package]:
+                for simple, other in by_package.get(package, {}).items():
+                    if simple in info.identifiers:
+                        found.add(other)
+            found.discard(path)
+            deps[path] = found
+
+        rdeps: Dict[str, Set[str]] = {path: set() for path in self.files}
+        for path, targets in deps.items():
+            for target in targets:
+                rdeps[target].add(path)
+        self._deps, self._rdeps = deps, rdeps
+
+    def _graph(self) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
+        with self._lock:
+            if self._deps is None:
+                self._build_graph()
+            return self._deps, self._rdeps
+
+    @staticmethod
+    def _walk(edges: Dict[str, Set[str]], paths: Iterable[str], transitive: bool) -> Set[str]:
+        start = {str(Path(p).resolve()) for p in paths}
+        seen: Set[str] = set()
+        frontier = set(start)
+        while frontier:
+            nxt = set()
+            for path in frontier:
+                for other in edges.get(path, ()):
+                    if other not in seen:
+                        seen.add(other)
+                        nxt.add(other)
+            frontier = nxt if transitive else set()
+        return seen - start
+
+    def dependencies(self, path: str, transitive: bool = False) -> Set[str]:
+        """Files that `path` depends on."""
+        return self._walk(self._graph()[0], [path], transitive)
+
+    def dependents(self, paths: Iterable[str], transitive: bool = False) -> Set[str]:
+        """Files that depend on any of `paths` (excluding `paths` themselves)."""
+        return self._walk(self._graph()[1], paths, transitive)
+
+    def file_for_type(self, fqn: str) -> Optional[str]:
+        for path, info in self.files.items():
+            if fqn in info.fqns():
+                return path
+        return None
+
+    def source_roots(self) -> List[str]:
+        """Directories that javac would use as -sourcepath (derived from each file's package)."""
+        roots = set()
+        for path, info in self.files.items():
+            directory = Path(path).parent
+            depth = len(info.package.split(".")) if info.package else 0
+            if depth and list(directory.parts[-depth:]) != info.package.split("."):
+                continue
+            roots.add(str(directory.parents[depth - 1]) if depth else str(directory))
+        return sorted(roots)
+
+
+_indexes: Dict[str, JavaSourceIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def source_index(root: str) -> JavaSourceIndex:
+    """The process-wide index of `root` (created empty; call refresh() before use)."""
+    key = str(Path(root).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = JavaSourceIndex(key)
+        return _indexes[key]
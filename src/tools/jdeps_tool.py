@@ -1,12 +1,13 @@
 import os
 import sys
-import subprocess
 from pathlib import Path
-from typing import Optional, Type, List
+from typing import Iterable, Optional, Type, List
 
 from pydantic import BaseModel, Field, PrivateAttr
 from crewai.tools.base_tool import BaseTool
 
+from tools.subprocess_runner import run_command
+
 BUILD_OUTPUT_CANDIDATES = [
     "build/classes/java/main",  # Gradle default
     "target/classes",           # Maven default
@@ -47,6 +48,20 @@ def resolve_target_path(base_path: Optional[str] = None) -> str:
         "Did you compile your code? Please build first or point --base-path at the class output."
     )
 
+def is_jdeps_issue(line: str) -> bool:
+    """Whether a jdeps report line points at a migration issue."""
+    return "not found" in line or "JDK internal API" in line or line.startswith("jdeps:")
+
+
+def parse_jdeps_output(output: Iterable[str]) -> List[str]:
+    """
+    Extract the lines of a jdeps report that point at migration issues:
+    unresolved classes, JDK internal API usage and jdeps warnings.
+    `output` is the report text or its lines.
+    """
+    lines = output.splitlines() if isinstance(output, str) else output
+    return [line.strip() for line in lines if is_jdeps_issue(line)]
+
 class JDepsInput(BaseModel):
     base_path: Optional[str] = Field(
         None,
@@ -70,26 +85,15 @@ class JDepsTool(BaseTool):
         # Determine which path to use (runtime override or constructor default)
         real_base = base_path or self._base_path
         # Resolve to actual class directory or JAR
-        # target = resolve_target_path(real_base)
-        # todo: hardcoded path
-        target = resolve_target_path("/Users/gp/Developer/java-samples/reforge-ai/src/temp_codebase/")
-
+        target = resolve_target_path(real_base)
 
         # Build jdeps invocation (no -s so we get full detail)
         cmd: List[str] = [self._jdeps_cmd, "-R", target]
 
-        # Execute jdeps
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise RuntimeError(f"jdeps failed (exit {result.returncode}): {result.stderr.strip()}")
-
-        output = result.stdout
-        issues = [
-            line.strip()
-            for line in output.splitlines()
-            if "not found" in line
-               or "JDK internal API" in line
-               or line.startswith("jdeps:")
-        ]
-
-        return {"jdeps_output": output, "identified_issues": issues}
+        # Execute jdeps; issues are picked from every line as it streams, the report itself is bounded
+        issues: List[str] = []
+        result = run_command(cmd, on_line=lambda line: is_jdeps_issue(line) and issues.append(line.strip()))
+        if not result.ok:
+            raise RuntimeError(f"jdeps failed ({result.failure()})")
+
+        return {"jdeps_output": result.stdout, "full_output": result.stdout_path, "identified_issues": issues}
@@ -1,4 +1,6 @@
 # tools/langchain_fs_tool.py
+import asyncio
+import inspect
 from typing import Any, Type, cast
 from crewai.tools import BaseTool
 from pydantic import Field, BaseModel, PrivateAttr  # Import PrivateAttr
@@ -41,9 +43,11 @@ class LangChainFSWrapper(BaseTool):
 
     async def _arun(self, *args: Any, **kwargs: Any) -> Any:
         """
-        Asynchronous run: delegate if the LangChain tool supports async.
+        Asynchronous run: await the LangChain tool's arun if it has one,
+        otherwise run the synchronous run in a worker thread.
         """
-        run_fn = getattr(self._lc_tool_internal, 'arun', self._lc_tool_internal.run)
-        # Pass through kwargs
-        output = await run_fn(kwargs if kwargs else (args[0] if args else {}))
-        return output
\ No newline at end of file
+        tool_input = kwargs if kwargs else (args[0] if args else {})
+        arun = getattr(self._lc_tool_internal, 'arun', None)
+        if arun is not None and inspect.iscoroutinefunction(arun):
+            return await arun(tool_input)
+        return await asyncio.to_thread(self._lc_tool_internal.run, tool_input)
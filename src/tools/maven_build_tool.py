@@ -1,14 +1,28 @@
 import os
-import subprocess
+import shutil
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Type
 
 from pydantic import BaseModel, Field
 from crewai.tools.base_tool import BaseTool
 
+from tools.subprocess_runner import run_command
+
 # Hardcoded default project path
 DEFAULT_CODEBASE_PATH = "/Users/gp/Developer/java-samples/reforge-ai/src/1-codegen-work/code/code"
 
+
+@lru_cache(maxsize=1)
+def _java_version() -> str:
+    """First line of `java -version`, run once per process (this tool assumes Java 21 is the default JDK)."""
+    if shutil.which("java") is None:
+        return "not found"
+    result = run_command(["java", "-version"], timeout=60)
+    lines = (result.stderr or result.stdout).strip().splitlines()
+    return lines[0] if result.ok and lines else "unknown"
+
+
 class MavenBuildInput(BaseModel):
     base_path: Optional[str] = Field(
         None,
@@ -23,10 +37,9 @@ class MavenBuildTool(BaseTool):
     def __init__(self, base_path: Optional[str] = None):
         super().__init__()
 
-        # Allow overriding the default path
-        # todo: hardcoded for now
-        # self._base_path = base_path or DEFAULT_CODEBASE_PATH
-        self._base_path = DEFAULT_CODEBASE_PATH
+        # Allow overriding the default path at construction time; the path an
+        # agent passes to _run is still ignored on purpose
+        self._base_path = base_path or DEFAULT_CODEBASE_PATH
 
     def _run(self, base_path: Optional[str] = None) -> dict:
         # Determine which path to build
@@ -41,15 +54,6 @@ class MavenBuildTool(BaseTool):
         # env["JAVA_HOME"] = "/path/to/jdk-21"
         # env["PATH"] = f"{env['JAVA_HOME']}/bin:" + env["PATH"]
 
-        # todo this tool assumes you have java 21 set as default
-        # sdk default java 21.0.7-tem
-        # test with sdk current java
-        # debug versions
-        print("******* DEBUG INFO *******")
-        print(subprocess.run(["java", "-version"], capture_output=True, text=True).stderr)
-        print(subprocess.run(["javac", "-version"], capture_output=True, text=True).stdout)
-        print("******* END DEBUG INFO *******")
-
         # Determine build tool
         pom = project_path / "pom.xml"
         gradle = project_path / "build.gradle"
@@ -63,12 +67,17 @@ class MavenBuildTool(BaseTool):
         else:
             return {"message": "ℹ️  No build file found; skipping compile."}
 
-        # Execute build
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # Execute build: only the head and tail of a verbose build are kept, the rest is in the log files
+        result = run_command(cmd, env=env)
 
         return {
             "tool": tool_used,
+            "java_version": _java_version(),
             "returncode": result.returncode,
+            "timed_out": result.timed_out,
+            "duration_s": round(result.duration_s, 1),
             "stdout": result.stdout,
             "stderr": result.stderr,
+            "stdout_log": result.stdout_path,
+            "stderr_log": result.stderr_path,
         }
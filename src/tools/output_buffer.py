@@ -0,0 +1,115 @@
+# tools/output_buffer.py
+
+"""
+Bounded buffer for command output.
+
+Keeps the first `head_chars` and the last `tail_chars` of a stream in
+memory. As soon as the stream outgrows the two, everything (what was
+buffered so far and all that follows) is also written to a spill file, so
+the full output stays available on disk while render() returns something
+small enough for an agent's context:
+
+    <head>
+    ... [123456 chars omitted; full output in /tmp/reforge-output/out-1a2b.log] ...
+    <tail>
+
+Spill files are kept for later reading; opening a new one deletes the
+oldest beyond REFORGE_OUTPUT_KEEP (200 by default) in the spill folder.
+"""
+import os
+import tempfile
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Deque, Optional, TextIO
+
+SPILL_DIR = Path(tempfile.gettempdir()) / "reforge-output"
+# spill files kept per folder, newest first
+SPILL_KEEP = int(os.getenv("REFORGE_OUTPUT_KEEP", "200"))
+
+
+def prune_spills(spill_dir: Path, keep: int = SPILL_KEEP):
+    """Delete all but the `keep` most recently written spill files of `spill_dir`."""
+    files = []
+    for path in spill_dir.glob("out-*.log"):
+        try:
+            files.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    files.sort(reverse=True)
+    for _, path in files[keep:]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            # pruned by another process at the same time
+            continue
+
+
+class OutputBuffer:
+    def __init__(self, head_chars: int = 4000, tail_chars: int = 12000, spill_dir: Optional[str] = None):
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.spill_dir = Path(spill_dir) if spill_dir else SPILL_DIR
+        self.total_chars = 0
+        self.spill_path: Optional[str] = None
+        self._head = ""
+        self._tail: Deque[str] = deque()
+        self._tail_len = 0
+        self._spill: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    def write(self, text: str):
+        if not text:
+            return
+        with self._lock:
+            self.total_chars += len(text)
+            if self.spill_path is None and self.total_chars > self.head_chars + self.tail_chars:
+                self._open_spill()
+            if self._spill is not None:
+                self._spill.write(text)
+
+            room = self.head_chars - len(self._head)
+            if room > 0:
+                self._head += text[:room]
+                text = text[room:]
+            if text:
+                self._tail.append(text)
+                self._tail_len += len(text)
+                while self._tail_len > self.tail_chars:
+                    excess = self._tail_len - self.tail_chars
+                    first = self._tail[0]
+                    if len(first) <= excess:
+                        self._tail.popleft()
+                        self._tail_len -= len(first)
+                    else:
+                        self._tail[0] = first[excess:]
+                        self._tail_len -= excess
+
+    def _open_spill(self):
+        # nothing has been dropped yet, so head + tail is the whole output so far
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        # the new file is not counted yet: room for it, and for the ones still being written
+        prune_spills(self.spill_dir, max(SPILL_KEEP - 1, 0))
+        fd, self.spill_path = tempfile.mkstemp(prefix="out-", suffix=".log", dir=self.spill_dir)
+        self._spill = os.fdopen(fd, "w", encoding="utf-8", errors="replace")
+        self._spill.write(self._head + "".join(self._tail))
+
+    @property
+    def spilled(self) -> bool:
+        return self.spill_path is not None
+
+    def render(self) -> str:
+        with self._lock:
+            if self._spill is not None:
+                self._spill.flush()
+            tail = "".join(self._tail)
+            omitted = self.total_chars - len(self._head) - len(tail)
+            if omitted <= 0:
+                return self._head + tail
+            return (f"{self._head}\n... [{omitted} chars omitted; full output in {self.spill_path}] ...\n{tail}")
+
+    def close(self):
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
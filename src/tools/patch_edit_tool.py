@@ -0,0 +1,459 @@
+# tools/patch_edit_tool.py
+
+"""
+Patch-based, transactional code editing.
+
+With FileWriterTool the LLM has to re-emit a whole file to change a few
+lines of it: slow on large classes, and a truncated answer truncates the
+file. PatchEditTool takes, for any number of files in one call:
+
+  * a unified diff (`git diff` format, several files allowed), or
+  * Java edits anchored on the AST: replace, insert or delete a method or
+    constructor of a class, identified by class name, method name and,
+    for overloads, parameter types.
+
+Every change is computed in memory and every edited file validated before
+anything is written: .java files must still parse (javalang; for files
+already using syntax javalang does not know, such as records, they must
+still tokenize with balanced brackets), .xml files must be well formed.
+The batch is then written file by file and rolled back as a whole if any
+write fails, so either all the edits land or none does.
+"""
+import os
+import re
+import threading
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type
+
+import javalang
+from pydantic import BaseModel, Field, PrivateAttr
+from crewai.tools.base_tool import BaseTool
+
+from tools.codebase import codebase_path
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+OPENERS = {"(": ")", "[": "]", "{": "}"}
+
+
+class PatchError(Exception):
+    """An edit that cannot be applied; nothing of the batch is written."""
+
+
+# ────────── Unified diffs ──────────
+@dataclass
+class Hunk:
+    old_start: int
+    lines: List[str] = field(default_factory=list)
+
+    def old(self) -> List[str]:
+        return [line[1:] for line in self.lines if line[:1] in (" ", "-")]
+
+    def new(self) -> List[str]:
+        return [line[1:] for line in self.lines if line[:1] in (" ", "+")]
+
+
+@dataclass
+class FilePatch:
+    old_path: Optional[str]
+    new_path: Optional[str]
+    hunks: List[Hunk] = field(default_factory=list)
+
+
+def _diff_path(header: str) -> Optional[str]:
+    path = header[4:].split("\t")[0].strip()
+    if path == "/dev/null":
+        return None
+    return path[2:] if path[:2] in ("a/", "b/") else path
+
+
+def parse_unified_diff(patch: str) -> List[FilePatch]:
+    files: List[FilePatch] = []
+    lines = patch.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            files.append(FilePatch(_diff_path(line), _diff_path(lines[i + 1])))
+            i += 2
+            continue
+        match = HUNK_HEADER.match(line)
+        if match:
+            if not files:
+                raise PatchError("Hunk without a '--- a/file' / '+++ b/file' header.")
+            hunk = Hunk(old_start=int(match.group(1)))
+            old_count = int(match.group(2)) if match.group(2) is not None else 1
+            new_count = int(match.group(4)) if match.group(4) is not None else 1
+            i += 1
+            # LLMs miscount hunk sizes: read while the lines look like hunk lines, not by the counts alone
+            while i < len(lines) and (old_count > 0 or new_count > 0 or lines[i][:1] in ("+", "-", "\\")):
+                body = lines[i]
+                if body.startswith(("--- ", "@@")) or (body.startswith("+++ ") and old_count <= 0):
+                    break
+                if body.startswith("\\"):
+                    i += 1
+                    continue
+                body = body or " "
+                if body[0] not in " +-":
+                    break
+                hunk.lines.append(body)
+                old_count -= body[0] in " -"
+                new_count -= body[0] in " +"
+                i += 1
+            files[-1].hunks.append(hunk)
+            continue
+        i += 1
+    return files
+
+
+def _find_block(lines: List[str], block: List[str], hint: int, normalize) -> int:
+    """Index where `block` occurs in `lines`, searching outward from `hint`; -1 if absent."""
+    if not block:
+        return min(max(hint, 0), len(lines))
+    wanted = [normalize(b) for b in block]
+    span = len(block)
+    for distance in range(len(lines) + 1):
+        for start in (hint - distance, hint + distance) if distance else (hint,):
+            if 0 <= start <= len(lines) - span and [normalize(l) for l in lines[start:start + span]] == wanted:
+                return start
+    return -1
+
+
+def apply_hunks(text: str, hunks: List[Hunk]) -> str:
+    lines = text.splitlines()
+    trailing_newline = text.endswith("\n") or not text
+    offset = 0
+    for number, hunk in enumerate(hunks, 1):
+        old = hunk.old()
+        hint = max(hunk.old_start - 1, 0) + offset
+        start = _find_block(lines, old, hint, lambda s: s)
+        if start < 0:
+            # tolerate whitespace differences (tabs vs spaces, trailing blanks)
+            start = _find_block(lines, old, hint, lambda s: " ".join(s.split()))
+        if start < 0:
+            preview = "\n".join(old[:5])
+            raise PatchError(f"hunk {number} does not match the file (expected near line {hunk.old_start}):\n{preview}")
+        new = hunk.new()
+        lines[start:start + len(old)] = new
+        # drift between where the hunk said it was and where its end now is, for the next hints
+        offset = start + len(new) - (max(hunk.old_start - 1, 0) + len(old))
+    return "\n".join(lines) + ("\n" if trailing_newline and lines else "")
+
+
+# ────────── AST-anchored Java edits ──────────
+def _offsets(source: str) -> List[int]:
+    starts, total = [], 0
+    for line in source.splitlines(keepends=True):
+        starts.append(total)
+        total += len(line)
+    return starts + [total]
+
+
+def _token_offset(starts: List[int], token) -> int:
+    return starts[token.position.line - 1] + token.position.column - 1
+
+
+def _member_span(source: str, tokens: list, position) -> Tuple[int, int]:
+    """(start, end) offsets of the member declared at `position`, annotations and modifiers included."""
+    starts = _offsets(source)
+    index = next(i for i, t in enumerate(tokens) if t.position == position)
+
+    # back over modifiers and annotations to the end of the previous member (or the class's '{')
+    start, depth = index, 0
+    while start > 0:
+        value = tokens[start - 1].value
+        if value == ")":
+            depth += 1
+        elif value == "(":
+            depth -= 1
+        elif depth == 0 and value in (";", "{", "}"):
+            break
+        start -= 1
+
+    # forward to the body's closing '}' (or the ';' of an abstract method)
+    end, depth = index, 0
+    while end < len(tokens):
+        value = tokens[end].value
+        if value in ("(", "["):
+            depth += 1
+        elif value in (")", "]"):
+            depth -= 1
+        elif depth == 0 and value == ";":
+            break
+        elif depth == 0 and value == "{":
+            braces = 0
+            while end < len(tokens):
+                braces += {"{": 1, "}": -1}.get(tokens[end].value, 0)
+                if braces == 0:
+                    break
+                end += 1
+            break
+        end += 1
+    if end >= len(tokens):
+        raise PatchError("could not find the end of the member")
+
+    begin = _token_offset(starts, tokens[start])
+    line_start = starts[tokens[start].position.line - 1]
+    # take the indentation too, so the replacement can bring its own
+    if not source[line_start:begin].strip():
+        begin = line_start
+    finish = _token_offset(starts, tokens[end]) + len(tokens[end].value)
+    if source[finish:finish + 1] == "\n":
+        finish += 1
+    return begin, finish
+
+
+def _find_type(tree, class_name: str):
+    matches = [node for _, node in tree.filter(javalang.tree.TypeDeclaration) if node.name == class_name]
+    if not matches:
+        raise PatchError(f"class '{class_name}' not found")
+    if len(matches) > 1:
+        raise PatchError(f"more than one type is named '{class_name}'")
+    return matches[0]
+
+
+def _type_name(parameter) -> str:
+    # javalang chains java.util.List through sub_type; the array dimensions stay on the first part
+    parts, node = [], parameter.type
+    while node is not None:
+        parts.append(node.name)
+        node = getattr(node, "sub_type", None)
+    name = ".".join(parts) + "[]" * len(parameter.type.dimensions or [])
+    return name + "..." if parameter.varargs else name
+
+
+def apply_java_edit(source: str, class_name: str, method: Optional[str],
+                    parameters: Optional[List[str]], new_source: str) -> str:
+    try:
+        tree = javalang.parse.parse(source)
+        tokens = list(javalang.tokenizer.tokenize(source))
+    except (javalang.parser.JavaSyntaxError, javalang.tokenizer.LexerError) as e:
+        raise PatchError(f"the file does not parse, use a unified diff instead ({type(e).__name__})")
+    owner = _find_type(tree, class_name)
+    block = new_source.rstrip("\n") + "\n" if new_source.strip() else ""
+
+    if method is None:
+        # insert before the closing brace of the class
+        begin, end = _member_span(source, tokens, owner.position)
+        closing = source.rindex("}", begin, end)
+        line_start = source.rfind("\n", 0, closing) + 1
+        at = line_start if not source[line_start:closing].strip() else closing
+        return source[:at] + block + source[at:]
+
+    members = [m for m in list(owner.methods) + list(getattr(owner, "constructors", []))
+               if m.name == method]
+    if parameters is not None:
+        wanted = [p.replace(" ", "") for p in parameters]
+        members = [m for m in members
+                   if [_type_name(p) for p in m.parameters] == wanted
+                   or [_type_name(p).rsplit(".", 1)[-1] for p in m.parameters] == wanted]
+    if not members:
+        raise PatchError(f"method '{method}' not found in '{class_name}'")
+    if len(members) > 1:
+        signatures = ["(" + ", ".join(_type_name(p) for p in m.parameters) + ")" for m in members]
+        raise PatchError(f"'{method}' is overloaded in '{class_name}'; pass parameters, one of: {signatures}")
+    begin, end = _member_span(source, tokens, members[0].position)
+    if block and not source[:end].endswith("\n"):
+        # the member shares its line with what follows it (`int g() {...} }`): keep them together
+        block = block[:-1]
+    return source[:begin] + block + source[end:]
+
+
+# ────────── Validation ──────────
+def _balanced(source: str) -> Optional[str]:
+    try:
+        tokens = list(javalang.tokenizer.tokenize(source))
+    except (javalang.tokenizer.LexerError, TypeError, ValueError, IndexError) as e:
+        return f"{type(e).__name__}: {e}"
+    stack = []
+    for token in tokens:
+        if token.value in OPENERS:
+            stack.append(token)
+        elif token.value in OPENERS.values():
+            if not stack or OPENERS[stack.pop().value] != token.value:
+                return f"unbalanced '{token.value}' at line {token.position.line}"
+    if stack:
+        return f"'{stack[-1].value}' opened at line {stack[-1].position.line} is never closed"
+    return None
+
+
+def _parses(source: str) -> Optional[str]:
+    try:
+        javalang.parse.parse(source)
+    except (javalang.parser.JavaSyntaxError, javalang.tokenizer.LexerError,
+            TypeError, ValueError, IndexError, StopIteration) as e:
+        at = getattr(getattr(e, "at", None), "position", None)
+        detail = getattr(e, "description", None) or str(e)
+        return f"{type(e).__name__}: {detail}" + (f" (line {at.line})" if at else "")
+    return None
+
+
+def validate(path: str, old: Optional[str], new: str) -> str:
+    """Return how the new content was validated ("parsed", "balanced", "xml", "none"); raise if it is broken."""
+    if path.endswith(".java"):
+        error = _parses(new)
+        if error is None:
+            return "parsed"
+        if old is not None and _parses(old) is None:
+            # the file parsed before the edit: the edit broke it
+            raise PatchError(f"the edited file no longer parses: {error}")
+        # syntax javalang does not know (records, switch expressions, ...): check the structure only
+        error = _balanced(new)
+        if error:
+            raise PatchError(f"the edited file is malformed: {error}")
+        return "balanced"
+    if path.endswith(".xml"):
+        try:
+            ET.fromstring(new)
+        except ET.ParseError as e:
+            raise PatchError(f"the edited file is not well-formed XML: {e}")
+        return "xml"
+    return "none"
+
+
+class JavaMemberEdit(BaseModel):
+    path: str = Field(..., description="Java file to edit")
+    class_name: str = Field(..., description="Simple name of the class, interface or enum")
+    method: Optional[str] = Field(
+        None, description="Method or constructor to replace or delete; omit to insert new_source into the class"
+    )
+    parameters: Optional[List[str]] = Field(
+        None, description="Parameter types of the method, to pick an overload, e.g. [\"String\", \"int\"]"
+    )
+    new_source: str = Field(
+        "", description="Full source of the new method with its annotations (a javadoc above it is kept); empty to delete it"
+    )
+
+
+class PatchEditInput(BaseModel):
+    patch: Optional[str] = Field(
+        None, description="Unified diff (git diff format), one or more files; /dev/null creates or deletes a file"
+    )
+    edits: Optional[List[JavaMemberEdit]] = Field(
+        None, description="Java method edits anchored on class and method names"
+    )
+
+
+class PatchEditTool(BaseTool):
+    name: str = "patch-edit"
+    description: str = (
+        "Edit files with a unified diff or by replacing, inserting or deleting whole Java methods, "
+        "instead of rewriting files. Several files per call; edited files are checked to still parse "
+        "and the batch is applied all or nothing."
+    )
+    args_schema: Type[PatchEditInput] = PatchEditInput
+
+    _base_path: Path = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, base_path: Optional[str] = None):
+        super().__init__()
+        self._base_path = codebase_path(base_path)
+
+    def _resolve(self, path: str) -> Path:
+        resolved = (self._base_path / path).resolve()
+        if resolved != self._base_path and self._base_path not in resolved.parents:
+            raise PatchError(f"'{path}' is outside of {self._base_path}")
+        return resolved
+
+    @staticmethod
+    def _read(path: Path) -> Optional[str]:
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def _plan(self, patch: Optional[str], edits: List[JavaMemberEdit]) -> Tuple[Dict[Path, Optional[str]], Dict[Path, Optional[str]], Dict[Path, List[str]]]:
+        """Compute the new content of every touched file: (originals, results, change notes)."""
+        originals: Dict[Path, Optional[str]] = {}
+        current: Dict[Path, Optional[str]] = {}
+        notes: Dict[Path, List[str]] = {}
+
+        def load(relative: str) -> Path:
+            path = self._resolve(relative)
+            if path not in current:
+                originals[path] = current[path] = self._read(path)
+            return path
+
+        for file_patch in parse_unified_diff(patch) if patch else []:
+            relative = file_patch.new_path or file_patch.old_path
+            if relative is None:
+                raise PatchError("a diff entry has /dev/null on both sides")
+            path = load(relative)
+            try:
+                if file_patch.new_path is None:
+                    current[path] = None
+                    notes.setdefault(path, []).append("deleted")
+                    continue
+                if file_patch.old_path is None:
+                    if current[path] is not None:
+                        raise PatchError("the diff creates it but it already exists")
+                    current[path] = ""
+                if current[path] is None:
+                    raise PatchError("file not found")
+                current[path] = apply_hunks(current[path], file_patch.hunks)
+                notes.setdefault(path, []).append(f"{len(file_patch.hunks)} hunks")
+            except PatchError as e:
+                raise PatchError(f"{relative}: {e}")
+
+        for edit in edits:
+            path = load(edit.path)
+            try:
+                if current[path] is None:
+                    raise PatchError("file not found")
+                current[path] = apply_java_edit(current[path], edit.class_name, edit.method,
+                                                edit.parameters, edit.new_source)
+            except PatchError as e:
+                raise PatchError(f"{edit.path}: {e}")
+            action = "inserted" if edit.method is None else ("replaced" if edit.new_source.strip() else "deleted")
+            notes.setdefault(path, []).append(f"{action} {edit.class_name}.{edit.method or '<member>'}")
+        return originals, current, notes
+
+    def _write(self, path: Path, content: Optional[str]):
+        if content is None:
+            path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.patch-tmp")
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _run(self, patch: Optional[str] = None, edits: Optional[List[JavaMemberEdit]] = None) -> dict:
+        if not patch and not edits:
+            return {"ok": False, "errors": ["Pass a unified diff in 'patch' or method edits in 'edits'."]}
+        edits = [JavaMemberEdit.model_validate(e) for e in edits or []]
+        relative = lambda p: os.path.relpath(p, self._base_path)
+
+        with self._lock:
+            try:
+                originals, updated, notes = self._plan(patch, edits)
+            except PatchError as e:
+                return {"ok": False, "errors": [str(e)], "message": "Nothing was written."}
+
+            errors, checks = [], {}
+            for path, content in updated.items():
+                if content is None or content == originals[path]:
+                    continue
+                try:
+                    checks[path] = validate(str(path), originals[path], content)
+                except PatchError as e:
+                    errors.append(f"{relative(path)}: {e}")
+            if errors:
+                return {"ok": False, "errors": errors, "message": "Nothing was written."}
+
+            written: List[Path] = []
+            try:
+                for path, content in updated.items():
+                    if content != originals[path]:
+                        self._write(path, content)
+                        written.append(path)
+            except OSError as e:
+                for path in written:
+                    self._write(path, originals[path])
+                return {"ok": False, "errors": [f"{type(e).__name__}: {e}"],
+                        "message": "The edits were rolled back."}
+
+        return {
+            "ok": True,
+            "files": [{"path": relative(p), "changes": notes.get(p, []),
+                       "validated": checks.get(p, "deleted" if updated[p] is None else "unchanged")}
+                      for p in updated],
+        }
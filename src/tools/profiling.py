@@ -0,0 +1,383 @@
+# tools/profiling.py
+
+"""
+Opt-in profiling of the tools and crew phases.
+
+When a run is slow, the counters of the other stats files (routing,
+commands, prompt cache) say which calls were slow but not where the time
+of a tool call went: javalang parsing, regex scanning, a subprocess or an
+LLM wait. With REFORGE_PROFILE set (or --profile on the entry points):
+
+  sample    a background thread samples the Python stacks of the threads
+            that are inside a tool call or a crew phase, every
+            REFORGE_PROFILE_INTERVAL_MS (default 5) milliseconds;
+  cprofile  the same, plus deterministic profiling (cProfile) of those
+            threads, for exact call counts and time in C functions
+            (compiled regexes, json, ...), which sampling cannot see.
+
+Every tool's _run (wrapped by registry.tool_class) and every phase
+
+    with profiled("phase:static_analysis"):
+        findings = ...
+
+is a span: its wall time, CPU time of the calling thread, CPU time of the
+subprocesses it reaped and RSS growth are counted per label. Crew tasks
+are spans too ("task:<name>", from crewai's events). The entry points run
+inside profile_run(dir), which writes:
+
+  profile.collapsed  collapsed stacks ("span;frame;...;frame count"), the
+                     input of flamegraph.pl, speedscope or inferno;
+  profile_top.txt    the top REFORGE_PROFILE_TOP (default 30) functions by
+                     own and by total samples, and the share of samples in
+                     javalang, regex, subprocess and LLM code;
+  profile_calls.json the counters per span label;
+  profile.pstats     (cprofile) the deterministic profile, for pstats/snakeviz.
+
+Without REFORGE_PROFILE nothing is wrapped and profiled() is a no-op.
+"""
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import resource
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+MODES = {"1": "sample", "true": "sample", "sample": "sample", "cprofile": "cprofile", "deterministic": "cprofile"}
+# where a sample's time went: the innermost frame whose file matches
+CATEGORIES = [
+    ("javalang", ("/javalang/",)),
+    ("regex", ("/re/", "/sre_", "/re.py")),
+    ("subprocess", ("/subprocess.py", "subprocess_runner.py", "/selectors.py")),
+    ("llm", ("/litellm/", "/openai/", "/httpx/", "/httpcore/", "/ssl.py",
+             "llm/client.py", "llm/scheduler.py", "llm/mock_provider.py")),
+]
+
+
+def profiling_mode() -> Optional[str]:
+    """"sample", "cprofile" or None (profiling off), from REFORGE_PROFILE."""
+    return MODES.get(os.getenv("REFORGE_PROFILE", "").strip().lower())
+
+
+def _rss_mb() -> float:
+    """Current resident set size; the peak where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _children_cpu_s() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+# ────────── Counters ──────────
+class ProfileStats:
+    """Per span label: calls, wall and CPU time, CPU of reaped subprocesses, RSS growth."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._durations: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=2000))
+
+    def record(self, label: str, wall_s: float, cpu_s: float, children_cpu_s: float, rss_delta_mb: float):
+        with self._lock:
+            row = self._rows.setdefault(label, {
+                "label": label, "calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "children_cpu_s": 0.0,
+                "max_rss_delta_mb": 0.0,
+            })
+            row["calls"] += 1
+            row["wall_s"] += wall_s
+            row["cpu_s"] += cpu_s
+            # process-wide: subprocesses reaped by concurrent calls are counted too
+            row["children_cpu_s"] += children_cpu_s
+            row["max_rss_delta_mb"] = max(row["max_rss_delta_mb"], rss_delta_mb)
+            self._durations[label].append(wall_s)
+
+    def reset(self):
+        with self._lock:
+            self._rows.clear()
+            self._durations.clear()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = []
+            for label, row in self._rows.items():
+                ordered = sorted(self._durations[label])
+                rows.append({
+                    **row,
+                    **{k: round(row[k], 3) for k in ("wall_s", "cpu_s", "children_cpu_s", "max_rss_delta_mb")},
+                    # wall time the calling thread spent off the CPU: subprocesses, LLM and I/O waits
+                    "wait_s": round(max(row["wall_s"] - row["cpu_s"], 0.0), 3),
+                    "p50_s": round(statistics.median(ordered), 3) if ordered else None,
+                    "max_s": round(ordered[-1], 3) if ordered else None,
+                })
+        rows.sort(key=lambda r: r["wall_s"], reverse=True)
+        return {"spans": rows, "rss_mb": round(_rss_mb(), 1)}
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+_stats = ProfileStats()
+
+
+def profile_stats() -> ProfileStats:
+    return _stats
+
+
+# ────────── Sampler ──────────
+class _Session:
+    """Stack samples (and with cprofile, the deterministic profile) of one profile_run()."""
+
+    def __init__(self, mode: str, interval_s: float):
+        self.mode = mode
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.samples = 0
+        self.pstats: Optional[pstats.Stats] = None
+        self._names: Dict[Any, Tuple[str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="reforge-profiler", daemon=True)
+        self.started = time.perf_counter()
+
+    def _describe(self, code) -> Tuple[str, Optional[str]]:
+        described = self._names.get(code)
+        if described is None:
+            path = code.co_filename.replace(os.sep, "/")
+            parts = path.rsplit("/", 2)
+            short = "/".join(parts[-2:]) if parts[-1] == "__init__.py" else parts[-1]
+            category = next((name for name, needles in CATEGORIES if any(n in path for n in needles)), None)
+            described = self._names[code] = (f"{short}:{getattr(code, 'co_qualname', code.co_name)}", category)
+        return described
+
+    def _sample(self):
+        frames = sys._current_frames()
+        for ident, labels in list(_active.items()):
+            frame = frames.get(ident)
+            if frame is None or not labels:
+                continue
+            names: List[str] = []
+            category = None
+            while frame is not None:
+                name, frame_category = self._describe(frame.f_code)
+                names.append(name)
+                category = category or frame_category
+                frame = frame.f_back
+            self.stacks[";".join(list(labels) + names[::-1])] += 1
+            self.categories[category or "other"] += 1
+            self.samples += 1
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def add_profile(self, profile: cProfile.Profile):
+        with self._lock:
+            if self.pstats is None:
+                self.pstats = pstats.Stats(profile)
+            else:
+                self.pstats.add(profile)
+
+    # ────────── Output ──────────
+    def top(self, n: int) -> str:
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        share = lambda count: f"{count / self.samples:6.1%}" if self.samples else "     -"
+        lines = [f"{self.samples} samples every {self.interval_s * 1000:.0f} ms, "
+                 f"{time.perf_counter() - self.started:.1f}s profiled", "", "where the samples went:"]
+        lines += [f"  {share(count)}  {category}" for category, count in self.categories.most_common()]
+        for title, counter in (("own samples", own), ("total samples (including callees)", total)):
+            lines += ["", f"top {n} by {title}:"]
+            lines += [f"  {share(count)}  {count:>7}  {name}" for name, count in counter.most_common(n)]
+        if self.pstats is not None:
+            out = io.StringIO()
+            self.pstats.stream = out
+            self.pstats.sort_stats("tottime").print_stats(n)
+            lines += ["", f"top {n} by own time (cProfile):", out.getvalue()]
+        return "\n".join(lines) + "\n"
+
+    def write(self, out_dir: str, n: int):
+        os.makedirs(out_dir, exist_ok=True)
+        with open(os.path.join(out_dir, "profile.collapsed"), "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+        with open(os.path.join(out_dir, "profile_top.txt"), "w") as f:
+            f.write(self.top(n))
+        if self.pstats is not None:
+            self.pstats.dump_stats(os.path.join(out_dir, "profile.pstats"))
+
+
+_session: Optional[_Session] = None
+_session_lock = threading.Lock()
+# thread ident -> labels of the spans it is inside, outermost first (read by the sampler)
+_active: Dict[int, Tuple[str, ...]] = {}
+_local = threading.local()
+
+
+# ────────── Spans ──────────
+def _spans() -> List[Dict[str, Any]]:
+    if not hasattr(_local, "spans"):
+        _local.spans = []
+    return _local.spans
+
+
+def _enter(label: str) -> Dict[str, Any]:
+    spans = _spans()
+    span = {"label": label, "wall": time.perf_counter(), "cpu": time.thread_time(),
+            "children": _children_cpu_s(), "rss": _rss_mb(), "profile": None}
+    session = _session
+    # one deterministic profiler per thread, on its outermost span
+    if session is not None and session.mode == "cprofile" and not any(s["profile"] for s in spans):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+            span["profile"] = profile
+        except ValueError:
+            # Python 3.12+: one cProfile for the whole process (sys.monitoring), already taken
+            pass
+    spans.append(span)
+    _active[threading.get_ident()] = tuple(s["label"] for s in spans)
+    return span
+
+
+def _exit(span: Dict[str, Any]):
+    spans = _spans()
+    if span in spans:
+        del spans[spans.index(span):]
+    ident = threading.get_ident()
+    if spans:
+        _active[ident] = tuple(s["label"] for s in spans)
+    else:
+        _active.pop(ident, None)
+    if span["profile"] is not None:
+        span["profile"].disable()
+        session = _session
+        if session is not None:
+            session.add_profile(span["profile"])
+    _stats.record(span["label"], time.perf_counter() - span["wall"], time.thread_time() - span["cpu"],
+                  _children_cpu_s() - span["children"], _rss_mb() - span["rss"])
+
+
+@contextlib.contextmanager
+def profiled(label: str) -> Iterator[None]:
+    """Count (and, inside a profile_run, sample) the block as the span `label`; a no-op with profiling off."""
+    if profiling_mode() is None:
+        yield
+        return
+    span = _enter(label)
+    try:
+        yield
+    finally:
+        _exit(span)
+
+
+_patched: Set[type] = set()
+_patched_lock = threading.Lock()
+
+
+def profile_tool(name: str, cls: Callable) -> Callable:
+    """With profiling on, make every _run of the tool class `cls` the span "tool:<name>"; return cls."""
+    if profiling_mode() is None or not isinstance(cls, type) or not hasattr(cls, "_run"):
+        return cls
+    with _patched_lock:
+        if cls in _patched:
+            return cls
+        original = cls._run
+
+        @functools.wraps(original)
+        def _run(self, *args, **kwargs):
+            with profiled(f"tool:{name}"):
+                return original(self, *args, **kwargs)
+
+        cls._run = _run
+        _patched.add(cls)
+    return cls
+
+
+@lru_cache(maxsize=None)
+def _track_tasks():
+    """Make every crew task a span, from crewai's agent execution events (handlers run in the agent's thread)."""
+    from crewai.utilities.events import crewai_event_bus
+    from crewai.utilities.events.agent_events import (
+        AgentExecutionCompletedEvent, AgentExecutionErrorEvent, AgentExecutionStartedEvent,
+    )
+
+    def _task_spans() -> List[Tuple[Any, Dict[str, Any]]]:
+        if not hasattr(_local, "tasks"):
+            _local.tasks = []
+        return _local.tasks
+
+    @crewai_event_bus.on(AgentExecutionStartedEvent)
+    def _started(source, event):
+        if _session is not None:
+            name = getattr(event.task, "name", None) or "delegated"
+            _task_spans().append((event.task, _enter(f"task:{name}")))
+
+    def _finished(source, event):
+        tasks = _task_spans()
+        if tasks and tasks[-1][0] is event.task:
+            _exit(tasks.pop()[1])
+
+    crewai_event_bus.on(AgentExecutionCompletedEvent)(_finished)
+    crewai_event_bus.on(AgentExecutionErrorEvent)(_finished)
+
+
+@contextlib.contextmanager
+def profile_run(out_dir: str) -> Iterator[None]:
+    """Sample the spans of the block and write the profile files to `out_dir`; a no-op with profiling off.
+
+    A run started while another one is active (concurrent jobs of the server) is part of the outer one.
+    """
+    global _session
+    mode = profiling_mode()
+    with _session_lock:
+        owner = mode is not None and _session is None
+        if owner:
+            interval_s = float(os.getenv("REFORGE_PROFILE_INTERVAL_MS", "5")) / 1000
+            _session = _Session(mode, interval_s)
+            _stats.reset()
+    if not owner:
+        yield
+        return
+    session = _session
+    _track_tasks()
+    session.start()
+    span = _enter("run")
+    try:
+        yield
+    finally:
+        _exit(span)
+        session.stop()
+        with _session_lock:
+            _session = None
+        session.write(out_dir, int(os.getenv("REFORGE_PROFILE_TOP", "30")))
+        _stats.save(os.path.join(out_dir, "profile_calls.json"))
+        print(f"profile: {session.samples} samples, written to {out_dir}")
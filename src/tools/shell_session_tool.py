@@ -0,0 +1,239 @@
+# tools/shell_session_tool.py
+
+"""
+Persistent shell for an agent.
+
+Unlike LangChain's ShellTool (one new process per call, all output kept in
+memory, no timeout), PersistentShellTool keeps one bash process alive for
+the life of the tool, so `cd`, `export` and shell variables carry over
+from one call to the next. Give each agent its own instance.
+
+Every command runs with a timeout. Its output is streamed into an
+OutputBuffer (head and tail in memory, the rest spilled to a file), so a
+chatty `mvn` or `grep -r` cannot flood the agent's context.
+
+Each command runs as a shell function, so a timeout can abort all of it:
+the shell gets SIGUSR1, whose trap returns from the function, and the
+command's process groups are terminated (the session runs with job
+control, so each child is its own group). The command reports exit status
+124 and the shell keeps its state. If the shell itself stops answering it
+is replaced by a fresh one started in the last known working directory;
+exported variables are lost.
+"""
+import atexit
+import codecs
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field, PrivateAttr
+from crewai.tools.base_tool import BaseTool
+
+from tools.output_buffer import OutputBuffer
+
+# seconds to wait for the shell after terminating, then killing, a timed-out command
+KILL_GRACE_S = 5
+# exit status reported for a command aborted on timeout, as timeout(1) does
+TIMEOUT_STATUS = 124
+
+
+class ShellSession:
+    """One long-lived bash process; run() executes a command in it and waits for a sentinel line."""
+
+    def __init__(self, cwd: Optional[str] = None, shell: str = "bash"):
+        self.shell = shell
+        self.cwd = str(Path(cwd or os.getcwd()).resolve())
+        self._marker = f"__REFORGE_DONE_{uuid.uuid4().hex}__"
+        self._function = f"__reforge_command_{uuid.uuid4().hex}"
+        self._proc: Optional[subprocess.Popen] = None
+        self._chunks: "queue.Queue[Optional[bytes]]" = queue.Queue()
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    # ────────── Process ──────────
+    def _start(self):
+        env = {**os.environ, "PAGER": "cat", "GIT_PAGER": "cat", "TERM": "dumb"}
+        # own session, so the shell and everything it starts can be killed as a group
+        self._proc = subprocess.Popen(
+            [self.shell, "--noprofile", "--norc"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            cwd=self.cwd, env=env, start_new_session=True, bufsize=0,
+        )
+        self._chunks = queue.Queue()
+        threading.Thread(target=self._read, args=(self._proc, self._chunks), daemon=True).start()
+        # job control: every command gets its own process group, which a timeout can kill.
+        # SIGUSR1 aborts the running command function (see run()); the flag and the inherited
+        # DEBUG trap (-T) also unwind any functions the command called
+        self._proc.stdin.write(
+            f"set -mT\n"
+            f"trap '__reforge_abort=1; return {TIMEOUT_STATUS} 2>/dev/null' USR1\n"
+            f"trap '[[ -n $__reforge_abort ]] && return {TIMEOUT_STATUS} 2>/dev/null' DEBUG\n".encode())
+
+    @staticmethod
+    def _read(proc: subprocess.Popen, chunks: "queue.Queue[Optional[bytes]]"):
+        fd = proc.stdout.fileno()
+        while True:
+            try:
+                chunk = os.read(fd, 65536)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                chunks.put(None)
+                return
+            chunks.put(chunk)
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def close(self):
+        if self._proc is not None:
+            try:
+                os.killpg(self._proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            self._proc.wait()
+            self._proc = None
+
+    def _signal_commands(self, sig: int):
+        """Send `sig` to the process groups of the shell's children (the running command)."""
+        children = subprocess.run(["pgrep", "-P", str(self._proc.pid)], capture_output=True, text=True)
+        groups = set()
+        for pid in children.stdout.split():
+            try:
+                groups.add(os.getpgid(int(pid)))
+            except ProcessLookupError:
+                continue
+        groups.discard(os.getpgid(self._proc.pid))
+        for group in groups:
+            try:
+                os.killpg(group, sig)
+            except ProcessLookupError:
+                continue
+
+    # ────────── Commands ──────────
+    def run(self, command: str, timeout: float, output: OutputBuffer) -> Tuple[Optional[int], bool, bool]:
+        """Run `command`; return (exit code or None, timed out, session restarted)."""
+        with self._lock:
+            if not self.alive():
+                self._start()
+            # a function keeps cd/export in this shell and can be aborted as a whole by the
+            # USR1 trap; stdin is closed so nothing waits for input
+            script = (f"{self._function}() {{ {command}\n}}\n"
+                      f"{self._function} < /dev/null 2>&1\n"
+                      f"__reforge_status=$?; unset __reforge_abort\n"
+                      f"printf '\\n{self._marker} %s %s\\n' \"$__reforge_status\" \"$PWD\"\n")
+            try:
+                self._proc.stdin.write(script.encode())
+            except BrokenPipeError:
+                self._start()
+                self._proc.stdin.write(script.encode())
+
+            status = self._collect(output, time.monotonic() + timeout)
+            if status is not None:
+                return status, False, False
+            for sig in (signal.SIGTERM, signal.SIGKILL):
+                # the trap only runs once the current child is gone, so signal the shell first
+                os.kill(self._proc.pid, signal.SIGUSR1)
+                self._signal_commands(sig)
+                status = self._collect(output, time.monotonic() + KILL_GRACE_S)
+                if status is not None:
+                    return status, True, False
+            # the shell itself is stuck (e.g. an unterminated quote): start over where it was
+            self.close()
+            return None, True, True
+
+    def _collect(self, output: OutputBuffer, deadline: float) -> Optional[int]:
+        """Stream output until the sentinel line (returns the exit code) or the deadline (returns None)."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        sentinel = f"\n{self._marker} "
+        pending = ""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                output.write(pending)
+                return None
+            try:
+                chunk = self._chunks.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                # the shell exited (e.g. the command ran `exit`)
+                output.write(pending + decoder.decode(b"", final=True))
+                self._proc.wait()
+                return self._proc.returncode
+            pending += decoder.decode(chunk)
+            found = pending.find(sentinel)
+            if found >= 0:
+                end = pending.find("\n", found + len(sentinel))
+                if end < 0:
+                    continue
+                output.write(pending[:found])
+                status, _, cwd = pending[found + len(sentinel):end].partition(" ")
+                self.cwd = cwd or self.cwd
+                return int(status)
+            # hold back what could be the start of a sentinel split across chunks
+            keep = len(sentinel) + 1
+            output.write(pending[:-keep])
+            pending = pending[-keep:]
+
+
+class PersistentShellInput(BaseModel):
+    commands: List[str] = Field(..., description="Shell commands to run one after the other in the same shell.")
+    timeout: Optional[int] = Field(None, description="Timeout in seconds for each command.")
+
+
+class PersistentShellTool(BaseTool):
+    name: str = "shell"
+    description: str = (
+        "Run shell commands in a persistent bash session: the working directory and exported variables "
+        "carry over between calls. Each command has a timeout and long output is truncated to its head "
+        "and tail, with the full output saved to a file."
+    )
+    args_schema: Type[PersistentShellInput] = PersistentShellInput
+
+    _session: ShellSession = PrivateAttr()
+    _timeout: int = PrivateAttr()
+    _head_chars: int = PrivateAttr()
+    _tail_chars: int = PrivateAttr()
+
+    def __init__(self, base_path: Optional[str] = None, timeout: Optional[int] = None,
+                 head_chars: int = 2000, tail_chars: int = 6000):
+        super().__init__()
+        self._session = ShellSession(cwd=base_path)
+        self._timeout = timeout or int(os.getenv("REFORGE_SHELL_TIMEOUT", "300"))
+        self._head_chars = head_chars
+        self._tail_chars = tail_chars
+
+    def _run(self, commands: List[str], timeout: Optional[int] = None) -> dict:
+        results = []
+        for command in commands:
+            output = OutputBuffer(self._head_chars, self._tail_chars)
+            start = time.perf_counter()
+            exit_code, timed_out, restarted = self._session.run(command, timeout or self._timeout, output)
+            output.close()
+            result = {
+                "command": command,
+                "exit_code": exit_code,
+                "output": output.render(),
+                "cwd": self._session.cwd,
+                "elapsed_s": round(time.perf_counter() - start, 2),
+            }
+            if output.spilled:
+                result["full_output"] = output.spill_path
+            if timed_out:
+                result["timed_out"] = True
+            if restarted:
+                result["message"] = "ℹ️  The shell stopped responding and was restarted; exported variables were reset."
+            results.append(result)
+            if timed_out or exit_code != 0:
+                # like `set -e`: the next commands probably depend on this one
+                break
+        return {"ok": all(r["exit_code"] == 0 and not r.get("timed_out") for r in results)
+                      and len(results) == len(commands),
+                "results": results}
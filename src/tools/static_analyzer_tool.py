@@ -1,15 +1,183 @@
-from typing import Type
-from pydantic import BaseModel, Field
-from crewai.tools import BaseTool
+# tools/static_analyzer_tool.py
+
+"""
+Rule-based static analysis of a Java codebase for Java 10 -> 21 migration
+hazards: javax -> jakarta moves, APIs removed from the JDK, internal sun.*
+APIs, finalizers, the Security Manager, deprecated-for-removal calls.
+
+The rules live in rules/java21_migration.yaml and are applied by
+java_rules.py. Results are cached per file (mtime/size, then content hash)
+together with the digest of the rule catalogue, so a second run only
+re-analyzes the files that changed. When many files changed they are
+analyzed in batches on a process pool.
+
+The findings are compact (rule, file, line); findings_report() turns them
+into the short text the documentation crew passes to the impact analysis.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional, Type
+
+from pydantic import BaseModel, Field, PrivateAttr
+from crewai.tools.base_tool import BaseTool
+
+from tools.codebase import codebase_path
+from tools.java_rules import Rule, analyze_files, load_rules, rules_digest
+from tools.java_source_index import stamps
+
+MAX_FINDINGS = 200
+MAX_ERRORS = 20
+# below this many files to analyze, starting worker processes costs more than it saves
+PARALLEL_THRESHOLD = 64
+BATCH_SIZE = 32
+SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+
+def findings_report(result: Dict, max_files_per_rule: int = 15) -> str:
+    """Plain-text digest of StaticAnalyzerTool.analyze(), one block per rule, most severe first."""
+    if not result.get("total_findings"):
+        return f"No migration hazard found by static analysis ({result.get('files', 0)} files)."
+    by_rule: Dict[str, Dict[str, List[int]]] = {}
+    for finding in result["findings"]:
+        by_rule.setdefault(finding["rule"], {}).setdefault(finding["file"], []).append(finding["line"])
+
+    rules = result["rules"]
+    ordered = sorted(by_rule, key=lambda r: (SEVERITY_ORDER.get(rules[r]["severity"], 9), -rules[r]["count"], r))
+    lines = [f"{result['total_findings']} findings in {result['files_with_findings']} of {result['files']} files."]
+    for rule_id in ordered:
+        rule = rules[rule_id]
+        lines.append(f"[{rule['severity']}] {rule_id} ({rule['count']}): {rule['message']}")
+        files = sorted(by_rule[rule_id].items())
+        for path, numbers in files[:max_files_per_rule]:
+            lines.append(f"  {path}:{','.join(str(n) for n in sorted(numbers))}")
+        if len(files) > max_files_per_rule:
+            lines.append(f"  ... and {len(files) - max_files_per_rule} more files")
+    if result.get("parse_errors"):
+        lines.append(f"{len(result['parse_errors'])} files could not be parsed; only their imports were checked.")
+    return "\n".join(lines)
+
 
 class StaticAnalyzerInput(BaseModel):
-    code_path: str = Field(..., description="Path to project root for static analysis.")
+    code_path: Optional[str] = Field(
+        None, description="Path to project root for static analysis (defaults to the codebase under analysis)."
+    )
+
 
 class StaticAnalyzerTool(BaseTool):
     name: str = "StaticAnalyzerTool"
-    description: str = "Runs static analysis (e.g., SonarQube, PMD) on migrated code."
-    args_schema: Type[BaseModel] = StaticAnalyzerInput
+    description: str = (
+        "Scan the Java sources for Java 10 -> 21 and Jakarta EE migration hazards (removed APIs, "
+        "javax -> jakarta moves, sun.* internals, finalizers, SecurityManager, deprecated-for-removal calls) "
+        "and return the findings as rule, file and line."
+    )
+    args_schema: Type[StaticAnalyzerInput] = StaticAnalyzerInput
+
+    _code_path: Optional[str] = PrivateAttr()
+    _rules: List[Rule] = PrivateAttr()
+    _rules_digest: str = PrivateAttr()
+    _workers: int = PrivateAttr()
+
+    def __init__(self, code_path: Optional[str] = None, rules_path: Optional[str] = None,
+                 workers: Optional[int] = None):
+        super().__init__()
+        # resolved per call, falling back to CODE_PATH (see tools/codebase.py)
+        self._code_path = code_path
+        self._rules = load_rules(rules_path)
+        self._rules_digest = rules_digest(self._rules)
+        self._workers = workers or os.cpu_count() or 1
+
+    # ────────── Cache ──────────
+    def _cache_file(self, root: Path) -> Path:
+        # outside the project, like the test-runner cache
+        key = hashlib.sha256(str(root).encode()).hexdigest()[:16]
+        return Path(tempfile.gettempdir()) / "reforge-static-analysis" / f"{key}.json"
+
+    def _load_cache(self, cache_file: Path) -> Dict[str, Dict]:
+        try:
+            cache = json.loads(cache_file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return cache.get("files", {}) if cache.get("rules") == self._rules_digest else {}
+
+    def _save_cache(self, cache_file: Path, files: Dict[str, Dict]):
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"rules": self._rules_digest, "files": files}))
+        os.replace(tmp, cache_file)
+
+    # ────────── Analysis ──────────
+    def _analyze(self, paths: List[str]) -> Dict[str, Dict]:
+        if len(paths) < PARALLEL_THRESHOLD or self._workers < 2:
+            return analyze_files(paths, self._rules)
+        batches = [paths[i:i + BATCH_SIZE] for i in range(0, len(paths), BATCH_SIZE)]
+        results: Dict[str, Dict] = {}
+        # spawn: forking a process that runs crewai threads is unsafe
+        with ProcessPoolExecutor(max_workers=min(self._workers, len(batches)),
+                                 mp_context=get_context("spawn")) as pool:
+            for batch in pool.map(analyze_files, batches, [self._rules] * len(batches)):
+                results.update(batch)
+        return results
+
+    def analyze(self, code_path: Optional[str] = None) -> dict:
+        """Analyze the project (only files changed since the cached run) and return every finding."""
+        root = codebase_path(code_path or self._code_path)
+        if not root.is_dir():
+            raise FileNotFoundError(f"📁 Directory '{root}' not found.")
+        start = time.perf_counter()
+
+        cache_file = self._cache_file(root)
+        cached = self._load_cache(cache_file)
+        current = stamps(str(root))
+        files: Dict[str, Dict] = {}
+        to_analyze: List[str] = []
+        digests: Dict[str, str] = {}
+        for path, stamp in current.items():
+            entry = cached.get(path)
+            if entry is not None and tuple(entry["stamp"]) == stamp:
+                files[path] = entry
+                continue
+            # touched but identical (checkout, formatter no-op): keep the findings, refresh the stamp
+            digests[path] = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+            if entry is not None and entry["sha"] == digests[path]:
+                files[path] = {**entry, "stamp": list(stamp)}
+            else:
+                to_analyze.append(path)
+
+        for path, result in self._analyze(to_analyze).items():
+            files[path] = {"stamp": list(current[path]), "sha": digests[path], **result}
+        if to_analyze or len(files) != len(cached) or digests:
+            self._save_cache(cache_file, files)
+
+        relative = lambda p: os.path.relpath(p, root)
+        findings = [{"rule": rule_id, "file": relative(path), "line": line}
+                    for path in sorted(files) for rule_id, line in files[path]["findings"]]
+        counts: Dict[str, int] = {}
+        for finding in findings:
+            counts[finding["rule"]] = counts.get(finding["rule"], 0) + 1
+        rules = {r.id: {"severity": r.severity, "message": r.message, "count": counts[r.id]}
+                 for r in self._rules if r.id in counts}
+        errors = [{"file": relative(p), "error": files[p]["error"]} for p in sorted(files) if files[p]["error"]]
+        return {
+            "files": len(files),
+            "analyzed": len(to_analyze),
+            "cached": len(files) - len(to_analyze),
+            "total_findings": len(findings),
+            "files_with_findings": len({f["file"] for f in findings}),
+            "rules": rules,
+            "findings": findings,
+            "parse_errors": errors[:MAX_ERRORS],
+            "elapsed_s": round(time.perf_counter() - start, 3),
+        }
 
-    def _run(self, code_path: str) -> dict:
-        # TODO: Invoke analyzer, parse and return findings
-        return {}  # stub: empty findings
+    def _run(self, code_path: Optional[str] = None) -> dict:
+        result = self.analyze(code_path)
+        if len(result["findings"]) > MAX_FINDINGS:
+            result["findings"] = result["findings"][:MAX_FINDINGS]
+            result["truncated"] = True
+        return result
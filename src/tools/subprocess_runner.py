@@ -0,0 +1,257 @@
+# tools/subprocess_runner.py
+
+"""
+Shared runner for the external commands of the tools (mvn, gradle, jdeps,
+git, the SQL helper jar).
+
+subprocess.run(..., capture_output=True, text=True) keeps the whole decoded
+output of a command in memory and waits for it forever; one verbose
+multi-module Maven build was enough to push a worker to several GB. Here
+stdout and stderr are read as they are produced, each into an OutputBuffer
+(head and tail in memory, the whole stream spilled to a file once it
+outgrows them, see tools/output_buffer.py):
+
+    result = run_command(["mvn", "-f", pom, "clean", "compile"], timeout=1800)
+    result.returncode, result.stdout, result.stdout_path, result.duration_s
+
+A command that outlives its timeout (default REFORGE_COMMAND_TIMEOUT
+seconds), or whose cancel event is set, is terminated with its whole
+process group (SIGTERM, then SIGKILL); the result says so. A cancel event
+can be passed per call or set for every command of a block:
+
+    with cancel_commands(job.cancel_event):
+        ...
+
+Consumers that need every line (e.g. jdeps issue parsing) get them one at
+a time through `on_line`, so nothing has to hold the full output. Every run
+is timed in command_stats(), and in the collector of the block's
+collect_command_stats() if there is one.
+"""
+import codecs
+import contextlib
+import contextvars
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TextIO
+
+from tools.output_buffer import OutputBuffer
+
+DEFAULT_TIMEOUT_S = float(os.getenv("REFORGE_COMMAND_TIMEOUT", "1800"))
+# seconds to wait after SIGTERM before SIGKILL, and for the pipes to close after exit
+KILL_GRACE_S = 5
+POLL_S = 0.1
+
+_cancel: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar("command_cancel", default=None)
+
+
+@contextlib.contextmanager
+def cancel_commands(event: threading.Event) -> Iterator[None]:
+    """Terminate the commands run inside the block (in this thread) as soon as `event` is set."""
+    token = _cancel.set(event)
+    try:
+        yield
+    finally:
+        _cancel.reset(token)
+
+
+@dataclass
+class CommandResult:
+    args: List[str]
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    duration_s: float
+    timed_out: bool = False
+    cancelled: bool = False
+    stdout_chars: int = 0
+    stderr_chars: int = 0
+    stdout_path: Optional[str] = None
+    stderr_path: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out and not self.cancelled
+
+    def failure(self) -> str:
+        """Why the command did not succeed, for an error message."""
+        if self.timed_out:
+            return f"timed out after {self.duration_s:.0f}s"
+        if self.cancelled:
+            return "cancelled"
+        return f"exit {self.returncode}: {self.stderr.strip() or self.stdout.strip()[-2000:]}"
+
+
+# ────────── Stats ──────────
+class CommandStats:
+    """Per program: runs, failures, timeouts, duration and output volume; plus the latest runs."""
+
+    def __init__(self, recent: int = 50):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._durations: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=2000))
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=recent)
+
+    def record(self, result: CommandResult):
+        program = os.path.basename(result.args[0]) if result.args else "?"
+        with self._lock:
+            row = self._rows.setdefault(program, {
+                "program": program, "runs": 0, "failed": 0, "timed_out": 0, "cancelled": 0,
+                "spilled": 0, "output_chars": 0, "total_s": 0.0,
+            })
+            row["runs"] += 1
+            row["failed"] += int(not result.ok)
+            row["timed_out"] += int(result.timed_out)
+            row["cancelled"] += int(result.cancelled)
+            row["spilled"] += int(bool(result.stdout_path or result.stderr_path))
+            row["output_chars"] += result.stdout_chars + result.stderr_chars
+            row["total_s"] += result.duration_s
+            self._durations[program].append(result.duration_s)
+            self._recent.append({
+                "command": " ".join(result.args)[:300], "returncode": result.returncode,
+                "duration_s": round(result.duration_s, 3), "timed_out": result.timed_out,
+                "cancelled": result.cancelled, "output_chars": result.stdout_chars + result.stderr_chars,
+                "stdout_path": result.stdout_path, "stderr_path": result.stderr_path,
+            })
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            programs = []
+            for program, row in self._rows.items():
+                ordered = sorted(self._durations[program])
+                programs.append({**row, "total_s": round(row["total_s"], 3),
+                                 "p50_s": round(statistics.median(ordered), 3) if ordered else None,
+                                 "max_s": round(ordered[-1], 3) if ordered else None})
+            return {"programs": programs, "recent": list(self._recent)}
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+_stats = CommandStats()
+# the stats of the current run, besides the process-wide ones (see collect_command_stats)
+_run_stats: contextvars.ContextVar[Optional[CommandStats]] = contextvars.ContextVar("run_command_stats", default=None)
+
+
+def command_stats() -> CommandStats:
+    """Every command of the process."""
+    return _stats
+
+
+@contextlib.contextmanager
+def collect_command_stats() -> Iterator[CommandStats]:
+    """Also count the commands run in this block (this context) in a CommandStats of their own."""
+    stats = CommandStats()
+    token = _run_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _run_stats.reset(token)
+
+
+# ────────── Runner ──────────
+def _pump(stream, buffer: OutputBuffer, echo: Optional[TextIO], on_line: Optional[Callable[[str], None]]):
+    """Decode a pipe chunk by chunk into `buffer` (and `echo`), handing complete lines to `on_line`."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    fd = stream.fileno()
+    partial = ""
+    while True:
+        try:
+            chunk = os.read(fd, 65536)
+        except OSError:
+            chunk = b""
+        text = decoder.decode(chunk, final=not chunk)
+        if text:
+            buffer.write(text)
+            if echo is not None:
+                echo.write(text)
+            if on_line is not None:
+                *lines, partial = (partial + text).split("\n")
+                for line in lines:
+                    on_line(line)
+        if not chunk:
+            if on_line is not None and partial:
+                on_line(partial)
+            return
+
+
+def _kill(proc: subprocess.Popen):
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(proc.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            return
+        try:
+            proc.wait(KILL_GRACE_S)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def run_command(args: List[str], timeout: Optional[float] = None, cwd: Optional[str] = None,
+                env: Optional[Dict[str, str]] = None, cancel: Optional[threading.Event] = None,
+                echo: bool = False, on_line: Optional[Callable[[str], None]] = None,
+                head_chars: int = 4000, tail_chars: int = 12000) -> CommandResult:
+    """
+    Run `args` with bounded output capture; never raises for a failing command.
+
+    echo streams the output to this process's stdout as well (what the user
+    used to see of an uncaptured build); on_line receives every stdout line.
+    A program that is not installed raises FileNotFoundError, as subprocess does.
+    """
+    timeout = DEFAULT_TIMEOUT_S if timeout is None else timeout
+    cancel = cancel or _cancel.get()
+    out = OutputBuffer(head_chars, tail_chars)
+    err = OutputBuffer(head_chars // 2, tail_chars // 2)
+    start = time.perf_counter()
+    # own session, so a timeout can stop the command and everything it started
+    proc = subprocess.Popen(args, cwd=cwd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, start_new_session=True, bufsize=0)
+    readers = [
+        threading.Thread(target=_pump, args=(proc.stdout, out, sys.stdout if echo else None, on_line), daemon=True),
+        threading.Thread(target=_pump, args=(proc.stderr, err, sys.stderr if echo else None, None), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = cancelled = False
+    deadline = start + timeout if timeout else None
+    while proc.poll() is None:
+        if cancel is not None and cancel.is_set():
+            cancelled = True
+        elif deadline is not None and time.perf_counter() > deadline:
+            timed_out = True
+        if timed_out or cancelled:
+            _kill(proc)
+            break
+        try:
+            proc.wait(POLL_S)
+        except subprocess.TimeoutExpired:
+            continue
+    for reader, pipe in zip(readers, (proc.stdout, proc.stderr)):
+        # a daemon the command left behind may still hold the pipe open: leave that reader to it
+        reader.join(KILL_GRACE_S)
+        if not reader.is_alive():
+            pipe.close()
+    out.close()
+    err.close()
+
+    result = CommandResult(
+        args=[str(a) for a in args], returncode=proc.poll(), stdout=out.render(), stderr=err.render(),
+        duration_s=time.perf_counter() - start, timed_out=timed_out, cancelled=cancelled,
+        stdout_chars=out.total_chars, stderr_chars=err.total_chars,
+        stdout_path=out.spill_path, stderr_path=err.spill_path,
+    )
+    _stats.record(result)
+    run = _run_stats.get()
+    if run is not None:
+        run.record(result)
+    return result
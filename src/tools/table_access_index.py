@@ -0,0 +1,568 @@
+# tools/table_access_index.py
+
+"""
+Persistent index of which classes and methods read and write which tables.
+
+DBParserTool lists the SQL strings of a codebase one by one; which packages
+share which tables (the data coupling that decides module boundaries) had
+to be re-derived from them by the agent. This index records, per access:
+
+  package, class, method, table, column (when the query names it), read or write
+
+from three sources, found by tokenizing each .java file:
+
+  * SQL and JPQL string literals (adjacent literals joined across `+`):
+    SELECT / JOIN read, INSERT / UPDATE / DELETE / MERGE write;
+  * EntityManager calls: persist / merge / remove write the entity of the
+    argument's declared type, find / getReference / createQuery(..., X.class)
+    and criteria from(X.class) read X;
+  * @Entity / @Table declarations, which map entity names to table names
+    (resolved when the index is queried, so an entity declared in another
+    file needs no rescan).
+
+The index is a SQLite file per codebase in the system temp dir and is
+refreshed incrementally: only files whose mtime or size changed are
+rescanned, and while a watcher runs on the codebase (see fs_watcher.py)
+only the files it reported are looked at. table_access_index(root) returns one instance per root for the
+process; table_access_report() turns it into the compact matrix the
+planning tasks get.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Type
+
+import javalang
+from pydantic import BaseModel, Field, PrivateAttr
+from crewai.tools.base_tool import BaseTool
+
+from tools.codebase import codebase_path
+from tools.fs_watcher import WatchedStamps
+
+# bump when the scanner changes, so existing indexes are rebuilt
+SCANNER_VERSION = "1"
+LEVELS = ("package", "class", "method")
+TYPE_KEYWORDS = {"class", "interface", "enum"}
+WRITE_CALLS = {"persist", "merge", "remove", "refresh", "lock"}
+READ_CALLS = {"find", "getReference", "createQuery", "createNamedQuery", "createNativeQuery", "from", "select"}
+
+_SQL_START = re.compile(r"^\s*(select|insert|update|delete|merge|with|from)\b", re.IGNORECASE)
+_QUOTED = re.compile(r"'[^']*'")
+_IDENT = r"[A-Za-z_][\w$]*(?:\.[A-Za-z_][\w$]*)?"
+_CLAUSE_END = (r"(?=\b(?:where|join|inner|left|right|full|cross|outer|on|group|order|having|limit|offset|union"
+               r"|set|values|fetch|for|window|returning)\b|[();]|$)")
+_FROM = re.compile(rf"\bfrom\s+(?!\()(.+?){_CLAUSE_END}", re.IGNORECASE)
+_JOIN = re.compile(rf"\bjoin\s+(?:fetch\s+)?({_IDENT})(?:\s+(?:as\s+)?([A-Za-z_]\w*))?", re.IGNORECASE)
+_INSERT = re.compile(rf"\b(?:insert|merge)\s+into\s+({_IDENT})\s*(?:\(([^)]*)\))?", re.IGNORECASE)
+_UPDATE = re.compile(rf"^\s*update\s+({_IDENT})(?:\s+(?:as\s+)?([A-Za-z_]\w*))?\s+set\s+(.+?)(?=\bwhere\b|$)",
+                     re.IGNORECASE)
+_DELETE = re.compile(rf"^\s*delete\s+(?:from\s+)?({_IDENT})(?:\s+(?:as\s+)?([A-Za-z_]\w*))?", re.IGNORECASE)
+_SELECT_LIST = re.compile(r"^\s*select\s+(?:distinct\s+)?(.+?)\s+from\b", re.IGNORECASE)
+_QUALIFIED = re.compile(r"\b([A-Za-z_]\w*)\.([A-Za-z_]\w*)\b")
+_COMPARED = re.compile(r"\b([A-Za-z_]\w*)\s*(?:=|<>|!=|<=|>=|<|>|\s+like\b|\s+in\b|\s+is\b|\s+between\b)",
+                       re.IGNORECASE)
+_SQL_WORDS = {
+    "select", "from", "where", "and", "or", "not", "null", "as", "on", "join", "inner", "left", "right", "outer",
+    "distinct", "count", "sum", "min", "max", "avg", "case", "when", "then", "else", "end", "in", "is", "like",
+    "between", "exists", "new", "lower", "upper", "coalesce", "true", "false", "set", "values", "by", "order",
+    "group", "asc", "desc", "limit", "having", "all", "any", "some", "into", "update", "delete", "insert",
+}
+
+
+# ────────── SQL ──────────
+def looks_like_sql(text: str) -> bool:
+    return bool(_SQL_START.match(text)) and re.search(r"\b(from|into|update|delete)\b", text, re.IGNORECASE) is not None
+
+
+def _table_items(clause: str) -> List[Tuple[str, Optional[str]]]:
+    """(table, alias) of a FROM clause such as "orders o, customers AS c"."""
+    items = []
+    for item in clause.split(","):
+        words = [w for w in item.split() if w.lower() != "as"]
+        if not words or not re.fullmatch(_IDENT, words[0]):
+            continue
+        items.append((words[0], words[1] if len(words) > 1 and words[1].lower() not in _SQL_WORDS else None))
+    return items
+
+
+def sql_accesses(text: str) -> List[Tuple[str, Optional[str], str]]:
+    """(table, column or None, "read" / "write") accessed by one SQL or JPQL statement."""
+    sql = " ".join(_QUOTED.sub("''", text).split())
+    found: Set[Tuple[str, Optional[str], str]] = set()
+    aliases: Dict[str, str] = {}
+
+    def table(name: str, alias: Optional[str], mode: str):
+        found.add((name, None, mode))
+        aliases[name.lower()] = name
+        if alias:
+            aliases[alias.lower()] = name
+
+    insert = _INSERT.search(sql)
+    if insert:
+        table(insert.group(1), None, "write")
+        for column in (insert.group(2) or "").split(","):
+            if column.strip():
+                found.add((insert.group(1), column.strip(), "write"))
+    update = _UPDATE.match(sql)
+    if update:
+        table(update.group(1), update.group(2), "write")
+        for assignment in update.group(3).split(","):
+            column = assignment.split("=")[0].strip().rsplit(".", 1)[-1]
+            if re.fullmatch(r"[A-Za-z_]\w*", column):
+                found.add((update.group(1), column, "write"))
+    delete = _DELETE.match(sql)
+    if delete:
+        table(delete.group(1), delete.group(2), "write")
+
+    for match in _FROM.finditer(sql):
+        for name, alias in _table_items(match.group(1)):
+            if delete and match.start() == sql.lower().find("from") and name == delete.group(1):
+                continue
+            table(name, alias, "read")
+    for match in _JOIN.finditer(sql):
+        table(match.group(1), match.group(2), "read")
+
+    # columns: alias.column anywhere; unqualified names only when a single table is involved
+    for alias, column in _QUALIFIED.findall(sql):
+        name = aliases.get(alias.lower())
+        if name and column.lower() not in _SQL_WORDS:
+            found.add((name, column, "read"))
+    tables = {t for t, _, _ in found}
+    if len(tables) == 1:
+        only = next(iter(tables))
+        select = _SELECT_LIST.match(sql)
+        candidates = [c.strip() for c in select.group(1).split(",")] if select else []
+        where = re.split(r"\bwhere\b", sql, maxsplit=1, flags=re.IGNORECASE)
+        if len(where) == 2:
+            candidates += _COMPARED.findall(where[1])
+        for column in candidates:
+            if re.fullmatch(r"[A-Za-z_]\w*", column) and column.lower() not in _SQL_WORDS \
+                    and column.lower() not in aliases:
+                found.add((only, column, "read"))
+    return sorted(found, key=lambda a: (a[0], a[1] or "", a[2]))
+
+
+# ────────── Scanner ──────────
+def _annotation_args(tokens: list, i: int) -> Tuple[Dict[str, str], int]:
+    """String-valued arguments of the annotation whose "(" is tokens[i]; "value" for a bare string."""
+    args: Dict[str, str] = {}
+    depth, key = 0, "value"
+    while i < len(tokens):
+        value = tokens[i].value
+        if value == "(":
+            depth += 1
+        elif value == ")":
+            depth -= 1
+            if depth == 0:
+                return args, i + 1
+        elif depth == 1 and type(tokens[i]).__name__ == "Identifier" and i + 1 < len(tokens) \
+                and tokens[i + 1].value == "=":
+            key = value
+        elif depth == 1 and type(tokens[i]).__name__ == "String":
+            args.setdefault(key, _literal(tokens[i].value))
+        i += 1
+    return args, i
+
+
+def _literal(value: str) -> str:
+    if value.startswith('"""'):
+        return value[3:-3]
+    return value[1:-1].replace('\\"', '"').replace("\\n", " ").replace("\\t", " ")
+
+
+def scan_accesses(source: str) -> Dict[str, Any]:
+    """
+    Package, entity declarations and accesses of one Java file:
+    {"package": ..., "entities": [(entity, table, class)],
+     "accesses": [(class, method, target, is_entity, column, mode, line)]}
+    """
+    tokens = list(javalang.tokenizer.tokenize(source))
+    package = ""
+    entities: List[Tuple[str, Optional[str], str]] = []
+    accesses: List[Tuple[str, Optional[str], str, int, Optional[str], str, int]] = []
+
+    classes: List[Tuple[str, int]] = []       # (name, brace depth of its body)
+    method: Optional[Tuple[str, int]] = None  # (name, brace depth of its body)
+    field_types: Dict[str, Dict[str, str]] = defaultdict(dict)
+    local_types: Dict[str, str] = {}
+    pending_entity: Optional[Dict[str, str]] = None
+    pending_table: Optional[str] = None
+    pending_class: Optional[str] = None
+    candidate: Optional[str] = None           # name before "(" at class-body level
+    calls: List[Tuple[str, int]] = []         # (called name, paren depth) of open READ/WRITE calls
+    depth = parens = 0
+
+    def here() -> Tuple[str, Optional[str]]:
+        return (classes[-1][0] if classes else "", method[0] if method else None)
+
+    def record(target: str, is_entity: bool, column: Optional[str], mode: str, line: int):
+        accesses.append((*here(), target, int(is_entity), column, mode, line))
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        kind, value = type(token).__name__, token.value
+        nxt = tokens[i + 1].value if i + 1 < len(tokens) else ""
+
+        if kind == "Keyword" and value == "package":
+            j = i + 1
+            while j < len(tokens) and tokens[j].value != ";":
+                j += 1
+            package = "".join(t.value for t in tokens[i + 1:j])
+            i = j
+        elif kind == "Annotation" or value == "@":
+            # @Table or @javax.persistence.Table
+            j = i + 1
+            while j + 2 < len(tokens) and tokens[j + 1].value == "." and type(tokens[j + 2]).__name__ == "Identifier":
+                j += 2
+            name = tokens[j].value if j < len(tokens) else ""
+            if j + 1 < len(tokens) and tokens[j + 1].value == "(":
+                args, end = _annotation_args(tokens, j + 1)
+            else:
+                args, end = {}, j + 1
+            if name == "Entity":
+                pending_entity = args
+            elif name == "Table":
+                pending_table = args.get("name") or args.get("value")
+            elif name in ("NamedQuery", "NamedNativeQuery", "Query") and looks_like_sql(args.get("query") or args.get("value", "")):
+                text = args.get("query") or args.get("value")
+                for target, column, mode in sql_accesses(text):
+                    record(target, False, column, mode, token.position.line if token.position else 0)
+            i = end
+            continue
+        elif kind == "Keyword" and value in TYPE_KEYWORDS and i + 1 < len(tokens) \
+                and type(tokens[i + 1]).__name__ == "Identifier" and (i == 0 or tokens[i - 1].value != "."):
+            pending_class = nxt
+        elif kind == "String":
+            # "a" + "b" + ... is one query
+            text, line, j = _literal(value), token.position.line if token.position else 0, i
+            while j + 2 < len(tokens) and tokens[j + 1].value == "+" and type(tokens[j + 2]).__name__ == "String":
+                text += _literal(tokens[j + 2].value)
+                j += 2
+            if looks_like_sql(text):
+                for target, column, mode in sql_accesses(text):
+                    record(target, False, column, mode, line)
+            i = j
+        elif value == "(":
+            parens += 1
+            if classes and method is None and depth == classes[-1][1] and kind == "Separator" \
+                    and i and type(tokens[i - 1]).__name__ == "Identifier":
+                candidate = tokens[i - 1].value
+                # the parameters of a method are its first locals
+                local_types = {}
+            if i and tokens[i - 1].value in WRITE_CALLS | READ_CALLS and i > 1 and tokens[i - 2].value == ".":
+                calls.append((tokens[i - 1].value, parens))
+                if tokens[i - 1].value in WRITE_CALLS and i + 2 < len(tokens) \
+                        and type(tokens[i + 1]).__name__ == "Identifier" and tokens[i + 2].value == ")":
+                    arg = tokens[i + 1].value
+                    declared = local_types.get(arg) or field_types[here()[0]].get(arg)
+                    if declared:
+                        record(declared, True, None, "write", token.position.line if token.position else 0)
+        elif value == ")":
+            while calls and calls[-1][1] >= parens:
+                calls.pop()
+            parens -= 1
+        elif value == "." and nxt == "class" and calls and i and type(tokens[i - 1]).__name__ == "Identifier":
+            record(tokens[i - 1].value, True, None, "read", token.position.line if token.position else 0)
+        elif value == "{":
+            depth += 1
+            if pending_class:
+                classes.append((pending_class, depth))
+                if pending_entity is not None:
+                    entities.append((pending_entity.get("name") or pending_class, pending_table, pending_class))
+                pending_class = pending_entity = pending_table = None
+            elif classes and method is None and depth == classes[-1][1] + 1 and parens == 0:
+                method = (candidate or "<init>", depth)
+            candidate = None
+        elif value == "}":
+            if method is not None and depth == method[1]:
+                method = None
+            if classes and depth == classes[-1][1]:
+                classes.pop()
+            depth -= 1
+        elif value in (";", "=") and classes and method is None and depth == classes[-1][1]:
+            candidate = None
+        if kind == "Identifier" and i + 2 < len(tokens) and type(tokens[i + 1]).__name__ == "Identifier" \
+                and tokens[i + 2].value in ("=", ",", ")", ";") and value[:1].isupper():
+            # Type name: remember declared types of fields, parameters and locals
+            (local_types if method is not None or parens else field_types[here()[0]])[nxt] = value
+        i += 1
+    return {"package": package, "entities": entities, "accesses": accesses}
+
+
+# ────────── Index ──────────
+def _index_file(root: str) -> Path:
+    # outside the project, like the static-analysis cache
+    key = hashlib.sha256(root.encode()).hexdigest()[:16]
+    return Path(tempfile.gettempdir()) / "reforge-table-access" / f"{key}.db"
+
+
+class TableAccessIndex:
+    def __init__(self, root: str, db_path: Optional[str] = None):
+        self.root = str(Path(root).resolve())
+        self.db_path = db_path or str(_index_file(self.root))
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stamps = WatchedStamps(self.root)
+
+    # ────────── Connection ──────────
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL, size INTEGER,
+                                                  package TEXT, error TEXT);
+                CREATE TABLE IF NOT EXISTS entities (path TEXT, entity TEXT, table_name TEXT, class TEXT);
+                CREATE TABLE IF NOT EXISTS access (path TEXT, package TEXT, class TEXT, method TEXT, target TEXT,
+                                                   is_entity INTEGER, column_name TEXT, mode TEXT, line INTEGER);
+                CREATE INDEX IF NOT EXISTS access_path ON access(path);
+                CREATE INDEX IF NOT EXISTS access_target ON access(target);
+                CREATE INDEX IF NOT EXISTS entities_path ON entities(path);
+            """)
+            version = self._conn.execute("SELECT value FROM meta WHERE key = 'scanner'").fetchone()
+            if version is None or version[0] != SCANNER_VERSION:
+                with self._conn:
+                    for table in ("files", "entities", "access"):
+                        self._conn.execute(f"DELETE FROM {table}")
+                    self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('scanner', ?)", (SCANNER_VERSION,))
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ────────── Refresh ──────────
+    def refresh(self) -> Dict[str, Any]:
+        """Rescan the new and modified files and forget deleted ones; return what was done."""
+        start = time.perf_counter()
+        with self._lock:
+            conn = self._connection()
+            known = {path: (mtime, size) for path, mtime, size in conn.execute("SELECT path, mtime, size FROM files")}
+            current = self._stamps.current()
+            changed = [p for p, stamp in current.items() if known.get(p) != stamp]
+            removed = [p for p in known if p not in current]
+            with conn:
+                for path in changed + removed:
+                    for table in ("files", "entities", "access"):
+                        conn.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+                for path in changed:
+                    source = Path(path).read_text(encoding="utf-8", errors="ignore")
+                    try:
+                        scanned = scan_accesses(source)
+                        error = None
+                    except (javalang.tokenizer.LexerError, TypeError, ValueError, IndexError) as e:
+                        scanned, error = {"package": "", "entities": [], "accesses": []}, f"{type(e).__name__}: {e}"
+                    package = scanned["package"]
+                    conn.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?)", (path, *current[path], package, error))
+                    conn.executemany("INSERT INTO entities VALUES (?, ?, ?, ?)",
+                                     [(path, e, t, f"{package}.{c}" if package else c)
+                                      for e, t, c in scanned["entities"]])
+                    conn.executemany("INSERT INTO access VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                     [(path, package, *a) for a in scanned["accesses"]])
+        return {"files": len(current), "scanned": len(changed), "removed": len(removed),
+                "elapsed_s": round(time.perf_counter() - start, 3)}
+
+    # ────────── Queries ──────────
+    def accesses(self) -> List[Dict[str, Any]]:
+        """Every access, with entity references resolved to their tables (unknown entities dropped)."""
+        with self._lock:
+            conn = self._connection()
+            tables = {entity.lower(): (table or entity).lower()
+                      for entity, table in conn.execute("SELECT entity, table_name FROM entities")}
+            rows = conn.execute("SELECT path, package, class, method, target, is_entity, column_name, mode, line "
+                                "FROM access").fetchall()
+        found = []
+        for path, package, cls, method, target, is_entity, column, mode, line in rows:
+            name = target.rsplit(".", 1)[-1].lower() if is_entity else target.lower()
+            if is_entity and name not in tables:
+                continue
+            found.append({
+                "file": os.path.relpath(path, self.root), "package": package, "class": cls, "method": method,
+                "table": tables.get(name, name), "column": column.lower() if column else None,
+                "mode": mode, "line": line,
+            })
+        return found
+
+    @staticmethod
+    def unit(access: Dict[str, Any], level: str) -> str:
+        if level not in LEVELS:
+            raise ValueError(f"level must be one of {', '.join(LEVELS)}")
+        name = access["package"] or "(default)"
+        if level != "package":
+            name += f".{access['class']}"
+        if level == "method":
+            name += f".{access['method'] or '<class>'}"
+        return name
+
+    def matrix(self, level: str = "package") -> Dict[str, Dict[str, str]]:
+        """{table: {unit: "R", "W" or "RW"}}."""
+        modes: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        for access in self.accesses():
+            modes[access["table"]][self.unit(access, level)].add("W" if access["mode"] == "write" else "R")
+        return {table: {unit: "".join(sorted(m, key="RW".index)) for unit, m in sorted(units.items())}
+                for table, units in sorted(modes.items())}
+
+    def shared_tables(self, level: str = "package", min_units: int = 2) -> List[Dict[str, Any]]:
+        """Tables used by at least `min_units` units, the ones written by several first."""
+        shared = []
+        for table, units in self.matrix(level).items():
+            if len(units) < min_units:
+                continue
+            writers = [u for u, m in units.items() if "W" in m]
+            shared.append({"table": table, "units": len(units), "writers": writers,
+                           "readers": [u for u, m in units.items() if m == "R"]})
+        return sorted(shared, key=lambda s: (-len(s["writers"]), -s["units"], s["table"]))
+
+    def clusters(self, level: str = "package", threshold: float = 0.3) -> Dict[str, Any]:
+        """
+        Units grouped by co-access: two units are linked when the Jaccard
+        similarity of their table sets is at least `threshold`. For each
+        cluster, the tables only it uses and those it shares with others.
+        """
+        tables_of: Dict[str, Set[str]] = defaultdict(set)
+        for table, units in self.matrix(level).items():
+            for unit in units:
+                tables_of[unit].add(table)
+        units = sorted(tables_of)
+        parent = {u: u for u in units}
+
+        def root(u: str) -> str:
+            while parent[u] != u:
+                parent[u] = parent[parent[u]]
+                u = parent[u]
+            return u
+
+        pairs = []
+        for i, a in enumerate(units):
+            for b in units[i + 1:]:
+                shared = tables_of[a] & tables_of[b]
+                if not shared:
+                    continue
+                similarity = len(shared) / len(tables_of[a] | tables_of[b])
+                pairs.append({"units": [a, b], "shared": sorted(shared), "jaccard": round(similarity, 3)})
+                if similarity >= threshold:
+                    parent[root(a)] = root(b)
+
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for unit in units:
+            groups[root(unit)].append(unit)
+        cluster_of = {u: n for n, members in enumerate(sorted(groups.values(), key=lambda m: (-len(m), m)))
+                      for u in members}
+        result = []
+        for n, members in enumerate(sorted(groups.values(), key=lambda m: (-len(m), m))):
+            tables = set().union(*(tables_of[u] for u in members))
+            others = {t for u in units if cluster_of[u] != n for t in tables_of[u]}
+            result.append({"cluster": n, "units": members, "own_tables": sorted(tables - others),
+                           "shared_tables": sorted(tables & others)})
+        pairs.sort(key=lambda p: (-p["jaccard"], p["units"]))
+        return {"threshold": threshold, "clusters": result, "pairs": pairs}
+
+    def table(self, name: str) -> List[Dict[str, Any]]:
+        """Every access to one table."""
+        name = name.lower()
+        return [a for a in self.accesses() if a["table"] == name]
+
+
+_indexes: Dict[str, TableAccessIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def table_access_index(root: str) -> TableAccessIndex:
+    """The process-wide index of `root` (call refresh() before use)."""
+    key = str(Path(root).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = TableAccessIndex(key)
+        return _indexes[key]
+
+
+def _names(names: List[str], limit: int = 10) -> str:
+    return ", ".join(names[:limit]) + (f" (+{len(names) - limit})" if len(names) > limit else "") if names else "-"
+
+
+def table_access_report(index: TableAccessIndex, level: str = "package", max_units: int = 25,
+                        max_tables: int = 20) -> str:
+    """Plain-text unit x table matrix (R, W, RW), then the shared tables and the co-access clusters."""
+    matrix = index.matrix(level)
+    if not matrix:
+        return "No table access found in the sources."
+    shared = index.shared_tables(level)
+    # the shared tables first: they are the ones that constrain module boundaries
+    tables = [s["table"] for s in shared] + [t for t in matrix if t not in {s["table"] for s in shared}]
+    tables = tables[:max_tables]
+    units = sorted({u for t in tables for u in matrix[t]})
+    lines = [f"{len(matrix)} tables accessed by {len({u for t in matrix.values() for u in t})} {level}s "
+             f"({len(shared)} shared). Columns: " + ", ".join(f"T{i + 1}={t}" for i, t in enumerate(tables))]
+    for unit in units[:max_units]:
+        lines.append(f"  {unit}: " + " ".join(f"T{i + 1}:{matrix[t][unit]}" for i, t in enumerate(tables)
+                                              if unit in matrix[t]))
+    if len(units) > max_units:
+        lines.append(f"  ... and {len(units) - max_units} more {level}s")
+    if shared:
+        lines.append("Shared tables (written by / read by):")
+        for s in shared[:max_tables]:
+            lines.append(f"  {s['table']}: W {_names(s['writers'])} / R {_names(s['readers'])}")
+    clusters = index.clusters(level)["clusters"]
+    lines.append(f"Co-access clusters ({len(clusters)}):")
+    for c in clusters[:max_units]:
+        lines.append(f"  #{c['cluster']} {_names(c['units'])}: own {_names(c['own_tables'])}; "
+                     f"shared {_names(c['shared_tables'])}")
+    return "\n".join(lines)
+
+
+class TableAccessInput(BaseModel):
+    query: str = Field(
+        "report",
+        description="report (matrix, shared tables and clusters), shared (tables used by several units), "
+                    "clusters (co-access clustering), or table (every access to `table`).",
+    )
+    table: Optional[str] = Field(None, description="Table name, for query=table.")
+    level: str = Field("package", description="Granularity of the units: package, class or method.")
+    code_path: Optional[str] = Field(
+        None, description="Path to project root (defaults to the codebase under analysis)."
+    )
+
+
+class TableAccessTool(BaseTool):
+    name: str = "table_access"
+    description: str = (
+        "Which packages, classes and methods read and write which database tables and columns, from the SQL, "
+        "JPQL and JPA usage in the Java sources: a compact matrix, the tables shared between units and "
+        "co-access clusters that suggest module boundaries."
+    )
+    args_schema: Type[TableAccessInput] = TableAccessInput
+
+    _code_path: Optional[str] = PrivateAttr()
+
+    def __init__(self, code_path: Optional[str] = None):
+        super().__init__()
+        # resolved per call, falling back to CODE_PATH (see tools/codebase.py)
+        self._code_path = code_path
+
+    def _run(self, query: str = "report", table: Optional[str] = None, level: str = "package",
+             code_path: Optional[str] = None) -> Any:
+        root = codebase_path(code_path or self._code_path)
+        if not root.is_dir():
+            raise FileNotFoundError(f"📁 Directory '{root}' not found.")
+        index = table_access_index(str(root))
+        index.refresh()
+        if query == "shared":
+            return index.shared_tables(level)
+        if query == "clusters":
+            return index.clusters(level)
+        if query == "table":
+            if not table:
+                return "❌ query=table needs a table name."
+            return index.table(table) or f"ℹ️  No access to table '{table}' found."
+        return table_access_report(index, level)
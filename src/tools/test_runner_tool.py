@@ -0,0 +1,238 @@
+# tools/test_runner_tool.py
+
+"""
+Run the tests affected by the changes of a modernization step.
+
+Changed sources are mapped to test classes through the source dependency
+graph (java_source_index.py): a test is affected when it depends, directly
+or transitively, on a changed file. Only those test classes run, in one
+Maven invocation sharded across forked JVMs (Surefire forkCount), and the
+Surefire XML reports are reduced to a compact pass/fail summary.
+
+Results are cached per test class, keyed on the hash of the test's
+transitive inputs (its own source, every source it depends on and the
+pom.xml files), so an unchanged test is not run twice.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field, PrivateAttr
+from crewai.tools.base_tool import BaseTool
+
+from tools.codebase import codebase_path
+from tools.fs_watcher import WatchedStamps
+from tools.java_source_index import JavaSourceIndex, source_index
+from tools.subprocess_runner import run_command
+
+# Surefire's default includes (integration tests, *IT, belong to Failsafe)
+TEST_SUFFIXES = ("Test", "Tests", "TestCase")
+MAX_FAILURES = 20
+
+
+def is_test_file(path: str) -> bool:
+    name = Path(path).stem
+    in_test_tree = f"{os.sep}src{os.sep}test{os.sep}" in path
+    return in_test_tree and (name.startswith("Test") or name.endswith(TEST_SUFFIXES))
+
+
+def parse_surefire_reports(report_dirs: List[Path], since: float = 0.0) -> Dict[str, Dict]:
+    """Summarize TEST-*.xml reports written after `since`: {test class: {status, tests, failures, ...}}."""
+    results: Dict[str, Dict] = {}
+    for report_dir in report_dirs:
+        for report in report_dir.glob("TEST-*.xml"):
+            if report.stat().st_mtime < since:
+                continue
+            try:
+                suite = ET.parse(report).getroot()
+            except ET.ParseError:
+                continue
+            failures = []
+            for case in suite.iter("testcase"):
+                for kind in ("failure", "error"):
+                    problem = case.find(kind)
+                    if problem is not None:
+                        first_line = next(iter((problem.text or "").strip().splitlines()), "")
+                        failures.append({
+                            "case": case.get("name"),
+                            "kind": kind,
+                            "type": problem.get("type"),
+                            "message": (problem.get("message") or first_line)[:500],
+                        })
+            tests = int(suite.get("tests", 0))
+            results[suite.get("name", report.stem[5:])] = {
+                "status": "failed" if failures else "passed",
+                "tests": tests,
+                "failures": failures,
+                "skipped": int(suite.get("skipped", 0)),
+                "time_s": float(suite.get("time", 0) or 0),
+            }
+    return results
+
+
+class TestRunnerInput(BaseModel):
+    files: Optional[List[str]] = Field(
+        None,
+        description="Changed files to select tests for, in addition to those changed since the tool started"
+    )
+    tests: Optional[List[str]] = Field(
+        None,
+        description="Test classes to run regardless of the selection (simple or fully qualified names)"
+    )
+
+
+class TestRunnerTool(BaseTool):
+    name: str = "test-runner"
+    description: str = (
+        "Run only the unit tests affected by the Java files changed in this step, in parallel JVMs, "
+        "and return a compact pass/fail summary. Unchanged tests are served from a cache."
+    )
+    args_schema: Type[TestRunnerInput] = TestRunnerInput
+
+    _base_path: Path = PrivateAttr()
+    _index: JavaSourceIndex = PrivateAttr()
+    _sources: WatchedStamps = PrivateAttr()
+    _stamps: Dict[str, Tuple[float, int]] = PrivateAttr(default_factory=dict)
+    _forks: str = PrivateAttr()
+    _mvn_cmd: str = PrivateAttr()
+    _cache_file: Path = PrivateAttr()
+
+    def __init__(self, base_path: Optional[str] = None, forks: Optional[str] = None):
+        super().__init__()
+        self._base_path = codebase_path(base_path)
+        # Surefire accepts a number or "<n>C" (n per core)
+        self._forks = forks or os.getenv("REFORGE_TEST_FORKS", "1C")
+        self._mvn_cmd = "mvn"
+        self._index = source_index(str(self._base_path))
+        # baseline: the sources before the step starts changing them
+        self._sources = WatchedStamps(str(self._base_path))
+        self._stamps = self._sources.current() if self._base_path.is_dir() else {}
+        # outside the project: `mvn clean` would wipe it and worktree commits would pick it up
+        key = hashlib.sha256(str(self._base_path).encode()).hexdigest()[:16]
+        self._cache_file = Path(tempfile.gettempdir()) / "reforge-test-cache" / f"{key}.json"
+
+    # ────────── Selection ──────────
+    def _test_class(self, path: str) -> str:
+        info = self._index.files[path]
+        name = Path(path).stem
+        return f"{info.package}.{name}" if info.package else name
+
+    def _module_of(self, path: str) -> Path:
+        for parent in Path(path).parents:
+            if (parent / "pom.xml").exists() or parent == self._base_path:
+                return parent
+        return self._base_path
+
+    def _input_hash(self, test_path: str, pom_digest: str) -> str:
+        digest = hashlib.sha256(pom_digest.encode())
+        for path in sorted({test_path} | self._index.dependencies(test_path, transitive=True)):
+            digest.update(path.encode())
+            digest.update(Path(path).read_bytes())
+        return digest.hexdigest()
+
+    def _pom_digest(self) -> str:
+        digest = hashlib.sha256()
+        for pom in sorted(self._base_path.rglob("pom.xml")):
+            if "target" not in pom.parts:
+                digest.update(pom.read_bytes())
+        return digest.hexdigest()
+
+    # ────────── Cache ──────────
+    def _load_cache(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self._cache_file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_cache(self, cache: Dict[str, Dict]):
+        self._cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._cache_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(cache, indent=1))
+        os.replace(tmp, self._cache_file)
+
+    # ────────── Run ──────────
+    def _run(self, files: Optional[List[str]] = None, tests: Optional[List[str]] = None) -> dict:
+        if not self._base_path.is_dir():
+            raise FileNotFoundError(f"📁 Directory '{self._base_path}' not found.")
+        if not (self._base_path / "pom.xml").exists():
+            return {"message": "ℹ️  No pom.xml found; only Maven projects are supported."}
+        start = time.perf_counter()
+
+        # only what the watcher reported is re-stat'ed while one runs on the codebase
+        current = self._sources.current()
+        changed = {p for p, stamp in current.items() if self._stamps.get(p) != stamp}
+        changed |= set(self._stamps) - set(current)
+        changed |= {str((self._base_path / f).resolve()) for f in files or []}
+
+        self._index.refresh()
+        test_files = [p for p in self._index.files if is_test_file(p)]
+        affected = changed | self._index.dependents(changed, transitive=True)
+        selected = {p for p in test_files if p in affected}
+        for requested in tests or []:
+            selected |= {p for p in test_files
+                         if self._test_class(p) == requested or Path(p).stem == requested}
+
+        pom_digest = self._pom_digest()
+        cache = self._load_cache()
+        hashes = {p: self._input_hash(p, pom_digest) for p in selected}
+        cached = {p for p in selected if cache.get(self._test_class(p), {}).get("hash") == hashes[p]}
+        to_run = sorted(selected - cached)
+
+        run_output = None
+        results: Dict[str, Dict] = {}
+        if to_run:
+            if shutil.which(self._mvn_cmd) is None:
+                raise RuntimeError(f"'{self._mvn_cmd}' not found on PATH.")
+            modules = sorted({str(self._module_of(p).relative_to(self._base_path)) for p in to_run})
+            cmd = [
+                self._mvn_cmd, "-q", "-f", str(self._base_path / "pom.xml"), "test",
+                "-Dtest=" + ",".join(self._test_class(p) for p in to_run),
+                f"-DforkCount={self._forks}", "-DreuseForks=true",
+                "-DfailIfNoTests=false", "-Dsurefire.failIfNoSpecifiedTests=false", "-DtrimStackTrace=true",
+            ]
+            if modules != ["."]:
+                cmd += ["-pl", ",".join(modules), "-am"]
+            started = time.time()
+            run_output = run_command(cmd)
+            report_dirs = [p for p in self._base_path.rglob("target/surefire-reports") if p.is_dir()]
+            results = parse_surefire_reports(report_dirs, since=started - 1)
+            for path in to_run:
+                name = self._test_class(path)
+                if name in results:
+                    cache[name] = {"hash": hashes[path], **results[name]}
+            self._save_cache(cache)
+
+        summary: Dict[str, str] = {}
+        failures = []
+        for path in sorted(selected):
+            name = self._test_class(path)
+            result = results.get(name) if path in to_run else cache.get(name)
+            if result is None:
+                # selected but no report: the build broke before the test ran
+                summary[name] = "not run"
+                continue
+            summary[name] = result["status"] + (" (cached)" if path in cached else "")
+            failures += [{"test": name, **f} for f in result["failures"]]
+
+        report = {
+            "ok": bool(selected) and all(s.startswith("passed") for s in summary.values()),
+            "changed_files": len(changed),
+            "selected": len(selected),
+            "cached": len(cached),
+            "ran": len(to_run),
+            "tests": summary,
+            "failures": failures[:MAX_FAILURES],
+            "elapsed_s": round(time.perf_counter() - start, 2),
+        }
+        if not selected:
+            report["ok"] = True
+            report["message"] = "ℹ️  No test depends on the changed files."
+        if run_output is not None and run_output.returncode != 0 and "not run" in summary.values():
+            report["build_output"] = (run_output.stdout + run_output.stderr)[-4000:]
+        return report